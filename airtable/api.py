@@ -1,11 +1,12 @@
 import time
-from typing import Optional, Iterator, Tuple, List, Dict, Any
+from typing import Optional, Iterator, Tuple, List, Dict, Any, TypeVar
 import json
 import requests
 
 import logging
 from django.conf import settings
 
+from project.util.token_bucket import TokenBucket
 from .record import Record, Fields
 
 
@@ -37,18 +38,57 @@ RATE_LIMIT_EXCEEDED = 429
 # that failed due to rate limiting.
 RATE_LIMIT_TIMEOUT_SECS = 30
 
+# The maximum number of requests per second Airtable allows.
+REQUESTS_PER_SEC = 5
+
+# The maximum number of records that can be created or updated in
+# a single request.
+MAX_RECORDS_PER_REQUEST = 10
+
+# The rate at which we'll actually make requests. It's a bit below Airtable's
+# rate limit, since network latency can bunch our requests up by the time
+# they reach Airtable.
+TARGET_REQUESTS_PER_SEC = REQUESTS_PER_SEC * 0.9
+
+# The process-wide rate limiter that keeps us within Airtable's rate limit,
+# so we (hopefully) never have to wait for RATE_LIMIT_TIMEOUT_SECS.
+default_rate_limiter = TokenBucket(rate=TARGET_REQUESTS_PER_SEC)
+
+T = TypeVar("T")
+
+
+def chunked(items: List[T], size: int) -> Iterator[List[T]]:
+    """
+    Iterate through the given list in chunks of the given size, e.g.:
+
+        >>> list(chunked([1, 2, 3, 4, 5], 2))
+        [[1, 2], [3, 4], [5]]
+    """
+
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
 
 def retry_request(
-    method: str, url: str, max_retries: int, headers: Dict[str, str], **kwargs
+    method: str,
+    url: str,
+    max_retries: int,
+    headers: Dict[str, str],
+    rate_limiter: Optional[TokenBucket] = None,
+    **kwargs,
 ) -> requests.Response:
     """
     This wraps requests.request() but has built-in retry logic for when Airtable's
     rate limit is exceeded (up to a maximum number of retries).
+
+    If a rate limiter is provided, we'll wait for it before each attempt.
     """
 
     attempts = 0
 
     while True:
+        if rate_limiter is not None:
+            rate_limiter.acquire()
         res = req_session.request(
             method, url, headers=headers, timeout=settings.AIRTABLE_TIMEOUT, **kwargs
         )
@@ -75,12 +115,20 @@ class Airtable:
     # rate limiting. If this is 0, then no retries will be attempted.
     max_retries: int
 
+    # The rate limiter we'll wait for before making each request.
+    rate_limiter: TokenBucket
+
     def __init__(
-        self, url: Optional[str] = None, api_key: Optional[str] = None, max_retries: int = 0
+        self,
+        url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        max_retries: int = 0,
+        rate_limiter: Optional[TokenBucket] = None,
     ) -> None:
         self.url = url or settings.AIRTABLE_URL
         self.api_key = api_key or settings.AIRTABLE_API_KEY
         self.max_retries = max_retries
+        self.rate_limiter = rate_limiter or default_rate_limiter
         if not (self.url and self.api_key):
             raise ValueError("Configuration not provided, and Django settings not configured")
 
@@ -105,7 +153,14 @@ class Airtable:
         if data is not None:
             kwargs["data"] = json.dumps(data)
             headers["Content-Type"] = "application/json"
-        res = retry_request(method, url, max_retries=self.max_retries, headers=headers, **kwargs)
+        res = retry_request(
+            method,
+            url,
+            max_retries=self.max_retries,
+            headers=headers,
+            rate_limiter=self.rate_limiter,
+            **kwargs,
+        )
         if res.status_code == UNPROCESSABLE_ENTITY:
             logger.error(
                 f"It's likely that you need to add or change a field in your Airtable. "
@@ -144,6 +199,41 @@ class Airtable:
         res = self.request("POST", data={"fields": fields.dict(by_alias=True)})
         return Record(**res.json())
 
+    def update_many(self, updates: List[Tuple[Record, Fields]]) -> List[Record]:
+        """
+        Updates the given rows in Airtable with their given fields, using
+        as few requests as possible.
+        """
+
+        result: List[Record] = []
+        for chunk in chunked(updates, MAX_RECORDS_PER_REQUEST):
+            res = self.request(
+                "PATCH",
+                data={
+                    "records": [
+                        {"id": record.id, "fields": fields.dict(by_alias=True)}
+                        for record, fields in chunk
+                    ]
+                },
+            )
+            result.extend(Record(**raw) for raw in res.json()["records"])
+        return result
+
+    def create_many(self, fields_list: List[Fields]) -> List[Record]:
+        """
+        Creates new rows in Airtable with the given fields, using as few
+        requests as possible.
+        """
+
+        result: List[Record] = []
+        for chunk in chunked(fields_list, MAX_RECORDS_PER_REQUEST):
+            res = self.request(
+                "POST",
+                data={"records": [{"fields": fields.dict(by_alias=True)} for fields in chunk]},
+            )
+            result.extend(Record(**raw) for raw in res.json()["records"])
+        return result
+
     def get(self, pk: int) -> Optional[Record]:
         """
         Attempts to retrieve the row in Airtable that has the given
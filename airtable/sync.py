@@ -1,10 +1,10 @@
 import sys
-from typing import Optional, Dict, TextIO
+from typing import Optional, Dict, List, TextIO, Tuple
 import logging
 from django.conf import settings
 
 from users.models import JustfixUser
-from .api import Airtable
+from .api import Airtable, MAX_RECORDS_PER_REQUEST
 from .record import Record, Fields
 
 logger = logging.getLogger(__name__)
@@ -32,6 +32,8 @@ class AirtableSynchronizer:
             airtable = Airtable()
         self.airtable = airtable
         self.dry_run = dry_run
+        self._pending_creates: List[Fields] = []
+        self._pending_updates: List[Tuple[Record, Fields]] = []
 
     def _get_record_dict(self) -> Dict[int, Record]:
         """
@@ -51,11 +53,25 @@ class AirtableSynchronizer:
 
     def _create_in_airtable(self, our_fields: Fields):
         if not self.dry_run:
-            self.airtable.create(our_fields)
+            self._pending_creates.append(our_fields)
+            if len(self._pending_creates) >= MAX_RECORDS_PER_REQUEST:
+                self._flush_creates()
 
     def _update_in_airtable(self, record: Record, our_fields: Fields):
         if not self.dry_run:
-            self.airtable.update(record, our_fields)
+            self._pending_updates.append((record, our_fields))
+            if len(self._pending_updates) >= MAX_RECORDS_PER_REQUEST:
+                self._flush_updates()
+
+    def _flush_creates(self):
+        if self._pending_creates:
+            self.airtable.create_many(self._pending_creates)
+            self._pending_creates = []
+
+    def _flush_updates(self):
+        if self._pending_updates:
+            self.airtable.update_many(self._pending_updates)
+            self._pending_updates = []
 
     def _sync_user(
         self, user: JustfixUser, records: Dict[int, Record], stdout: TextIO, verbose: bool = True
@@ -63,6 +79,9 @@ class AirtableSynchronizer:
         """
         Synchronize a single user with Airtable.  If the user is already synchronized
         with Airtable, nothing is done.
+
+        Note that changes are sent to Airtable in batches, so they may not
+        be made until later in the synchronization process.
         """
 
         our_fields = Fields.from_user(user)
@@ -90,6 +109,8 @@ class AirtableSynchronizer:
         stdout.write("Synchronizing users...\n")
         for user in queryset:
             self._sync_user(user, records, stdout, verbose)
+        self._flush_creates()
+        self._flush_updates()
 
 
 def sync_user(user: JustfixUser):
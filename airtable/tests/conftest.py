@@ -0,0 +1,14 @@
+import pytest
+
+from project.util.token_bucket import TokenBucket
+from .. import api
+
+
+@pytest.fixture(autouse=True)
+def fast_rate_limiter(monkeypatch):
+    """
+    Don't slow our tests down by rate limiting requests to Airtable, unless
+    a test specifically asks for it.
+    """
+
+    monkeypatch.setattr(api, "default_rate_limiter", TokenBucket(rate=1_000_000))
@@ -26,3 +26,10 @@ class FakeAirtable:
     def update(self, record, fields):
         our_record = [r for r in self._records if r.fields_.pk == record.fields_.pk][0]
         our_record.fields_ = Fields(**{**our_record.fields_.dict(), **fields.dict()})
+
+    def create_many(self, fields_list):
+        return [self.create(fields) for fields in fields_list]
+
+    def update_many(self, updates):
+        for record, fields in updates:
+            self.update(record, fields)
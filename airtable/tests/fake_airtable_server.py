@@ -0,0 +1,77 @@
+from collections import deque
+import time
+from typing import Any, Deque, Dict, List
+
+from ..api import MAX_RECORDS_PER_REQUEST, REQUESTS_PER_SEC, RATE_LIMIT_EXCEEDED
+from .test_api import RECORD, URL
+
+
+class FakeAirtableServer:
+    """
+    A fake Airtable API server, mocked via requests-mock, that counts the
+    requests made to it and enforces Airtable's limits on the rate of
+    requests and the number of records per request.
+    """
+
+    def __init__(self, requests_mock, url: str = URL, clock=time.monotonic):
+        self.records: List[Dict[str, Any]] = []
+        self.request_count = 0
+        self.rate_limited_count = 0
+        self._clock = clock
+        self._request_times: Deque[float] = deque()
+        self._next_id = 1
+        requests_mock.get(url, json=self._handle(self._list))
+        requests_mock.post(url, json=self._handle(self._create))
+        requests_mock.patch(url, json=self._handle(self._update))
+
+    def _is_rate_limited(self) -> bool:
+        now = self._clock()
+        while self._request_times and now - self._request_times[0] >= 1.0:
+            self._request_times.popleft()
+        self._request_times.append(now)
+        return len(self._request_times) > REQUESTS_PER_SEC
+
+    def _handle(self, handler):
+        def callback(request, context):
+            self.request_count += 1
+            if self._is_rate_limited():
+                self.rate_limited_count += 1
+                context.status_code = RATE_LIMIT_EXCEEDED
+                return {"error": {"type": "RATE_LIMIT_REACHED"}}
+            return handler(request, context)
+
+        return callback
+
+    def _list(self, request, context):
+        return {"records": self.records}
+
+    def _get_batch(self, request, context):
+        records = request.json()["records"]
+        if len(records) > MAX_RECORDS_PER_REQUEST:
+            context.status_code = 422
+            return None
+        return records
+
+    def _create(self, request, context):
+        batch = self._get_batch(request, context)
+        if batch is None:
+            return {"error": {"type": "INVALID_RECORDS"}}
+        created = []
+        for raw in batch:
+            record = {**RECORD, "id": f"rec{self._next_id}", "fields": raw["fields"]}
+            self._next_id += 1
+            self.records.append(record)
+            created.append(record)
+        return {"records": created}
+
+    def _update(self, request, context):
+        batch = self._get_batch(request, context)
+        if batch is None:
+            return {"error": {"type": "INVALID_RECORDS"}}
+        records_by_id = {record["id"]: record for record in self.records}
+        updated = []
+        for raw in batch:
+            record = records_by_id[raw["id"]]
+            record["fields"] = {**record["fields"], **raw["fields"]}
+            updated.append(record)
+        return {"records": updated}
@@ -3,7 +3,17 @@ import pytest
 import requests.exceptions
 
 from ..record import EXAMPLE_FIELDS as OUR_FIELDS
-from ..api import Airtable, Record, Fields, retry_request, RATE_LIMIT_TIMEOUT_SECS
+from project.util.token_bucket import TokenBucket
+from ..api import (
+    Airtable,
+    Record,
+    Fields,
+    retry_request,
+    MAX_RECORDS_PER_REQUEST,
+    RATE_LIMIT_TIMEOUT_SECS,
+    REQUESTS_PER_SEC,
+    TARGET_REQUESTS_PER_SEC,
+)
 
 
 URL = "https://api.airtable.com/v0/appEH2XUPhLwkrS66/Users"
@@ -135,3 +145,42 @@ def test_create_or_update_updates_if_preexisting():
     airtable.update = MagicMock(return_value="an updated record")
     assert airtable.create_or_update(Fields(**OUR_FIELDS)) == "an updated record"
     airtable.get.assert_called_once_with(1)
+
+
+class TestBatching:
+    @pytest.fixture
+    def server(self, requests_mock):
+        from .fake_airtable_server import FakeAirtableServer
+
+        return FakeAirtableServer(requests_mock)
+
+    def make_fields(self, count):
+        return [Fields(**{**OUR_FIELDS, "pk": i}) for i in range(1, count + 1)]
+
+    def test_create_many_uses_batches(self, server):
+        records = Airtable(URL, KEY).create_many(self.make_fields(25))
+        assert [record.fields_.pk for record in records] == list(range(1, 26))
+        assert server.request_count == 3
+
+    def test_update_many_uses_batches(self, server):
+        airtable = Airtable(URL, KEY)
+        records = airtable.create_many(self.make_fields(12))
+        updates = [
+            (record, record.fields_.copy(update={"last_name": "Denver"})) for record in records
+        ]
+        updated = airtable.update_many(updates)
+        assert [record.fields_.last_name for record in updated] == ["Denver"] * 12
+        assert server.request_count == 4
+
+    def test_server_enforces_rate_limit(self, server):
+        airtable = Airtable(URL, KEY)
+        with pytest.raises(requests.exceptions.HTTPError):
+            for _ in range(REQUESTS_PER_SEC + 1):
+                list(airtable.list())
+        assert server.rate_limited_count == 1
+
+    def test_token_bucket_keeps_us_within_rate_limit(self, server):
+        airtable = Airtable(URL, KEY, rate_limiter=TokenBucket(rate=TARGET_REQUESTS_PER_SEC))
+        airtable.create_many(self.make_fields(MAX_RECORDS_PER_REQUEST * (REQUESTS_PER_SEC + 2)))
+        assert server.request_count == REQUESTS_PER_SEC + 2
+        assert server.rate_limited_count == 0
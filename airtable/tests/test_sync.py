@@ -4,10 +4,13 @@ from django.core.management.base import CommandError
 from unittest.mock import MagicMock, patch
 import pytest
 
-from .test_api import OUR_FIELDS
+from project.util.token_bucket import TokenBucket
+from .test_api import OUR_FIELDS, URL, KEY
 from .test_settings import configure_airtable_settings
 from .fake_airtable import FakeAirtable
+from .fake_airtable_server import FakeAirtableServer
 from users.tests.factories import UserFactory
+from ..api import Airtable, TARGET_REQUESTS_PER_SEC
 from ..record import Fields
 from ..sync import logger, AirtableSynchronizer, sync_user
 
@@ -46,6 +49,30 @@ def test_airtable_synchronizer_works():
     assert airtable.get(user.pk).fields_.last_name == "Denver"
 
 
+@pytest.mark.django_db
+def test_airtable_synchronizer_batches_requests(requests_mock):
+    server = FakeAirtableServer(requests_mock)
+    users = [
+        UserFactory.create(username=f"user{i}", phone_number=f"555123{i:04}") for i in range(12)
+    ]
+    airtable = Airtable(URL, KEY, rate_limiter=TokenBucket(rate=TARGET_REQUESTS_PER_SEC))
+    syncer = AirtableSynchronizer(airtable)
+
+    syncer.sync_users(stdout=StringIO())
+    assert sorted(record["fields"]["pk"] for record in server.records) == [u.pk for u in users]
+
+    # One request to list the (empty) table, then two batches of creates.
+    assert server.request_count == 3
+
+    for user in users:
+        user.last_name = "Denver"
+        user.save()
+    syncer.sync_users(stdout=StringIO())
+    assert [record["fields"]["last_name"] for record in server.records] == ["Denver"] * 12
+    assert server.request_count == 6
+    assert server.rate_limited_count == 0
+
+
 class TestSyncUser:
     def test_is_noop_if_airtable_is_disabled(self):
         sync_user(None)
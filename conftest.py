@@ -247,6 +247,20 @@ def ensure_no_network_access(requests_mock):
     pass
 
 
+@pytest.fixture(autouse=True)
+def reset_spatial_indexes():
+    """
+    Our in-memory spatial indexes and simplified region geometries
+    aren't rolled back along with the database at the end of each test,
+    so we make sure every test starts with fresh ones.
+    """
+
+    from findhelp import catchment, spatial_index
+
+    spatial_index.invalidate_all()
+    catchment.invalidate_all()
+
+
 @pytest.fixture
 def live_server(live_server, requests_mock):
     """
@@ -282,10 +296,13 @@ def allow_lambda_http(requests_mock):
     """
 
     from frontend.views import lambda_service
-    from project.util.lambda_http_client import LambdaHttpClient
+    from project.util.lambda_http_client import LambdaHttpClient, LambdaHttpReplicaSet
 
     if isinstance(lambda_service, LambdaHttpClient):
         requests_mock.register_uri("POST", lambda_service.get_url(), real_http=True)
+    elif isinstance(lambda_service, LambdaHttpReplicaSet):
+        for replica in lambda_service.replicas:
+            requests_mock.register_uri("POST", replica.get_url(), real_http=True)
 
 
 @pytest.fixture
@@ -0,0 +1,50 @@
+from typing import List
+from django.core.management.base import BaseCommand, CommandError
+from django.conf import settings
+from django.db.models import Count
+
+from onboarding.models import OnboardingInfo
+from data_driven_onboarding.schema import warm_ddo_cache
+
+
+def get_most_common_bbls(limit: int) -> List[str]:
+    """
+    Return the BBLs that the most users have signed up from. We don't keep
+    track of which BBLs are searched for, but since most users find their
+    building via data-driven onboarding, these are a good proxy for it.
+    """
+
+    rows = (
+        OnboardingInfo.objects.exclude(pad_bbl="")
+        .values("pad_bbl")
+        .annotate(count=Count("id"))
+        .order_by("-count", "pad_bbl")[:limit]
+    )
+    return [row["pad_bbl"] for row in rows]
+
+
+class Command(BaseCommand):
+    help = "Precompute and cache data-driven onboarding (DDO) suggestions for BBLs."
+
+    def add_arguments(self, parser):
+        parser.add_argument("bbls", nargs="*", help="BBLs to precompute suggestions for.")
+        parser.add_argument(
+            "--top",
+            type=int,
+            default=0,
+            help="Also precompute suggestions for this many of the most common user BBLs.",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Recompute suggestions even for BBLs that are already cached.",
+        )
+
+    def handle(self, *args, **options):
+        if not settings.WOW_DATABASE:
+            raise CommandError("Data-driven onboarding requires WoW integration.")
+        bbls: List[str] = options["bbls"]
+        if options["top"]:
+            bbls.extend(bbl for bbl in get_most_common_bbls(options["top"]) if bbl not in bbls)
+        count = warm_ddo_cache(bbls, force=options["force"])
+        self.stdout.write(f"Precomputed suggestions for {count} of {len(bbls)} BBL(s).\n")
@@ -1,4 +1,4 @@
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterable, NamedTuple, Optional, Tuple
 from pathlib import Path
 import logging
 from django.core.cache import caches
@@ -10,14 +10,24 @@ from project import schema_registry, geocoding
 from nycha.models import is_nycha_bbl
 from project.util.streaming_json import generate_json_rows
 from project.util.address_form_fields import get_geocoding_search_text
+from project.util.single_flight import SingleFlight
 
 
 MY_DIR = Path(__file__).parent.resolve()
 
+# The Django cache that DDO SQL query results are stored in. Unless a
+# shared backend is configured via the CACHES setting, this is local to
+# each process, so results aren't shared between workers.
 DDO_SQL_CACHE = "default"
 
 DDO_SQL_FILE = MY_DIR / "data-driven-onboarding.sql"
 
+# The modification time and contents of DDO_SQL_FILE, as of the
+# last time it was read.
+_ddo_sql_query: Optional[Tuple[float, str]] = None
+
+_ddo_single_flight = SingleFlight()
+
 RTC_ZIPCODES = set(
     [
         # Brooklyn
@@ -265,18 +275,85 @@ def normalize_complaint_category(ddo_query: Dict[str, Any]):
     return ddo_query
 
 
+class CachedDDOResult(NamedTuple):
+    """
+    A cached result of the DDO SQL query. This is wrapped in a tuple
+    so that we can cache the fact that a BBL isn't in the database
+    (i.e., `row` is None), which the cache would otherwise mistake
+    for a cache miss.
+    """
+
+    row: Optional[Dict[str, Any]]
+
+
+def get_ddo_sql_query() -> Tuple[float, str]:
+    """
+    Return the modification time and contents of the DDO SQL file,
+    re-reading it only if it has changed.
+    """
+
+    global _ddo_sql_query
+
+    mtime = DDO_SQL_FILE.stat().st_mtime
+    if _ddo_sql_query is None or _ddo_sql_query[0] != mtime:
+        _ddo_sql_query = (mtime, DDO_SQL_FILE.read_text())
+    return _ddo_sql_query
+
+
+def get_ddo_cache_key(bbl: str) -> str:
+    sql_query_mtime = get_ddo_sql_query()[0]
+    return f"ddo-sql-{sql_query_mtime}-{bbl}"
+
+
+def _run_and_cache_ddo_sql_query(bbl: str, cache_key: str) -> Optional[Dict[str, Any]]:
+    row = run_ddo_sql_query(bbl)
+    timeout = settings.DDO_SQL_CACHE_TIMEOUT if row else settings.DDO_SQL_NEGATIVE_CACHE_TIMEOUT
+    caches[DDO_SQL_CACHE].set(cache_key, CachedDDOResult(row), timeout)
+    return row
+
+
 def cached_run_ddo_sql_query(bbl: str) -> Optional[Dict[str, Any]]:
-    sql_query_mtime = DDO_SQL_FILE.stat().st_mtime
-    cache_key = f"ddo-sql-{sql_query_mtime}-{bbl}"
-    cache = caches[DDO_SQL_CACHE]
-    result = run_ddo_sql_query(bbl)
-    if not result:
-        return None
-    return cache.get_or_set(cache_key, result)
+    """
+    Return the DDO SQL query results for the given BBL, running the query
+    only if they're not already cached. If multiple threads request the
+    same uncached BBL at once, only one of them runs the query.
+    """
+
+    cache_key = get_ddo_cache_key(bbl)
+    cached: Optional[CachedDDOResult] = caches[DDO_SQL_CACHE].get(cache_key)
+    if cached is not None:
+        return cached.row
+
+    def run() -> Optional[Dict[str, Any]]:
+        # Another thread may have cached the results while we were
+        # waiting to run, so check again.
+        cached: Optional[CachedDDOResult] = caches[DDO_SQL_CACHE].get(cache_key)
+        if cached is not None:
+            return cached.row
+        return _run_and_cache_ddo_sql_query(bbl, cache_key)
+
+    return _ddo_single_flight.run(cache_key, run)
+
+
+def warm_ddo_cache(bbls: Iterable[str], force: bool = False) -> int:
+    """
+    Run the DDO SQL query for all the given BBLs whose results aren't
+    already cached (or all of them, if `force` is True), caching the
+    results. Returns the number of queries that were run.
+    """
+
+    count = 0
+    for bbl in bbls:
+        cache_key = get_ddo_cache_key(bbl)
+        if not force and caches[DDO_SQL_CACHE].get(cache_key) is not None:
+            continue
+        _ddo_single_flight.run(cache_key, lambda: _run_and_cache_ddo_sql_query(bbl, cache_key))
+        count += 1
+    return count
 
 
 def run_ddo_sql_query(bbl: str) -> Optional[Dict[str, Any]]:
-    sql_query = DDO_SQL_FILE.read_text()
+    sql_query = get_ddo_sql_query()[1]
     with connections[settings.WOW_DATABASE].cursor() as cursor:
         cursor.execute(sql_query, {"bbl": bbl})
         results = list(generate_json_rows(cursor))
@@ -1,7 +1,36 @@
+from io import StringIO
+from threading import Barrier, Thread
+import time
+from unittest.mock import MagicMock
+from django.core.cache import caches
+from django.core.management import call_command, CommandError
 import pytest
 
 from project.tests.test_geocoding import EXAMPLE_SEARCH
+from onboarding.tests.factories import OnboardingInfoFactory
 from data_driven_onboarding import schema
+from data_driven_onboarding.management.commands.warmddocache import get_most_common_bbls
+
+
+EXAMPLE_ROW = {
+    "unit_count": 123,
+    "zipcode": "11201",
+    "most_common_category_of_hpd_complaint": "CABINET",
+}
+
+
+@pytest.fixture(autouse=True)
+def clear_ddo_cache():
+    caches[schema.DDO_SQL_CACHE].clear()
+    yield
+    caches[schema.DDO_SQL_CACHE].clear()
+
+
+@pytest.fixture
+def fake_run_ddo_sql_query(monkeypatch):
+    fake = MagicMock(side_effect=lambda bbl: EXAMPLE_ROW if bbl.startswith("3") else None)
+    monkeypatch.setattr(schema, "run_ddo_sql_query", fake)
+    return fake
 
 
 class TestSchema:
@@ -40,15 +69,7 @@ class TestSchema:
         settings.GEOCODING_SEARCH_URL = "http://bawlabr"
         settings.WOW_DATABASE = "blah"
         requests_mock.get(settings.GEOCODING_SEARCH_URL, json=EXAMPLE_SEARCH)
-        monkeypatch.setattr(
-            schema,
-            "run_ddo_sql_query",
-            lambda bbl: {
-                "unit_count": 123,
-                "zipcode": "11201",
-                "most_common_category_of_hpd_complaint": "CABINET",
-            },
-        )
+        monkeypatch.setattr(schema, "run_ddo_sql_query", lambda bbl: EXAMPLE_ROW)
         assert self.request("150 court", "") == {
             "fullAddress": "150 COURT STREET, Brooklyn, New York, NY, USA",
             "mostCommonCategoryOfHpdComplaint": "CABINETS",
@@ -61,8 +82,6 @@ class TestSchema:
     ):
         settings.GEOCODING_SEARCH_URL = "http://bawlabr"
         settings.WOW_DATABASE = "blah"
-        from unittest.mock import MagicMock
-
         fake_run_ddo_sql_query = MagicMock(return_value=[])
         requests_mock.get(settings.GEOCODING_SEARCH_URL, json=EXAMPLE_SEARCH)
         monkeypatch.setattr(
@@ -79,6 +98,89 @@ class TestSchema:
         assert "\t" not in sql, "SQL should not contain tabs (please use spaces instead)"
 
 
+class TestCachedRunDdoSqlQuery:
+    def test_it_caches_results(self, fake_run_ddo_sql_query):
+        assert schema.cached_run_ddo_sql_query("3002920026") == EXAMPLE_ROW
+        assert schema.cached_run_ddo_sql_query("3002920026") == EXAMPLE_ROW
+        fake_run_ddo_sql_query.assert_called_once_with("3002920026")
+
+    def test_it_caches_missing_bbls(self, fake_run_ddo_sql_query):
+        assert schema.cached_run_ddo_sql_query("1000000000") is None
+        assert schema.cached_run_ddo_sql_query("1000000000") is None
+        fake_run_ddo_sql_query.assert_called_once_with("1000000000")
+
+    def test_it_uses_configured_timeouts(self, fake_run_ddo_sql_query, settings, monkeypatch):
+        settings.DDO_SQL_CACHE_TIMEOUT = 100
+        settings.DDO_SQL_NEGATIVE_CACHE_TIMEOUT = 5
+        cache = caches[schema.DDO_SQL_CACHE]
+        set_calls = []
+        monkeypatch.setattr(cache, "set", lambda key, value, timeout: set_calls.append(timeout))
+        schema.cached_run_ddo_sql_query("3002920026")
+        schema.cached_run_ddo_sql_query("1000000000")
+        assert set_calls == [100, 5]
+
+    def test_concurrent_requests_run_one_query(self, monkeypatch):
+        num_threads = 5
+        calls = []
+
+        def slow_run_ddo_sql_query(bbl):
+            calls.append(bbl)
+            time.sleep(0.1)
+            return EXAMPLE_ROW
+
+        monkeypatch.setattr(schema, "run_ddo_sql_query", slow_run_ddo_sql_query)
+        barrier = Barrier(num_threads)
+        results = []
+
+        def request():
+            barrier.wait()
+            results.append(schema.cached_run_ddo_sql_query("3002920026"))
+
+        threads = [Thread(target=request) for _ in range(num_threads)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert results == [EXAMPLE_ROW] * num_threads
+        assert calls == ["3002920026"]
+
+    def test_sql_file_is_only_read_when_changed(self, monkeypatch):
+        mtime, sql = schema.get_ddo_sql_query()
+        monkeypatch.setattr(schema, "_ddo_sql_query", (mtime, "cached sql"))
+        assert schema.get_ddo_sql_query() == (mtime, "cached sql")
+        monkeypatch.setattr(schema, "_ddo_sql_query", (mtime - 1, "stale sql"))
+        assert schema.get_ddo_sql_query() == (mtime, sql)
+
+
+class TestWarmDdoCache:
+    def test_it_skips_cached_bbls(self, fake_run_ddo_sql_query):
+        assert schema.warm_ddo_cache(["3002920026", "1000000000"]) == 2
+        assert schema.warm_ddo_cache(["3002920026", "1000000000"]) == 0
+        assert schema.warm_ddo_cache(["3002920026"], force=True) == 1
+        assert fake_run_ddo_sql_query.call_count == 3
+        schema.cached_run_ddo_sql_query("3002920026")
+        assert fake_run_ddo_sql_query.call_count == 3
+
+    def test_get_most_common_bbls_works(self, db):
+        OnboardingInfoFactory(pad_bbl="3000000001")
+        OnboardingInfoFactory(pad_bbl="3000000002")
+        OnboardingInfoFactory(pad_bbl="3000000002")
+        OnboardingInfoFactory(pad_bbl="")
+        assert get_most_common_bbls(5) == ["3000000002", "3000000001"]
+        assert get_most_common_bbls(1) == ["3000000002"]
+
+    def test_command_works(self, db, settings, fake_run_ddo_sql_query):
+        settings.WOW_DATABASE = "blah"
+        OnboardingInfoFactory(pad_bbl="3000000001")
+        out = StringIO()
+        call_command("warmddocache", "1000000000", "--top=5", stdout=out)
+        assert out.getvalue() == "Precomputed suggestions for 2 of 2 BBL(s).\n"
+
+    def test_command_requires_wow(self, db):
+        with pytest.raises(CommandError, match="requires WoW integration"):
+            call_command("warmddocache", "1000000000")
+
+
 @pytest.mark.parametrize(
     "category,normalized", [("blah", "blah"), (None, None), ("GENERAL", "GENERAL DISREPAIR")]
 )
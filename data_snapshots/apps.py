@@ -0,0 +1,5 @@
+from django.apps import AppConfig
+
+
+class DataSnapshotsConfig(AppConfig):
+    name = "data_snapshots"
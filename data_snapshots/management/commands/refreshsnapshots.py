@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from data_snapshots.snapshots import get_snapshottable_data_downloads, refresh_snapshot
+
+
+class Command(BaseCommand):
+    help = "Refresh precomputed snapshots of admin data downloads."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "datasets",
+            nargs="*",
+            choices=[download.slug for download in get_snapshottable_data_downloads()],
+            help="Datasets to refresh (default: all of them).",
+        )
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Rebuild the snapshots from scratch rather than refreshing them incrementally.",
+        )
+
+    def handle(self, *args, **options):
+        slugs = options["datasets"]
+        for download in get_snapshottable_data_downloads():
+            if slugs and download.slug not in slugs:
+                continue
+            snapshot = refresh_snapshot(download, full=options["full"])
+            self.stdout.write(
+                f"Refreshed {download.slug} snapshot, which has {snapshot.row_count} row(s).\n"
+            )
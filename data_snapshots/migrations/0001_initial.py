@@ -0,0 +1,24 @@
+# Generated by Django 3.2.13 on 2026-10-17 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataSnapshot',
+            fields=[
+                ('slug', models.SlugField(primary_key=True, serialize=False)),
+                ('refreshed_at', models.DateTimeField(null=True)),
+                ('full_refresh_at', models.DateTimeField(null=True)),
+                ('watermark', models.DateTimeField(null=True)),
+                ('row_count', models.IntegerField(default=0)),
+            ],
+        ),
+    ]
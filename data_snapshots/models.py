@@ -0,0 +1,27 @@
+from django.db import models
+
+
+class DataSnapshot(models.Model):
+    """
+    Information about a precomputed snapshot of a data download, which
+    is stored in its own database table.
+    """
+
+    # The slug of the data download that this is a snapshot of.
+    slug = models.SlugField(primary_key=True)
+
+    # When the snapshot was last refreshed, either fully or incrementally.
+    refreshed_at = models.DateTimeField(null=True)
+
+    # When the snapshot was last completely rebuilt from scratch.
+    full_refresh_at = models.DateTimeField(null=True)
+
+    # Changes to the snapshot's underlying data made after this time
+    # haven't yet been incorporated into it.
+    watermark = models.DateTimeField(null=True)
+
+    # The number of rows in the snapshot.
+    row_count = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"Snapshot of {self.slug}"
@@ -0,0 +1,185 @@
+import datetime
+import logging
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, TYPE_CHECKING
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import DataSnapshot
+
+if TYPE_CHECKING:
+    from project.admin_download_data import DataDownload
+
+
+logger = logging.getLogger(__name__)
+
+# When refreshing a snapshot incrementally, we'll look for changes made
+# a bit before its watermark, in case any transactions that were still
+# in-progress during the previous refresh have since been committed.
+WATERMARK_OVERLAP = datetime.timedelta(minutes=5)
+
+TABLE_PREFIX = "data_snapshot_"
+
+
+class SnapshotConfig(NamedTuple):
+    """
+    Describes how to maintain a precomputed snapshot of a data download.
+    """
+
+    # A function that returns the SQL query for the entire dataset, along
+    # with its parameters. It will be used as a subquery, so it shouldn't
+    # end with a semicolon.
+    get_query: Callable[[], Tuple[str, Dict[str, Any]]]
+
+    # The name of the column that uniquely identifies each row of the dataset.
+    key_column: str
+
+    # A SQL query that returns the keys of all rows in the dataset that may
+    # have changed since the `%(since)s` parameter. Any changes it doesn't
+    # account for (e.g. deletions) will only be incorporated into the
+    # snapshot when it's fully refreshed.
+    changed_keys_sql: str
+
+
+def get_table_name(slug: str) -> str:
+    return TABLE_PREFIX + slug.replace("-", "_")
+
+
+def _quote(name: str) -> str:
+    return connection.ops.quote_name(name)
+
+
+def _get_config(download: "DataDownload") -> SnapshotConfig:
+    if download.snapshot is None:
+        raise ValueError(f"data download does not support snapshots: {download.slug}")
+    return download.snapshot
+
+
+def get_snapshot(download: "DataDownload") -> Optional[DataSnapshot]:
+    """
+    Return information about the given data download's snapshot, or
+    None if it doesn't have one yet.
+    """
+
+    if download.snapshot is None:
+        return None
+    return DataSnapshot.objects.filter(slug=download.slug, refreshed_at__isnull=False).first()
+
+
+def execute_snapshot_query(cursor, download: "DataDownload") -> bool:
+    """
+    If the given data download has a snapshot, execute a query that
+    retrieves it and return True. Otherwise, return False.
+    """
+
+    snapshot = get_snapshot(download)
+    if snapshot is None:
+        return False
+    config = _get_config(download)
+    table = _quote(get_table_name(download.slug))
+    cursor.execute(f"SELECT * FROM {table} ORDER BY {_quote(config.key_column)}")
+    return True
+
+
+def _is_full_refresh_needed(snapshot: DataSnapshot, now: datetime.datetime) -> bool:
+    if snapshot.watermark is None or snapshot.full_refresh_at is None:
+        return True
+    if get_table_name(snapshot.slug) not in connection.introspection.table_names():
+        return True
+    max_age = datetime.timedelta(hours=settings.DATA_SNAPSHOT_FULL_REFRESH_HOURS)
+    return now - snapshot.full_refresh_at >= max_age
+
+
+def _refresh_fully(cursor, slug: str, config: SnapshotConfig) -> None:
+    sql, params = config.get_query()
+    table = get_table_name(slug)
+    new_table = f"{table}_new"
+    cursor.execute(f"DROP TABLE IF EXISTS {_quote(new_table)}")
+    cursor.execute(
+        f"CREATE TABLE {_quote(new_table)} AS SELECT * FROM ({sql}) AS dataset",
+        params,
+    )
+    cursor.execute(f"DROP TABLE IF EXISTS {_quote(table)}")
+    cursor.execute(f"ALTER TABLE {_quote(new_table)} RENAME TO {_quote(table)}")
+    cursor.execute(
+        f"CREATE UNIQUE INDEX {_quote(table + '_key')} ON {_quote(table)} "
+        f"({_quote(config.key_column)})"
+    )
+
+
+def _refresh_incrementally(
+    cursor, slug: str, config: SnapshotConfig, since: datetime.datetime
+) -> int:
+    cursor.execute(config.changed_keys_sql, {"since": since})
+    keys: List[Any] = [row[0] for row in cursor.fetchall()]
+    if not keys:
+        return 0
+    sql, params = config.get_query()
+    table = _quote(get_table_name(slug))
+    key = _quote(config.key_column)
+
+    # Note that we're using `= ANY(...)` with an array of keys, rather than
+    # a subquery, so that Postgres can push the condition down into the
+    # dataset's query and avoid computing rows that haven't changed.
+    cursor.execute(
+        f"DELETE FROM {table} WHERE {key} = ANY(%(snapshot_keys)s)", {"snapshot_keys": keys}
+    )
+    cursor.execute(
+        f"INSERT INTO {table} SELECT * FROM ({sql}) AS dataset "
+        f"WHERE dataset.{key} = ANY(%(snapshot_keys)s)",
+        {**params, "snapshot_keys": keys},
+    )
+    return len(keys)
+
+
+def refresh_snapshot(download: "DataDownload", full: bool = False) -> DataSnapshot:
+    """
+    Refresh the snapshot of the given data download, creating it if
+    needed.
+
+    Unless `full` is True, the refresh will be incremental: only rows
+    whose underlying data has changed since the last refresh will be
+    recomputed. However, the snapshot will be fully rebuilt if it hasn't
+    been in a while, since some changes can't be detected incrementally.
+    """
+
+    config = _get_config(download)
+
+    # Any changes made after this point will be picked up by the next
+    # refresh. Note that we're using the same clock that Django uses to
+    # set `updated_at` fields here.
+    now = timezone.now()
+    with transaction.atomic():
+        # Lock the snapshot's row so that concurrent refreshes of the same
+        # snapshot will wait for us to finish.
+        DataSnapshot.objects.get_or_create(slug=download.slug)
+        snapshot = DataSnapshot.objects.select_for_update().get(slug=download.slug)
+        with connection.cursor() as cursor:
+            if full or _is_full_refresh_needed(snapshot, now):
+                logger.info(f"Fully refreshing {download.slug} snapshot.")
+                _refresh_fully(cursor, download.slug, config)
+                snapshot.full_refresh_at = now
+            else:
+                assert snapshot.watermark is not None
+                num_keys = _refresh_incrementally(
+                    cursor, download.slug, config, snapshot.watermark - WATERMARK_OVERLAP
+                )
+                logger.info(f"Refreshed {num_keys} row(s) of {download.slug} snapshot.")
+            cursor.execute(f"SELECT COUNT(*) FROM {_quote(get_table_name(download.slug))}")
+            snapshot.row_count = cursor.fetchone()[0]
+        snapshot.watermark = now
+        snapshot.refreshed_at = now
+        snapshot.save()
+    return snapshot
+
+
+def get_snapshottable_data_downloads() -> List["DataDownload"]:
+    from project.admin_download_data import get_all_data_downloads
+
+    return [download for download in get_all_data_downloads() if download.snapshot]
+
+
+def refresh_all_snapshots(full: bool = False) -> List[DataSnapshot]:
+    return [
+        refresh_snapshot(download, full=full) for download in get_snapshottable_data_downloads()
+    ]
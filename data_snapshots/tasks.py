@@ -0,0 +1,8 @@
+from celery import shared_task
+
+from . import snapshots
+
+
+@shared_task(ignore_result=True)
+def refresh_data_snapshots():
+    snapshots.refresh_all_snapshots()
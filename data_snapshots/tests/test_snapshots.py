@@ -0,0 +1,125 @@
+import json
+from io import StringIO
+from django.core.management import call_command
+from django.contrib.auth.models import AnonymousUser
+import pytest
+
+from onboarding.tests.factories import OnboardingInfoFactory
+from project.admin_download_data import strict_get_data_download
+from data_snapshots.models import DataSnapshot
+from data_snapshots import snapshots, tasks
+
+
+def get_userstats():
+    return strict_get_data_download("userstats")
+
+
+def get_rows():
+    return list(get_userstats().generate_json_rows(AnonymousUser()))
+
+
+@pytest.fixture
+def onboarding_info(db):
+    return OnboardingInfoFactory(needs_repairs=False)
+
+
+def test_get_table_name_works():
+    assert snapshots.get_table_name("userstats-with-bbls") == "data_snapshot_userstats_with_bbls"
+
+
+def test_refresh_snapshot_raises_error_if_snapshots_are_unsupported():
+    download = strict_get_data_download("userstats")._replace(snapshot=None)
+    with pytest.raises(ValueError, match="data download does not support snapshots"):
+        snapshots.refresh_snapshot(download)
+
+
+def test_downloads_use_live_data_without_snapshot(onboarding_info):
+    assert get_userstats().get_snapshot() is None
+    assert len(get_rows()) == 1
+
+
+def test_downloads_are_served_from_snapshot(onboarding_info):
+    snapshot = snapshots.refresh_snapshot(get_userstats())
+    assert snapshot.row_count == 1
+    assert snapshot.full_refresh_at == snapshot.refreshed_at
+    assert get_userstats().get_snapshot() == snapshot
+
+    OnboardingInfoFactory()
+    assert len(get_rows()) == 1
+
+    snapshots.refresh_snapshot(get_userstats())
+    assert len(get_rows()) == 2
+
+
+def test_snapshots_are_refreshed_incrementally(onboarding_info):
+    full_refresh_at = snapshots.refresh_snapshot(get_userstats()).full_refresh_at
+    onboarding_info.needs_repairs = True
+    onboarding_info.save()
+
+    snapshot = snapshots.refresh_snapshot(get_userstats())
+    assert snapshot.full_refresh_at == full_refresh_at
+    assert snapshot.refreshed_at > full_refresh_at
+    assert [row["needs_repairs"] for row in get_rows()] == [True]
+
+
+def test_deletions_are_picked_up_by_full_refreshes(onboarding_info):
+    snapshots.refresh_snapshot(get_userstats())
+    onboarding_info.user.delete()
+
+    snapshots.refresh_snapshot(get_userstats())
+    assert len(get_rows()) == 1
+
+    snapshots.refresh_snapshot(get_userstats(), full=True)
+    assert get_rows() == []
+
+
+def test_full_refreshes_happen_periodically(onboarding_info, settings):
+    settings.DATA_SNAPSHOT_FULL_REFRESH_HOURS = 0
+    first = snapshots.refresh_snapshot(get_userstats()).full_refresh_at
+    assert snapshots.refresh_snapshot(get_userstats()).full_refresh_at > first
+
+
+def test_refresh_all_snapshots_works(onboarding_info):
+    assert sorted(s.slug for s in snapshots.refresh_all_snapshots()) == [
+        "userstats",
+        "userstats-with-bbls",
+    ]
+
+
+def test_task_works(onboarding_info):
+    tasks.refresh_data_snapshots.delay()
+    assert DataSnapshot.objects.count() == 2
+
+
+def test_command_works(onboarding_info):
+    out = StringIO()
+    call_command("refreshsnapshots", "userstats", stdout=out)
+    assert out.getvalue() == "Refreshed userstats snapshot, which has 1 row(s).\n"
+    assert list(DataSnapshot.objects.values_list("slug", flat=True)) == ["userstats"]
+
+
+def test_snapshot_freshness_is_shown_on_index_page(outreach_client, onboarding_info):
+    res = outreach_client.get("/admin/download-data/")
+    assert b"last refreshed" not in res.content
+
+    snapshots.refresh_snapshot(get_userstats())
+    res = outreach_client.get("/admin/download-data/")
+    assert b"last refreshed" in res.content
+
+
+def download(client, fmt: str) -> bytes:
+    res = client.get(f"/admin/download-data/userstats.{fmt}")
+    assert res.status_code == 200
+    return b"".join(res.streaming_content)
+
+
+def test_snapshot_csv_matches_live_csv(onboarding_info, outreach_client):
+    live = download(outreach_client, "csv")
+    snapshots.refresh_snapshot(get_userstats())
+    assert download(outreach_client, "csv") == live
+
+
+def test_snapshot_json_matches_live_json(onboarding_info, outreach_client):
+    live = download(outreach_client, "json")
+    snapshots.refresh_snapshot(get_userstats())
+    assert json.loads(download(outreach_client, "json")) == json.loads(live)
@@ -4,12 +4,12 @@ import re
 from django.core.management.base import BaseCommand
 from django.core.management import call_command
 from django.conf import settings
-from django.db import connections, connection
+from django.db import connections
 from temba_client.v2 import TembaClient, Run
 
 from rapidpro import rapidpro_util
 from dwh import models
-from dwh.util import uuid_from_url, BatchWriter, iter_cursor_dicts
+from dwh.util import uuid_from_url, BatchWriter, StageTimer, copy_query_results
 from hpaction.models import DocusignEnvelope, HP_DOCUSIGN_STATUS_CHOICES
 
 
@@ -253,53 +253,54 @@ class Command(BaseCommand):
             ],
         )
 
-        with analytics.writer.atomic_transaction(using=settings.DWH_DATABASE, wipe=True):
-            analytics.process_rh_requests(
-                rh,
-                error_nodes=[
-                    NodeDesc(r"^Sorry", expected=2),
-                    NodeDesc(r"^Oops"),
-                ],
-            )
-
-            analytics.process_rh_followups(
-                rhf1,
-                yes_nodes=NodeDesc(r"^That’s great"),
-                no_nodes=NodeDesc(r"^No worries"),
-            )
-
-            analytics.process_rh_followups(
-                rhf2,
-                yes_nodes=NodeDesc(r"^That’s great"),
-                no_nodes=NodeDesc(r"^We're sorry to hear"),
-            )
+        with StageTimer("RapidPro runs") as stage:
+            with analytics.writer.atomic_transaction(using=settings.DWH_DATABASE, wipe=True):
+                analytics.process_rh_requests(
+                    rh,
+                    error_nodes=[
+                        NodeDesc(r"^Sorry", expected=2),
+                        NodeDesc(r"^Oops"),
+                    ],
+                )
+
+                analytics.process_rh_followups(
+                    rhf1,
+                    yes_nodes=NodeDesc(r"^That’s great"),
+                    no_nodes=NodeDesc(r"^No worries"),
+                )
+
+                analytics.process_rh_followups(
+                    rhf2,
+                    yes_nodes=NodeDesc(r"^That’s great"),
+                    no_nodes=NodeDesc(r"^We're sorry to hear"),
+                )
+            stage.rows = analytics.writer.num_written
 
     def load_online_rent_history_requests(self):
         print("Processing online rent history requests.")
-        writer = BatchWriter(models.OnlineRentHistoryRequest)
-        with connection.cursor() as cursor:
-            cursor.execute(
+        with StageTimer("Online rent history requests") as stage:
+            stage.rows = copy_query_results(
+                models.OnlineRentHistoryRequest,
                 """
                 SELECT rh.created_at, rapidpro_contact.uuid AS user_uuid
                 FROM rh_rentalhistoryrequest AS rh
                 LEFT JOIN rapidpro_contact ON rh.phone_number = rapidpro_contact.phone_number
-                """
+                """,
+                using=settings.DWH_DATABASE,
+                wipe=True,
             )
-            with writer.atomic_transaction(using=settings.DWH_DATABASE, wipe=True):
-                for row_dict in iter_cursor_dicts(cursor):
-                    req = models.OnlineRentHistoryRequest(**row_dict)
-                    writer.write(req)
 
     def load_loc_requests(self):
         print("Processing letter of complaint requests.")
-        writer = BatchWriter(models.LetterOfComplaintRequest)
         kwargs = {f"{name}_uuid": uuid_from_url(url) for (name, url) in LOC_GROUP_URLS.items()}
-        with connection.cursor() as cursor:
-            cursor.execute(LOC_SQLFILE.read_text(), kwargs)
-            with writer.atomic_transaction(using=settings.DWH_DATABASE, wipe=True):
-                for row_dict in iter_cursor_dicts(cursor):
-                    req = models.LetterOfComplaintRequest(**row_dict)
-                    writer.write(req)
+        with StageTimer("Letter of complaint requests") as stage:
+            stage.rows = copy_query_results(
+                models.LetterOfComplaintRequest,
+                LOC_SQLFILE.read_text(),
+                kwargs,
+                using=settings.DWH_DATABASE,
+                wipe=True,
+            )
 
     def load_ehpa_signings(self):
         print("Processing EHPA signings.")
@@ -307,9 +308,11 @@ class Command(BaseCommand):
         signings = DocusignEnvelope.objects.filter(
             status=HP_DOCUSIGN_STATUS_CHOICES.SIGNED,
         )
-        with writer.atomic_transaction(using=settings.DWH_DATABASE, wipe=True):
-            for signing in signings:
-                writer.write(models.EmergencyHPASigning(created_at=signing.created_at))
+        with StageTimer("EHPA signings") as stage:
+            with writer.atomic_transaction(using=settings.DWH_DATABASE, wipe=True):
+                for signing in signings.iterator():
+                    writer.write(models.EmergencyHPASigning(created_at=signing.created_at))
+            stage.rows = writer.num_written
 
     def handle(self, *args, **options):
         skip_online_rent_history: bool = options["skip_online_rent_history"]
@@ -17,7 +17,7 @@ MY_DIR = Path(__file__).parent.resolve()
 FLOWS_DIR = MY_DIR / "rapidpro_flows"
 
 
-def test_it_does_not_explode(db, django_file_storage):
+def test_it_does_not_explode(db, django_file_storage, capsys):
     rhr = RentalHistoryRequestFactory.create()
     LetterRequestFactory.create(user=rhr.user)
     DocusignEnvelopeFactory.create(
@@ -28,6 +28,9 @@ def test_it_does_not_explode(db, django_file_storage):
     assert OnlineRentHistoryRequest.objects.all().count() == 1
     assert LetterOfComplaintRequest.objects.all().count() == 1
     assert EmergencyHPASigning.objects.all().count() == 1
+    out = capsys.readouterr().out
+    assert "Letter of complaint requests: processed 1 rows in" in out
+    assert "rows/sec" in out
 
 
 class TestFlow:
@@ -0,0 +1,59 @@
+import datetime
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from dwh.models import OnlineRentHistoryRequest
+from dwh.util import CsvRowReader, copy_query_results, copy_rows, iter_cursor_dicts
+
+
+class TestCsvRowReader:
+    def test_it_reads_everything(self):
+        reader = CsvRowReader([(1, None, "a,b"), ('x"y', "", 3)])
+        assert reader.read() == '"1",,"a,b"\n"x""y","","3"\n'
+        assert reader.read() == ""
+        assert reader.row_count == 2
+
+    def test_it_reads_in_chunks(self):
+        reader = CsvRowReader([("boop",), ("jones",)])
+        chunks = list(iter(lambda: reader.read(3), ""))
+        assert chunks == ['"bo', 'op"', '\n"j', "one", 's"\n']
+        assert reader.row_count == 2
+
+
+def test_iter_cursor_dicts_works(db):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 AS a, 'boop' AS b UNION ALL SELECT 2, 'jones'")
+        assert list(iter_cursor_dicts(cursor, itersize=1)) == [
+            {"a": 1, "b": "boop"},
+            {"a": 2, "b": "jones"},
+        ]
+
+
+def test_copy_rows_works(db):
+    created_at = datetime.datetime(2020, 1, 2, tzinfo=datetime.timezone.utc)
+    count = copy_rows(
+        OnlineRentHistoryRequest,
+        ["created_at", "user_uuid"],
+        [(created_at, None), (created_at, "boop")],
+        using=settings.DWH_DATABASE,
+    )
+    assert count == 2
+    reqs = OnlineRentHistoryRequest.objects.order_by("user_uuid")
+    assert [(r.created_at, r.user_uuid) for r in reqs] == [
+        (created_at, "boop"),
+        (created_at, None),
+    ]
+
+
+def test_copy_query_results_works(db):
+    OnlineRentHistoryRequest.objects.create(created_at=timezone.now(), user_uuid="old")
+    count = copy_query_results(
+        OnlineRentHistoryRequest,
+        "SELECT NOW() AS created_at, %(uuid)s AS user_uuid",
+        {"uuid": "new"},
+        using=settings.DWH_DATABASE,
+        wipe=True,
+    )
+    assert count == 1
+    assert [r.user_uuid for r in OnlineRentHistoryRequest.objects.all()] == ["new"]
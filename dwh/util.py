@@ -1,6 +1,14 @@
-from typing import List, Any
+from typing import Iterable, List, Any, Optional, Sequence
 from contextlib import contextmanager
-from django.db import transaction
+import tempfile
+import time
+from django.db import connections, transaction, DEFAULT_DB_ALIAS
+
+from project.util.server_side_cursor import (
+    DEFAULT_ITERSIZE,
+    get_columns_and_rows,
+    server_side_cursor,
+)
 
 
 def uuid_from_url(url: str) -> str:
@@ -18,17 +26,165 @@ def uuid_from_url(url: str) -> str:
     return url.split("/")[-2]
 
 
-def iter_cursor_dicts(cursor):
+def iter_cursor_dicts(cursor, itersize: int = DEFAULT_ITERSIZE):
     """
-    Return an iterator over the dict representations of the given cursor's rows.
+    Return an iterator over the dict representations of the given cursor's rows,
+    which are fetched `itersize` at a time.
     """
 
-    columns = [column.name for column in cursor.description]
+    columns, rows = get_columns_and_rows(cursor, itersize)
 
-    for row in cursor.fetchall():
+    for row in rows:
         yield dict(zip(columns, row))
 
 
+def to_csv_field(value: Any) -> str:
+    """
+    Encode the given value as a field of a CSV row for Postgres' COPY
+    command. Everything but None is quoted, since Postgres treats unquoted
+    empty fields as NULL:
+
+        >>> to_csv_field(None)
+        ''
+        >>> to_csv_field('')
+        '""'
+        >>> to_csv_field('a"b')
+        '"a""b"'
+        >>> to_csv_field(5)
+        '"5"'
+    """
+
+    if value is None:
+        return ""
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+class CsvRowReader:
+    """
+    A read-only file-like object that encodes the given rows as CSV
+    on-demand, for passing to psycopg2's `copy_expert()`.
+    """
+
+    def __init__(self, rows: Iterable[Sequence[Any]]):
+        self.rows = iter(rows)
+        self.buffer = ""
+        self.row_count = 0
+
+    def read(self, size: int = -1) -> str:
+        while size < 0 or len(self.buffer) < size:
+            row = next(self.rows, None)
+            if row is None:
+                break
+            self.row_count += 1
+            self.buffer += ",".join(map(to_csv_field, row)) + "\n"
+        if size < 0:
+            size = len(self.buffer)
+        result, self.buffer = self.buffer[:size], self.buffer[size:]
+        return result
+
+
+# The number of characters of CSV to read from a CsvRowReader at once.
+COPY_CHUNK_SIZE = 65536
+
+
+def copy_rows(
+    model_class,
+    columns: List[str],
+    rows: Iterable[Sequence[Any]],
+    using: str,
+    spool: bool = False,
+) -> int:
+    """
+    Load the given rows, whose values are for the given model fields,
+    into the model's table via Postgres' COPY command, returning the
+    number of rows loaded.
+
+    This is much faster than creating model instances and saving them,
+    and doesn't require the rows to be held in memory. If `spool` is
+    true, the rows are first written to a temporary file, which is needed
+    if they're coming from a server-side cursor on the same connection.
+    """
+
+    quote_name = connections[using].ops.quote_name
+    db_columns = [quote_name(model_class._meta.get_field(name).column) for name in columns]
+    sql = (
+        f"COPY {quote_name(model_class._meta.db_table)} ({', '.join(db_columns)}) "
+        f"FROM STDIN WITH (FORMAT csv)"
+    )
+    reader = CsvRowReader(rows)
+    with connections[using].cursor() as cursor:
+        if not spool:
+            cursor.copy_expert(sql, reader, size=COPY_CHUNK_SIZE)
+            return reader.row_count
+        with tempfile.SpooledTemporaryFile(max_size=COPY_CHUNK_SIZE * 64, mode="w+") as f:
+            for chunk in iter(lambda: reader.read(COPY_CHUNK_SIZE), ""):
+                f.write(chunk)
+            f.seek(0)
+            cursor.copy_expert(sql, f, size=COPY_CHUNK_SIZE)
+    return reader.row_count
+
+
+def copy_query_results(
+    model_class,
+    sql: str,
+    params: Optional[Any] = None,
+    using: str = DEFAULT_DB_ALIAS,
+    source: str = DEFAULT_DB_ALIAS,
+    wipe: bool = False,
+) -> int:
+    """
+    Load the results of the given query on the `source` database into
+    the given model's table on the `using` database via Postgres' COPY
+    command, returning the number of rows loaded. The query's column
+    names must be the names of the model's fields.
+
+    The results are streamed from a server-side cursor. If `wipe` is
+    true, the model's existing rows will be deleted first, in the same
+    transaction as the load.
+    """
+
+    with server_side_cursor(using=source) as source_cursor:
+        source_cursor.execute(sql, params)
+        columns, rows = get_columns_and_rows(source_cursor)
+        with transaction.atomic(using=using):
+            if wipe:
+                model_class.objects.all().delete()
+            # We can't fetch from a server-side cursor while a COPY is in
+            # progress on the same connection.
+            return copy_rows(model_class, columns, rows, using, spool=source == using)
+
+
+class StageTimer:
+    """
+    A context manager that reports how many rows per second an ETL
+    stage processed, e.g.:
+
+        >>> import itertools
+        >>> fake_clock = itertools.count(step=2).__next__
+        >>> with StageTimer("Boop", clock=fake_clock) as stage:
+        ...     stage.rows = 10
+        Boop: processed 10 rows in 2.00s (5 rows/sec).
+    """
+
+    def __init__(self, name: str, clock=time.monotonic):
+        self.name = name
+        self.clock = clock
+        self.rows = 0
+
+    def __enter__(self) -> "StageTimer":
+        self.start = self.clock()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            seconds = self.clock() - self.start
+            rate = self.rows / seconds if seconds > 0 else 0
+            print(
+                f"{self.name}: processed {self.rows} rows in {seconds:.2f}s "
+                f"({rate:.0f} rows/sec)."
+            )
+
+
 class BatchWriter:
     """
     A context manager for writing out Django models in bulk batches, to
@@ -41,6 +197,7 @@ class BatchWriter:
         self.batch_size = batch_size
         self.ignore_conflicts = ignore_conflicts
         self.silent = silent
+        self.num_written = 0
 
     @contextmanager
     def atomic_transaction(self, using=None, wipe=False):
@@ -64,6 +221,7 @@ class BatchWriter:
                 self.models,
                 ignore_conflicts=self.ignore_conflicts,
             )
+            self.num_written += len(self.models)
             self.models = []
 
     def __enter__(self):
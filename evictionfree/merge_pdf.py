@@ -31,6 +31,35 @@ def append_to_content_stream(original: ContentStream, added) -> ContentStream:
     return result
 
 
+def merge_resources(res1, res2, resource: str) -> Tuple[DictionaryObject, Dict[str, NameObject]]:
+    """
+    Merge the given type of resource from two resource dictionaries,
+    renaming any of the second dictionary's resources whose names conflict
+    with the first's.
+
+    This is like `PyPDF2.pdf.PageObject._mergeResources()`, except that
+    conflicting resources are renamed deterministically rather than with
+    random UUIDs, so that merging the same pages always results in the
+    same PDF.
+    """
+
+    new_res = DictionaryObject()
+    new_res.update(res1.get(resource, DictionaryObject()).getObject())
+    page2_res = res2.get(resource, DictionaryObject()).getObject()
+    rename: Dict[str, NameObject] = {}
+    for key in list(page2_res.keys()):
+        if key in new_res and new_res.raw_get(key) != page2_res.raw_get(key):
+            i = 1
+            while NameObject(f"{key}-{i}") in new_res or NameObject(f"{key}-{i}") in page2_res:
+                i += 1
+            new_name = NameObject(f"{key}-{i}")
+            rename[key] = new_name
+            new_res[new_name] = page2_res[key]
+        elif key not in new_res:
+            new_res[key] = page2_res.raw_get(key)
+    return new_res, rename
+
+
 def merge_page(pdf, page_number: int, page2, page2transformation=None, ctm=None, expand=False):
     """
     Merge the given page number of the given PDF with another page.
@@ -70,7 +99,7 @@ def merge_page(pdf, page_number: int, page2, page2transformation=None, ctm=None,
         "/Shading",
         "/Properties",
     ):
-        new, newrename = PageObject._mergeResources(originalResources, page2Resources, res)
+        new, newrename = merge_resources(originalResources, page2Resources, res)
         if new:
             newResources[NameObject(res)] = new
             rename.update(newrename)
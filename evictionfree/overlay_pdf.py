@@ -1,5 +1,5 @@
 from typing import Dict, List, NamedTuple, Optional, Union
-from threading import Lock
+import threading
 from pathlib import Path
 from io import BytesIO
 from PyPDF2.generic import NameObject, NumberObject
@@ -62,13 +62,23 @@ class Page(NamedTuple):
         return len(self.items) == 0
 
 
-_lock = Lock()
-blank_pdfs: Dict[str, PyPDF2.PdfFileReader] = {}
+# PdfFileReader isn't thread-safe: it seeks around its underlying file
+# as it lazily reads objects, and we modify the pages we get from it.
+# So rather than sharing a reader between threads, each thread gets its
+# own readers, which it reuses across overlays.
+_thread_local = threading.local()
 
 
 def get_blank_pdf(path: Path) -> PyPDF2.PdfFileReader:
+    blank_pdfs: Optional[Dict[str, PyPDF2.PdfFileReader]] = getattr(
+        _thread_local, "blank_pdfs", None
+    )
+    if blank_pdfs is None:
+        blank_pdfs = _thread_local.blank_pdfs = {}
     p = str(path)
     if p not in blank_pdfs:
+        # Note that the name of this file is used by `merge_pdf` to cache
+        # the parsed content of its pages, which are shared between threads.
         f = path.open("rb")
         blank_pdfs[p] = PyPDF2.PdfFileReader(f)
     return blank_pdfs[p]
@@ -89,24 +99,21 @@ class Document(NamedTuple):
         return BytesIO(html.write_pdf(stylesheets=[css]))
 
     def overlay_atop(self, pdf: Path) -> BytesIO:
-        # No idea how threadsafe using the same PdfFileReader is, so let's play it
-        # safe...
-        with _lock:
-            overlay_pdf = PyPDF2.PdfFileReader(self.render_pdf_bytes())
-            pdf_writer = PyPDF2.PdfFileWriter()
-            blank_pdf = get_blank_pdf(pdf)
-            for i in range(blank_pdf.numPages):
-                if i < overlay_pdf.numPages and not self.pages[i].is_blank():
-                    overlay_page = overlay_pdf.getPage(i)
-                    page = merge_pdf.merge_page(blank_pdf, i, overlay_page)
-                else:
-                    page = blank_pdf.getPage(i)
-                make_page_fields_readonly(page)
-                pdf_writer.addPage(page)
-
-            outfile = BytesIO()
-            pdf_writer.write(outfile)
-            return outfile
+        overlay_pdf = PyPDF2.PdfFileReader(self.render_pdf_bytes())
+        pdf_writer = PyPDF2.PdfFileWriter()
+        blank_pdf = get_blank_pdf(pdf)
+        for i in range(blank_pdf.numPages):
+            if i < overlay_pdf.numPages and not self.pages[i].is_blank():
+                overlay_page = overlay_pdf.getPage(i)
+                page = merge_pdf.merge_page(blank_pdf, i, overlay_page)
+            else:
+                page = blank_pdf.getPage(i)
+            make_page_fields_readonly(page)
+            pdf_writer.addPage(page)
+
+        outfile = BytesIO()
+        pdf_writer.write(outfile)
+        return outfile
 
 
 def make_page_fields_readonly(page):
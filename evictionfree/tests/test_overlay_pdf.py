@@ -1,4 +1,8 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
 from evictionfree.overlay_pdf import Checkbox, Text, Page, Document
+from evictionfree.hardship_declaration import PDF_DIR
 
 
 DOC = Document(
@@ -34,3 +38,24 @@ def test_it_renders_pdf():
 
 def test_empty_html_is_empty_str():
     assert str(Text("", 5, 10)) == ""
+
+
+def test_overlays_are_thread_safe():
+    num_threads = 8
+    blank_pdf = PDF_DIR / "hardship-declaration-v3-en.pdf"
+    docs = [
+        Document(pages=[Page(items=[Text(f"boop {i}", 5, 10)]), Page(items=[])])
+        for i in range(num_threads)
+    ]
+    expected = [doc.overlay_atop(blank_pdf).getvalue() for doc in docs]
+    barrier = threading.Barrier(num_threads)
+
+    def overlay(doc: Document) -> bytes:
+        # Make sure all our threads start overlaying at the same time.
+        barrier.wait()
+        return doc.overlay_atop(blank_pdf).getvalue()
+
+    with ThreadPoolExecutor(max_workers=num_threads) as executor:
+        results = list(executor.map(overlay, docs))
+
+    assert results == expected
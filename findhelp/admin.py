@@ -90,12 +90,6 @@ class TenantResourceAdmin(MapModelAdmin):
         "neighborhoods__name",
     ]
 
-    def save_related(self, request, form, formsets, change):
-        super().save_related(request, form, formsets, change)
-        obj = form.instance
-        obj.update_catchment_area()
-        obj.save()
-
     @admin_field(short_description="Location and catchment area", allow_tags=True)
     def location_and_catchment_area(self, obj) -> str:
         return render_admin_map(
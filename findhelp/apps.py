@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class FindhelpConfig(AppConfig):
     name = "findhelp"
+
+    def ready(self):
+        from . import signals  # noqa
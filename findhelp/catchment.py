@@ -0,0 +1,93 @@
+"""
+Computation of tenant resource catchment areas.
+
+A catchment area is the union of the geometries of all the regions a
+tenant resource serves. Those geometries can be large and detailed, so we
+union them all at once (which GEOS does via a cascaded union) rather than
+one at a time, and we keep simplified copies of them in memory, since
+the same regions tend to be shared by many resources.
+"""
+
+from threading import Lock
+from typing import Dict, Iterable, List, Optional, Tuple, Type
+from django.contrib.gis.geos import MultiPolygon
+from django.db import models
+
+from .models import (
+    Borough,
+    CommunityDistrict,
+    Neighborhood,
+    TenantResource,
+    Zipcode,
+    to_multipolygon,
+    union_geometries,
+)
+
+
+# The tolerance, in degrees, that region geometries are simplified to
+# before they're unioned. This is roughly a meter in NYC.
+SIMPLIFY_TOLERANCE = 0.00001
+
+# The regions that make up a catchment area, as (model, field name) pairs.
+REGION_FIELDS: List[Tuple[Type[models.Model], str]] = [
+    (Zipcode, "zipcodes"),
+    (Borough, "boroughs"),
+    (Neighborhood, "neighborhoods"),
+    (CommunityDistrict, "community_districts"),
+]
+
+_simplified_geometries: Dict[Tuple[str, object], MultiPolygon] = {}
+
+_lock = Lock()
+
+
+def _cache_key(model: Type[models.Model], pk: object) -> Tuple[str, object]:
+    return (model._meta.label, pk)
+
+
+def get_simplified_geometries(
+    model: Type[models.Model], pks: Iterable[object]
+) -> List[MultiPolygon]:
+    """
+    Return simplified versions of the geometries of the given regions,
+    retrieving only the ones that aren't already cached from the database.
+    """
+
+    pks = list(pks)
+    with _lock:
+        missing = [pk for pk in pks if _cache_key(model, pk) not in _simplified_geometries]
+    if missing:
+        loaded = {
+            pk: to_multipolygon(geom.simplify(SIMPLIFY_TOLERANCE, preserve_topology=True))
+            for pk, geom in model.objects.filter(pk__in=missing).values_list("pk", "geom")
+        }
+        with _lock:
+            for pk, geom in loaded.items():
+                _simplified_geometries[_cache_key(model, pk)] = geom
+    with _lock:
+        return [
+            _simplified_geometries[_cache_key(model, pk)]
+            for pk in pks
+            if _cache_key(model, pk) in _simplified_geometries
+        ]
+
+
+def invalidate_region(model: Type[models.Model], pk: object) -> None:
+    with _lock:
+        _simplified_geometries.pop(_cache_key(model, pk), None)
+
+
+def invalidate_all() -> None:
+    with _lock:
+        _simplified_geometries.clear()
+
+
+def compute_catchment_area(resource: TenantResource) -> Optional[MultiPolygon]:
+    if resource.pk is None:
+        # An unsaved resource can't have any regions yet.
+        return None
+    geometries: List[MultiPolygon] = []
+    for model, field_name in REGION_FIELDS:
+        pks = getattr(resource, field_name).values_list("pk", flat=True)
+        geometries.extend(get_simplified_geometries(model, pks))
+    return union_geometries(geometries)
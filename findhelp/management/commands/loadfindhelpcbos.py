@@ -132,6 +132,3 @@ class Command(BaseCommand):
                     boro_cd = f"{borough.code}{cb.zfill(2)}"
                     cbs.append(CommunityDistrict.objects.get(boro_cd=boro_cd))
                 tr.community_districts.set(cbs)
-
-            tr.update_catchment_area()
-            tr.save()
@@ -0,0 +1,60 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional, Tuple
+import django
+from django.contrib.gis.geos import GEOSGeometry
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from findhelp.models import TenantResource
+
+
+# A tenant resource's primary key and its catchment area as hex-encoded
+# EWKB, which (unlike a GEOSGeometry) can be passed between processes.
+CatchmentResult = Tuple[int, Optional[str]]
+
+
+def init_worker() -> None:
+    django.setup()
+
+
+def compute_catchment(pk: int) -> CatchmentResult:
+    from findhelp.catchment import compute_catchment_area
+
+    area = compute_catchment_area(TenantResource.objects.get(pk=pk))
+    return (pk, None if area is None else area.hexewkb.decode("ascii"))
+
+
+def compute_catchments(pks: List[int], workers: int) -> Iterator[CatchmentResult]:
+    if workers <= 1:
+        yield from map(compute_catchment, pks)
+        return
+
+    # Forked worker processes mustn't share our database connections.
+    connections.close_all()
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as executor:
+        yield from executor.map(compute_catchment, pks, chunksize=8)
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the catchment areas of all tenant resources. This only needs "
+        "to be run when the geometries of regions (zipcodes, boroughs, etc.) change."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="The number of processes to compute catchment areas with.",
+        )
+
+    def handle(self, *args, **options):
+        pks = list(TenantResource.objects.order_by("pk").values_list("pk", flat=True))
+        count = 0
+        for pk, hexewkb in compute_catchments(pks, options["workers"]):
+            area = None if hexewkb is None else GEOSGeometry(hexewkb)
+            TenantResource.objects.filter(pk=pk).update(catchment_area=area)
+            count += 1
+        self.stdout.write(f"Recomputed catchment areas of {count} tenant resource(s).\n")
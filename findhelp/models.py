@@ -1,8 +1,7 @@
-import itertools
 from project.util.mailing_address import STATE_KWARGS
-from typing import Tuple, Union, Iterator, Optional
+from typing import Tuple, Union, Iterable, Optional
 from django.contrib.gis.db import models
-from django.contrib.gis.geos import GEOSGeometry, Point, Polygon, MultiPolygon
+from django.contrib.gis.geos import Point, Polygon, MultiPolygon
 from django.contrib.gis.db.models.functions import Distance
 
 from project import geocoding
@@ -20,13 +19,18 @@ def to_multipolygon(geos_geom: Union[Polygon, MultiPolygon]) -> MultiPolygon:
     return geos_geom
 
 
-def union_geometries(geometries: Iterator[MultiPolygon]) -> Optional[MultiPolygon]:
-    total_area = GEOSGeometry("POINT EMPTY", srid=4326)
-    for geom in geometries:
-        total_area = total_area.union(geom)
-    if isinstance(total_area, Point):
+def union_geometries(geometries: Iterable[MultiPolygon]) -> Optional[MultiPolygon]:
+    polygons = [polygon for geom in geometries for polygon in geom]
+    if not polygons:
         return None
-    return to_multipolygon(total_area)
+    # Unioning everything at once lets GEOS do a cascaded union, which
+    # is much faster than unioning the geometries one at a time.
+    total_area = MultiPolygon(polygons, srid=4326).unary_union
+    if total_area.empty:
+        return None
+    total_area = to_multipolygon(total_area)
+    total_area.srid = 4326
+    return total_area
 
 
 class County(models.Model):
@@ -67,7 +71,9 @@ class Borough(models.Model):
 
 
 def is_lnglat_in_nyc(lnglat: Tuple[float, float]) -> bool:
-    return Borough.objects.filter(geom__contains=Point(*lnglat)).exists()
+    from . import spatial_index
+
+    return spatial_index.is_lnglat_in_nyc(lnglat)
 
 
 class Neighborhood(models.Model):
@@ -129,7 +135,21 @@ class CommunityDistrict(models.Model):
 
 
 class TenantResourceManager(models.Manager):
-    def find_best_for(self, latitude: float, longitude: float):
+    def find_best_for(self, latitude: float, longitude: float, use_spatial_index: bool = False):
+        """
+        Find the tenant resources that serve the given location, ordered
+        by their distance from it.
+
+        By default, this returns a queryset that PostGIS evaluates. If
+        `use_spatial_index` is True, the resources are instead found
+        in an in-memory spatial index and returned as a list.
+        """
+
+        if use_spatial_index:
+            from . import spatial_index
+
+            return spatial_index.find_tenant_resources(latitude, longitude)
+
         origin = Point(longitude, latitude, srid=4326)
         return (
             self.filter(
@@ -195,18 +215,10 @@ class TenantResource(models.Model):
             self.geocoded_address = ""
             self.geocoded_point = None
 
-    def iter_geometries(self) -> Iterator[MultiPolygon]:
-        regions = itertools.chain(
-            self.zipcodes.all(),
-            self.boroughs.all(),
-            self.neighborhoods.all(),
-            self.community_districts.all(),
-        )
-        for region in regions:
-            yield region.geom
-
     def update_catchment_area(self):
-        self.catchment_area = union_geometries(self.iter_geometries())
+        from .catchment import compute_catchment_area
+
+        self.catchment_area = compute_catchment_area(self)
 
     def save(self, *args, **kwargs):
         if self.address != self.geocoded_address or not self.geocoded_point:
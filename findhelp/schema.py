@@ -60,4 +60,5 @@ class FindhelpInfo:
         return TenantResource.objects.find_best_for(
             latitude=latitude,
             longitude=longitude,
+            use_spatial_index=True,
         )[:MAX_RESULTS]
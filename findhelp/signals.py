@@ -0,0 +1,85 @@
+from typing import Iterable
+from django.dispatch import receiver
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from . import catchment, spatial_index
+from .models import (
+    Borough,
+    CommunityDistrict,
+    County,
+    Neighborhood,
+    TenantResource,
+    Zipcode,
+)
+
+
+@receiver(post_save, sender=Borough)
+@receiver(post_delete, sender=Borough)
+def invalidate_borough_index(sender, **kwargs):
+    spatial_index.boroughs.invalidate()
+
+
+@receiver(post_save, sender=County)
+@receiver(post_delete, sender=County)
+def invalidate_county_index(sender, **kwargs):
+    spatial_index.counties.invalidate()
+
+
+@receiver(post_save, sender=Zipcode)
+@receiver(post_delete, sender=Zipcode)
+def invalidate_zipcode_index(sender, **kwargs):
+    spatial_index.zipcodes.invalidate()
+
+
+@receiver(post_save, sender=TenantResource)
+@receiver(post_delete, sender=TenantResource)
+def invalidate_tenant_resource_index(sender, **kwargs):
+    spatial_index.tenant_resources.invalidate()
+
+
+@receiver(post_save, sender=Zipcode)
+@receiver(post_delete, sender=Zipcode)
+@receiver(post_save, sender=Borough)
+@receiver(post_delete, sender=Borough)
+@receiver(post_save, sender=Neighborhood)
+@receiver(post_delete, sender=Neighborhood)
+@receiver(post_save, sender=CommunityDistrict)
+@receiver(post_delete, sender=CommunityDistrict)
+def invalidate_simplified_region_geometry(sender, instance, **kwargs):
+    catchment.invalidate_region(sender, instance.pk)
+
+
+def recompute_catchment_areas(resources: Iterable[TenantResource]) -> None:
+    for resource in resources:
+        resource.update_catchment_area()
+        resource.save(update_fields=["catchment_area"])
+
+
+@receiver(m2m_changed, sender=TenantResource.zipcodes.through)
+@receiver(m2m_changed, sender=TenantResource.boroughs.through)
+@receiver(m2m_changed, sender=TenantResource.neighborhoods.through)
+@receiver(m2m_changed, sender=TenantResource.community_districts.through)
+def recompute_catchment_area_on_region_change(
+    sender, instance, action, reverse, model, pk_set, **kwargs
+):
+    """
+    Recompute the catchment areas of any tenant resources whose
+    regions have actually changed.
+    """
+
+    if not reverse:
+        if action == "post_clear" or (action in ("post_add", "post_remove") and pk_set):
+            recompute_catchment_areas([instance])
+        return
+
+    # The region's set of tenant resources has been changed.
+    if action == "pre_clear":
+        # We won't know which resources were affected after they're cleared.
+        instance._tenant_resource_pks_before_clear = list(
+            instance.tenantresource_set.values_list("pk", flat=True)
+        )
+    elif action == "post_clear":
+        pks = instance.__dict__.pop("_tenant_resource_pks_before_clear", [])
+        recompute_catchment_areas(TenantResource.objects.filter(pk__in=pks))
+    elif action in ("post_add", "post_remove") and pk_set:
+        recompute_catchment_areas(TenantResource.objects.filter(pk__in=pk_set))
@@ -0,0 +1,202 @@
+"""
+In-memory spatial indexes of our region and tenant resource geometries,
+which allow us to answer point-in-polygon queries without a round-trip
+to PostGIS.
+
+Each index is built lazily, the first time it's needed, and rebuilt
+whenever a model it's built from is saved or deleted in this process.
+Because changes made in other processes can't be detected that way,
+indexes are also rebuilt once they're more than `MAX_AGE` seconds old.
+"""
+
+import copy
+import math
+import time
+from threading import Lock
+from typing import Any, Callable, Generic, Iterable, List, Optional, Tuple, TypeVar
+from django.contrib.gis.geos import GEOSGeometry, Point
+from django.contrib.gis.measure import Distance as D
+
+
+T = TypeVar("T")
+
+# The maximum number of seconds that an index may be out of date after
+# its underlying data is changed by another process.
+MAX_AGE = 10 * 60
+
+# The radius of the sphere that PostGIS's ST_DistanceSphere uses for
+# WGS 84 coordinates, in meters.
+EARTH_RADIUS = 6371008.7714
+
+# An (xmin, ymin, xmax, ymax) bounding box.
+Extent = Tuple[float, float, float, float]
+
+
+class SpatialIndex(Generic[T]):
+    """
+    An index of geometries, each associated with a value, that can be
+    queried for the values of all geometries containing a point.
+
+    Every query first checks each geometry's bounding box, which rules
+    out most of them cheaply, and then checks the remaining candidates
+    using prepared geometries.
+    """
+
+    def __init__(self, items: Iterable[Tuple[GEOSGeometry, T]]) -> None:
+        self._extents: List[Extent] = []
+        self._prepared: List[Any] = []
+        self._values: List[T] = []
+        for geom, value in items:
+            self._extents.append(geom.extent)
+            self._prepared.append(geom.prepared)
+            self._values.append(value)
+
+        # Prepared geometries build internal indexes the first time
+        # they're used, which isn't thread-safe.
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def find_containing(self, point: Point) -> List[T]:
+        """
+        Return the values of all geometries containing the given point,
+        in the order they were added to the index.
+        """
+
+        x, y = point.x, point.y
+        results: List[T] = []
+        with self._lock:
+            for (xmin, ymin, xmax, ymax), prepared, value in zip(
+                self._extents, self._prepared, self._values
+            ):
+                if xmin <= x <= xmax and ymin <= y <= ymax and prepared.contains(point):
+                    results.append(value)
+        return results
+
+
+class LazySpatialIndex(Generic[T]):
+    """
+    A spatial index that is built on first use, and rebuilt on the first
+    use after it's invalidated or becomes older than `MAX_AGE` seconds.
+    """
+
+    def __init__(self, build: Callable[[], Iterable[Tuple[GEOSGeometry, T]]]) -> None:
+        self._build = build
+        self._lock = Lock()
+        self._index: Optional[SpatialIndex[T]] = None
+        self._built_at = 0.0
+
+    def get(self) -> SpatialIndex[T]:
+        with self._lock:
+            now = time.monotonic()
+            if self._index is None or now - self._built_at >= MAX_AGE:
+                self._index = SpatialIndex(self._build())
+                self._built_at = now
+            return self._index
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._index = None
+
+
+def _iter_boroughs() -> Iterable[Tuple[GEOSGeometry, int]]:
+    from .models import Borough
+
+    return Borough.objects.values_list("geom", "code").iterator()
+
+
+def _iter_counties() -> Iterable[Tuple[GEOSGeometry, Tuple[str, str]]]:
+    from .models import County
+
+    for geom, state, name in County.objects.values_list("geom", "state", "name").iterator():
+        yield geom, (state, name)
+
+
+def _iter_zipcodes() -> Iterable[Tuple[GEOSGeometry, str]]:
+    from .models import Zipcode
+
+    return Zipcode.objects.values_list("geom", "zipcode").iterator()
+
+
+def _iter_tenant_resources() -> Iterable[Tuple[GEOSGeometry, Any]]:
+    from .models import TenantResource
+
+    for resource in TenantResource.objects.filter(catchment_area__isnull=False).iterator():
+        yield resource.catchment_area, resource
+
+
+boroughs: LazySpatialIndex[int] = LazySpatialIndex(_iter_boroughs)
+
+counties: LazySpatialIndex[Tuple[str, str]] = LazySpatialIndex(_iter_counties)
+
+zipcodes: LazySpatialIndex[str] = LazySpatialIndex(_iter_zipcodes)
+
+tenant_resources: LazySpatialIndex[Any] = LazySpatialIndex(_iter_tenant_resources)
+
+ALL_INDEXES = [boroughs, counties, zipcodes, tenant_resources]
+
+
+def invalidate_all() -> None:
+    for index in ALL_INDEXES:
+        index.invalidate()
+
+
+def sphere_distance(a: Point, b: Point) -> float:
+    """
+    Return the distance between the given WGS 84 points in meters, as
+    PostGIS's ST_DistanceSphere would calculate it.
+    """
+
+    lng1, lat1, lng2, lat2 = map(math.radians, (a.x, a.y, b.x, b.y))
+    hav = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS * math.asin(min(1.0, math.sqrt(hav)))
+
+
+def is_lnglat_in_nyc(lnglat: Tuple[float, float]) -> bool:
+    return bool(boroughs.get().find_containing(Point(*lnglat)))
+
+
+def find_county(state: str, point: Point) -> Optional[str]:
+    """
+    Return the name of the county in the given state that contains the
+    given point, if any.
+    """
+
+    for county_state, name in counties.get().find_containing(point):
+        if county_state == state:
+            return name
+    return None
+
+
+def find_zipcode(lnglat: Tuple[float, float]) -> Optional[str]:
+    results = zipcodes.get().find_containing(Point(*lnglat))
+    return results[0] if results else None
+
+
+def find_tenant_resources(latitude: float, longitude: float) -> List[Any]:
+    """
+    Return the tenant resources whose catchment areas contain the given
+    location, ordered by their distance from it. Each has a `distance`
+    attribute, just like the ones returned by
+    `TenantResource.objects.find_best_for()`.
+    """
+
+    origin = Point(longitude, latitude, srid=4326)
+    results: List[Tuple[Optional[float], Any]] = []
+    for resource in tenant_resources.get().find_containing(origin):
+        # The index's resources are shared between threads, so we'll
+        # annotate copies of them instead.
+        resource = copy.copy(resource)
+        meters: Optional[float] = None
+        if resource.geocoded_point is not None:
+            meters = sphere_distance(resource.geocoded_point, origin)
+        resource.distance = None if meters is None else D(m=meters)
+        results.append((meters, resource))
+
+    # Postgres sorts nulls last in ascending order, so we will too.
+    results.sort(key=lambda result: (result[0] is None, result[0] or 0.0))
+    return [resource for _, resource in results]
@@ -64,22 +64,11 @@ def create_tenant_resource(name="Funky Help", address="123 Funky Way", **kwargs)
     cds = kwargs.pop("community_districts", [])
     tr = TenantResource(name=name, address=address, **kwargs)
     tr.save()
-    update = False
-    if zipcodes:
-        tr.zipcodes.set(zipcodes)
-        update = True
-    if boroughs:
-        tr.boroughs.set(boroughs)
-        update = True
-    if neighborhoods:
-        tr.neighborhoods.set(neighborhoods)
-        update = True
-    if cds:
-        tr.community_districts.set(cds)
-        update = True
-    if update:
-        tr.update_catchment_area()
-        tr.save()
+    # Note that setting any of these will update the catchment area.
+    tr.zipcodes.set(zipcodes)
+    tr.boroughs.set(boroughs)
+    tr.neighborhoods.set(neighborhoods)
+    tr.community_districts.set(cds)
     return tr
 
 
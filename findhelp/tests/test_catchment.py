@@ -0,0 +1,85 @@
+from django.contrib.gis.geos import MultiPolygon, Polygon
+from django.core.management import call_command
+
+from findhelp import catchment
+from findhelp.models import TenantResource, Zipcode, to_multipolygon, union_geometries
+from .factories import POLY_1, POLY_2, create_borough, create_tenant_resource, create_zipcode
+
+
+class TestUnionGeometries:
+    def test_it_returns_none_when_empty(self):
+        assert union_geometries([]) is None
+
+    def test_it_unions_everything(self):
+        area = union_geometries(
+            [
+                to_multipolygon(POLY_1),
+                to_multipolygon(Polygon.from_bbox((0.5, 0, 1.5, 1))),
+                to_multipolygon(POLY_2),
+            ]
+        )
+        assert isinstance(area, MultiPolygon)
+        assert area.srid == 4326
+        assert area.area == 2.5
+
+
+class TestGetSimplifiedGeometries:
+    def test_it_caches_geometries(self, db, django_assert_num_queries):
+        zc = create_zipcode()
+        with django_assert_num_queries(1):
+            assert len(catchment.get_simplified_geometries(Zipcode, [zc.pk])) == 1
+        with django_assert_num_queries(0):
+            assert len(catchment.get_simplified_geometries(Zipcode, [zc.pk])) == 1
+
+    def test_it_ignores_nonexistent_regions(self, db):
+        assert catchment.get_simplified_geometries(Zipcode, [12345]) == []
+
+    def test_saving_region_invalidates_cache(self, db):
+        zc = create_zipcode()
+        catchment.get_simplified_geometries(Zipcode, [zc.pk])
+        zc.geom = to_multipolygon(POLY_2)
+        zc.save()
+        [geom] = catchment.get_simplified_geometries(Zipcode, [zc.pk])
+        assert geom.extent == (1, 1, 2, 2)
+
+
+class TestCatchmentAreaSignals:
+    def get_area(self, tr):
+        area = TenantResource.objects.get(pk=tr.pk).catchment_area
+        return area and area.area
+
+    def test_adding_and_removing_regions_updates_catchment_area(self, db):
+        zc1 = create_zipcode(zipcode="11201", geom=POLY_1)
+        zc2 = create_zipcode(zipcode="11231", geom=POLY_2)
+        tr = create_tenant_resource(zipcodes=[zc1])
+        assert self.get_area(tr) == 1
+
+        tr.zipcodes.add(zc2)
+        assert self.get_area(tr) == 2
+
+        tr.zipcodes.remove(zc1)
+        assert self.get_area(tr) == 1
+
+        tr.zipcodes.clear()
+        assert self.get_area(tr) is None
+
+    def test_changing_resources_of_region_updates_catchment_area(self, db):
+        borough = create_borough()
+        tr = create_tenant_resource()
+        assert self.get_area(tr) is None
+
+        borough.tenantresource_set.add(tr)
+        assert self.get_area(tr) == 1
+
+        borough.tenantresource_set.clear()
+        assert self.get_area(tr) is None
+
+
+def test_recompute_catchments_works(db):
+    zc = create_zipcode()
+    tr = create_tenant_resource(zipcodes=[zc])
+    TenantResource.objects.filter(pk=tr.pk).update(catchment_area=None)
+
+    call_command("recompute_catchments", "--workers", "1")
+
+    assert TenantResource.objects.get(pk=tr.pk).catchment_area.area == 1
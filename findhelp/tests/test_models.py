@@ -1,6 +1,6 @@
+from findhelp.catchment import compute_catchment_area
 from findhelp.models import (
     to_multipolygon,
-    union_geometries,
     Zipcode,
     Borough,
     Neighborhood,
@@ -102,22 +102,22 @@ class TestTenantResource:
         assert tr.geocoded_address == ""
         assert tr.geocoded_point is None
 
-    def test_iter_geometries_works(self, db):
+    def test_catchment_area_includes_all_region_types(self, db):
         tr = create_tenant_resource()
-        assert union_geometries(tr.iter_geometries()) is None
+        assert compute_catchment_area(tr) is None
 
         zc = create_zipcode()
         tr = create_tenant_resource(zipcodes=[zc])
-        assert union_geometries(tr.iter_geometries()) is not None
+        assert compute_catchment_area(tr) is not None
 
         borough = create_borough()
         tr = create_tenant_resource(boroughs=[borough])
-        assert union_geometries(tr.iter_geometries()) is not None
+        assert compute_catchment_area(tr) is not None
 
         neighborhood = create_neighborhood()
         tr = create_tenant_resource(neighborhoods=[neighborhood])
-        assert union_geometries(tr.iter_geometries()) is not None
+        assert compute_catchment_area(tr) is not None
 
         cd = create_cd()
         tr = create_tenant_resource(community_districts=[cd])
-        assert union_geometries(tr.iter_geometries()) is not None
+        assert compute_catchment_area(tr) is not None
@@ -0,0 +1,147 @@
+import time
+from typing import Callable
+from django.contrib.gis.geos import Point, Polygon
+import pytest
+
+from findhelp import spatial_index
+from findhelp.spatial_index import SpatialIndex, LazySpatialIndex, sphere_distance
+from findhelp.models import Borough, TenantResource, is_lnglat_in_nyc
+from .factories import (
+    POLY_1,
+    POLY_2,
+    create_borough,
+    create_sample_tenant_resources,
+    create_tenant_resource,
+    create_zipcode,
+)
+
+
+class TestSpatialIndex:
+    def test_it_finds_containing_geometries_in_order(self):
+        big = Polygon.from_bbox((0, 0, 2, 2))
+        index = SpatialIndex([(POLY_1, "a"), (big, "big"), (POLY_2, "b")])
+        assert len(index) == 3
+        assert index.find_containing(Point(0.5, 0.5)) == ["a", "big"]
+        assert index.find_containing(Point(1.5, 1.5)) == ["big", "b"]
+        assert index.find_containing(Point(5, 5)) == []
+
+    def test_it_does_not_consider_boundaries_to_be_contained(self):
+        index = SpatialIndex([(POLY_1, "a")])
+        assert index.find_containing(Point(1, 0.5)) == []
+
+    def test_it_checks_more_than_bounding_boxes(self):
+        triangle = Polygon(((0, 0), (1, 0), (0, 1), (0, 0)))
+        index = SpatialIndex([(triangle, "a")])
+        assert index.find_containing(Point(0.2, 0.2)) == ["a"]
+        assert index.find_containing(Point(0.9, 0.9)) == []
+
+
+class TestLazySpatialIndex:
+    def make_index(self):
+        self.builds = 0
+
+        def build():
+            self.builds += 1
+            return [(POLY_1, "a")]
+
+        return LazySpatialIndex(build)
+
+    def test_it_is_built_once(self):
+        lazy = self.make_index()
+        assert lazy.get() is lazy.get()
+        assert self.builds == 1
+
+    def test_it_is_rebuilt_when_invalidated(self):
+        lazy = self.make_index()
+        lazy.get()
+        lazy.invalidate()
+        lazy.get()
+        assert self.builds == 2
+
+    def test_it_is_rebuilt_when_too_old(self, monkeypatch):
+        monkeypatch.setattr(spatial_index, "MAX_AGE", 0)
+        lazy = self.make_index()
+        lazy.get()
+        lazy.get()
+        assert self.builds == 2
+
+
+def test_sphere_distance_works():
+    # One degree of latitude along a meridian.
+    assert int(sphere_distance(Point(0, 0), Point(0, 1))) == 111195
+
+
+def test_is_lnglat_in_nyc_notices_new_boroughs(db):
+    assert is_lnglat_in_nyc((0.5, 0.5)) is False
+    create_borough(geom=POLY_1)
+    assert is_lnglat_in_nyc((0.5, 0.5)) is True
+    Borough.objects.all().delete()
+    assert is_lnglat_in_nyc((0.5, 0.5)) is False
+
+
+def test_find_zipcode_works(db):
+    create_zipcode(zipcode="11201", geom=POLY_1)
+    create_zipcode(zipcode="11231", geom=POLY_2)
+    assert spatial_index.find_zipcode((0.5, 0.5)) == "11201"
+    assert spatial_index.find_zipcode((1.5, 1.5)) == "11231"
+    assert spatial_index.find_zipcode((5, 5)) is None
+
+
+class TestFindBestFor:
+    @pytest.fixture(autouse=True)
+    def setup_fixture(self, db, fake_geocoder):
+        create_sample_tenant_resources(db, fake_geocoder)
+
+    def find_both(self, latitude, longitude):
+        from_db = list(TenantResource.objects.find_best_for(latitude, longitude))
+        from_index = TenantResource.objects.find_best_for(
+            latitude, longitude, use_spatial_index=True
+        )
+        return from_db, from_index
+
+    @pytest.mark.parametrize("latlng", [(0.5, 0.5), (0.6, 0.5), (1.5, 1.5), (5, 5)])
+    def test_it_matches_postgis(self, latlng):
+        from_db, from_index = self.find_both(*latlng)
+        assert [r.name for r in from_index] == [r.name for r in from_db]
+        for db_result, index_result in zip(from_db, from_index):
+            assert index_result.distance.m == pytest.approx(db_result.distance.m, rel=1e-6)
+
+    def test_it_notices_changes(self, fake_geocoder):
+        fake_geocoder.register("123 Boop Way", 0.5, 0.5)
+        zc = create_zipcode(zipcode="11215", geom=POLY_1)
+        create_tenant_resource("Boop Help", "123 Boop Way", zipcodes=[zc])
+        _, from_index = self.find_both(0.5, 0.5)
+        assert from_index[0].name == "Boop Help"
+
+    def test_it_does_not_modify_indexed_resources(self):
+        first = TenantResource.objects.find_best_for(0.6, 0.5, use_spatial_index=True)[0]
+        first.name = "Blarg"
+        again = TenantResource.objects.find_best_for(0.6, 0.5, use_spatial_index=True)[0]
+        assert again.name == "Ultra Help"
+
+
+NUM_BENCHMARK_QUERIES = 200
+
+
+def get_queries_per_sec(query: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    for _ in range(NUM_BENCHMARK_QUERIES):
+        query()
+    return NUM_BENCHMARK_QUERIES / (time.perf_counter() - start)
+
+
+def test_benchmark_find_best_for(db, fake_geocoder):
+    create_sample_tenant_resources(db, fake_geocoder)
+    manager = TenantResource.objects
+
+    # Build the index before we start timing.
+    manager.find_best_for(0.6, 0.5, use_spatial_index=True)
+
+    postgis_rate = get_queries_per_sec(lambda: list(manager.find_best_for(0.6, 0.5)))
+    index_rate = get_queries_per_sec(
+        lambda: manager.find_best_for(0.6, 0.5, use_spatial_index=True)
+    )
+    print(
+        f"\nfind_best_for: {postgis_rate:,.0f} queries/sec via PostGIS, "
+        f"{index_rate:,.0f} queries/sec via spatial index ({index_rate / postgis_rate:.1f}x)."
+    )
@@ -1,5 +1,7 @@
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Set
+from graphql.backend import GraphQLCachedBackend, GraphQLCoreBackend
 
 import re
 
@@ -7,6 +9,15 @@ MY_DIR = Path(__file__).parent.resolve()
 
 FRONTEND_QUERY_DIR = MY_DIR / "lib" / "queries" / "autogen"
 
+# The queries we execute on the server come from a small, fixed
+# set of front-end code, so we'll parse each of them only once and
+# keep the parsed documents around for the lifetime of the process.
+_graphql_backend = GraphQLCachedBackend(GraphQLCoreBackend())
+
+# Queries that have already been successfully validated against
+# our schema, and therefore don't need to be validated again.
+_validated_queries: Set[str] = set()
+
 
 def find_all_graphql_fragments(query: str) -> List[str]:
     """
@@ -20,6 +31,7 @@ def find_all_graphql_fragments(query: str) -> List[str]:
     return [thing for thing in results]
 
 
+@lru_cache()
 def add_graphql_fragments(query: str) -> str:
     all_graphql = [query]
     to_find = find_all_graphql_fragments(query)
@@ -39,9 +51,18 @@ def execute_query(request, query: str, variables=None) -> Dict[str, Any]:
     # imports by code that needs to import this module.
     from project.schema import schema
 
-    result = schema.execute(query, context=request, variables=variables)
+    needs_validation = query not in _validated_queries
+    result = schema.execute(
+        query,
+        context=request,
+        variables=variables,
+        backend=_graphql_backend,
+        validate=needs_validation,
+    )
     if result.errors:
         raise Exception(result.errors)
+    if needs_validation:
+        _validated_queries.add(query)
     return result.data
 
 
@@ -90,6 +90,59 @@ export function getServerAddress(server: http.Server): AddressInfo {
   return addr;
 }
 
+/** The number of bytes used to encode the length of a frame. */
+const FRAME_HEADER_SIZE = 4;
+
+/**
+ * Encode the given payload as a length-prefixed frame, i.e. a
+ * 32-bit big-endian unsigned integer followed by the payload itself.
+ */
+export function encodeFrame(payload: Buffer): Buffer {
+  const header = Buffer.alloc(FRAME_HEADER_SIZE);
+  header.writeUInt32BE(payload.length, 0);
+  return Buffer.concat([header, payload]);
+}
+
+/**
+ * Incrementally decodes length-prefixed frames (as encoded by
+ * `encodeFrame()`) from arbitrarily-sized chunks of data.
+ */
+export class FrameDecoder {
+  private buffer: Buffer = Buffer.alloc(0);
+
+  /**
+   * Add the given chunk of data to the decoder and return
+   * any frame payloads that are now complete.
+   */
+  push(chunk: Buffer): Buffer[] {
+    const frames: Buffer[] = [];
+    this.buffer = Buffer.concat([this.buffer, chunk]);
+    while (this.buffer.length >= FRAME_HEADER_SIZE) {
+      const length = this.buffer.readUInt32BE(0);
+      const end = FRAME_HEADER_SIZE + length;
+      if (this.buffer.length < end) {
+        break;
+      }
+      frames.push(this.buffer.slice(FRAME_HEADER_SIZE, end));
+      this.buffer = this.buffer.slice(end);
+    }
+    return frames;
+  }
+}
+
+/**
+ * Decode the given frame payload as JSON, pass it to the event
+ * handler, and return the handler's response encoded as a frame.
+ */
+export function handleFrame(handler: LambdaHandler, payload: Buffer): Buffer {
+  const obj = JSON.parse(payload.toString("utf-8"));
+  if (!isPlainJsObject(obj)) {
+    throw new Error("Expected input to be a JS object!");
+  }
+  const response = handler(obj);
+  return encodeFrame(Buffer.from(JSON.stringify(response), "utf-8"));
+}
+
 /* istanbul ignore next: this is tested by integration tests. */
 export function serveLambdaOverHttp(handler: LambdaHandler) {
   const server = http.createServer(lambdaHttpHandler.bind(null, handler));
@@ -116,3 +169,27 @@ export function serveLambdaOverStdio(handler: LambdaHandler) {
       process.exit(1);
     });
 }
+
+/**
+ * Serve many events over stdin/stdout using length-prefixed frames,
+ * one response frame per event frame. The process exits when stdin
+ * is closed, or with a nonzero exit code if the handler throws, so
+ * that the parent process never reuses a worker in an unknown state.
+ */
+/* istanbul ignore next: this is tested by integration tests. */
+export function serveLambdaOverFramedStdio(handler: LambdaHandler) {
+  const decoder = new FrameDecoder();
+  process.stdin.on("data", (data: Buffer) => {
+    for (let payload of decoder.push(data)) {
+      try {
+        process.stdout.write(handleFrame(handler, payload));
+      } catch (e) {
+        console.error(e);
+        process.exit(1);
+      }
+    }
+  });
+  process.stdin.on("end", () => {
+    process.exit(0);
+  });
+}
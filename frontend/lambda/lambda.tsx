@@ -29,7 +29,11 @@ import {
 } from "../lib/app-static-context";
 import i18n from "../lib/i18n";
 import { assertNotUndefined } from "@justfixnyc/util";
-import { serveLambdaOverHttp, serveLambdaOverStdio } from "./lambda-io";
+import {
+  serveLambdaOverHttp,
+  serveLambdaOverStdio,
+  serveLambdaOverFramedStdio,
+} from "./lambda-io";
 import { setGlobalAppServerInfo } from "../lib/app-context";
 import { LambdaResponseHttpHeaders } from "./lambda-response-http-headers";
 
@@ -276,6 +280,8 @@ exports.handler = errorCatchingHandler;
 if (!module.parent) {
   if (process.argv.includes("--serve-http")) {
     serveLambdaOverHttp(errorCatchingHandler);
+  } else if (process.argv.includes("--serve-framed-stdio")) {
+    serveLambdaOverFramedStdio(errorCatchingHandler);
   } else {
     serveLambdaOverStdio(errorCatchingHandler);
   }
@@ -3,6 +3,9 @@ import {
   handleFromJSONStream,
   lambdaHttpHandler,
   getServerAddress,
+  encodeFrame,
+  FrameDecoder,
+  handleFrame,
 } from "../lambda-io";
 import { Readable } from "stream";
 import fetch from "cross-fetch";
@@ -53,6 +56,47 @@ describe("handleFromJSONStream", () => {
   });
 });
 
+describe("FrameDecoder", () => {
+  it("decodes frames split across chunks", () => {
+    const decoder = new FrameDecoder();
+    const data = Buffer.concat([
+      encodeFrame(Buffer.from("hello", "utf-8")),
+      encodeFrame(Buffer.from("there\u2026", "utf-8")),
+    ]);
+    expect(decoder.push(data.slice(0, 3))).toEqual([]);
+    expect(decoder.push(data.slice(3, 12))).toEqual([
+      Buffer.from("hello", "utf-8"),
+    ]);
+    expect(decoder.push(data.slice(12))).toEqual([
+      Buffer.from("there\u2026", "utf-8"),
+    ]);
+  });
+
+  it("decodes empty frames", () => {
+    const decoder = new FrameDecoder();
+    expect(decoder.push(encodeFrame(Buffer.alloc(0)))).toEqual([
+      Buffer.alloc(0),
+    ]);
+  });
+});
+
+describe("handleFrame()", () => {
+  const handle = (thing: any) => {
+    const decoder = new FrameDecoder();
+    const payload = Buffer.from(JSON.stringify(thing), "utf-8");
+    const [response] = decoder.push(handleFrame(handler, payload));
+    return JSON.parse(response.toString("utf-8"));
+  };
+
+  it("works", () => {
+    expect(handle({ boop: 1 })).toEqual({ event: { boop: 1 }, status: 200 });
+  });
+
+  it("raises error on bad JSON input", () => {
+    expect(() => handle(null)).toThrow("Expected input to be a JS object!");
+  });
+});
+
 describe("lambdaHttpHandler()", () => {
   let url = "http://127.0.0.1:";
   const server = createServer(lambdaHttpHandler.bind(null, handler));
@@ -0,0 +1,105 @@
+import json
+import logging
+from collections import Counter
+from pathlib import Path
+from threading import RLock
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .graphql import MY_DIR
+from .lambda_response import GraphQLQueryPrefetchInfo
+
+
+logger = logging.getLogger(__name__)
+
+# This file is generated by querybuilder from
+# frontend/lib/queries/prefetch-config.toml.
+PREFETCH_MANIFEST_PATH = MY_DIR / "lib" / "queries" / "prefetch-manifest.json"
+
+# How the GraphQL query for each path was pre-fetched, keyed by
+# (path, method) where method is either "manifest" or "two_pass".
+usage: "Counter[Tuple[str, str]]" = Counter()
+
+
+class PrefetchManifest(NamedTuple):
+    mtime: float
+    entries: Dict[Tuple[str, str], GraphQLQueryPrefetchInfo]
+
+
+_manifest: Optional[PrefetchManifest] = None
+
+_lock = RLock()
+
+
+def _parse_manifest(raw: List[Dict[str, Any]], mtime: float) -> PrefetchManifest:
+    return PrefetchManifest(
+        mtime=mtime,
+        entries={
+            (entry["site"], entry["path"]): GraphQLQueryPrefetchInfo(
+                graphql=entry["graphQL"], input=entry["input"]
+            )
+            for entry in raw
+        },
+    )
+
+
+def get_manifest(path: Optional[Path] = None) -> PrefetchManifest:
+    """
+    Return the prefetch manifest, re-reading it from disk if it has
+    changed since we last read it. If it doesn't exist (e.g. because
+    querybuilder hasn't been run), an empty manifest is returned.
+    """
+
+    global _manifest
+
+    path = path or PREFETCH_MANIFEST_PATH
+    try:
+        mtime = path.stat().st_mtime
+    except FileNotFoundError:
+        return PrefetchManifest(mtime=0.0, entries={})
+
+    with _lock:
+        if _manifest is None or _manifest.mtime != mtime:
+            _manifest = _parse_manifest(json.loads(path.read_text()), mtime)
+        return _manifest
+
+
+def get_route_path(url: str, locales: List[str]) -> str:
+    """
+    Return the path of the given URL without its locale prefix or
+    query string, e.g.:
+
+        >>> get_route_path('/en/loc/your-landlord?boop=1', ['en', 'es'])
+        '/loc/your-landlord'
+        >>> get_route_path('/dev/examples/query', ['en', 'es'])
+        '/dev/examples/query'
+        >>> get_route_path('/en', ['en', 'es'])
+        '/'
+    """
+
+    path = urlsplit(url).path
+    parts = path.split("/", 2)
+    if len(parts) > 1 and parts[1] in locales:
+        path = "/" + (parts[2] if len(parts) > 2 else "")
+    return path
+
+
+def find_query_to_prefetch(initial_props: Dict[str, Any]) -> Optional[GraphQLQueryPrefetchInfo]:
+    """
+    Return the GraphQL query that the page for the given initial
+    props is known to pre-fetch, if any.
+    """
+
+    server = initial_props["server"]
+    path = get_route_path(initial_props["initialURL"], server["enabledLocales"])
+    return get_manifest().entries.get((server["siteType"], path))
+
+
+def record_usage(initial_props: Dict[str, Any], method: str) -> None:
+    path = urlsplit(initial_props["initialURL"]).path
+    usage[(path, method)] += 1
+    if method == "two_pass":
+        logger.debug(
+            f"{path} was rendered twice to pre-fetch its GraphQL query; consider "
+            f"adding it to frontend/lib/queries/prefetch-config.toml."
+        )
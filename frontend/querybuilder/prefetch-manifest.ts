@@ -0,0 +1,131 @@
+import * as fs from "fs";
+import * as path from "path";
+import toml from "toml";
+
+import { GraphQlFile } from "./graphql-file";
+import { reportChanged, ToolError, writeFileIfChangedSync } from "./util";
+import { QUERIES_PATH } from "./config";
+
+/**
+ * Path to the configuration file that maps routes to the GraphQL
+ * queries they pre-fetch during server-side rendering.
+ */
+export const PREFETCH_CONFIG_PATH = path.join(
+  QUERIES_PATH,
+  "prefetch-config.toml"
+);
+
+/**
+ * Path to the manifest we generate from the prefetch configuration,
+ * which the server reads to pre-fetch queries before it renders a page.
+ */
+export const PREFETCH_MANIFEST_PATH = path.join(
+  QUERIES_PATH,
+  "prefetch-manifest.json"
+);
+
+export type PrefetchRouteConfig = {
+  /** The site type the route is on, e.g. "JUSTFIX". */
+  site: string;
+
+  /** The route's path, without any locale prefix. */
+  path: string;
+
+  /** The name of the GraphQL query the route pre-fetches. */
+  query: string;
+
+  /** The input to the GraphQL query, if any. */
+  input?: any;
+};
+
+export type PrefetchConfig = {
+  routes?: PrefetchRouteConfig[];
+};
+
+export type PrefetchManifestEntry = {
+  site: string;
+  path: string;
+  graphQL: string;
+  input: any;
+};
+
+/**
+ * Return the full text of the given GraphQL file along with all of
+ * its dependencies, exactly as it appears in the `graphQL` property
+ * of the TypeScript code we generate for it.
+ */
+export function getFullGraphQl(
+  file: GraphQlFile,
+  filesByName: Map<string, GraphQlFile>
+): string {
+  const parts = [file.graphQl];
+
+  file.fragments.forEach((fragmentName) => {
+    const fragment = filesByName.get(fragmentName);
+    if (!fragment) {
+      throw new ToolError(
+        `${file.graphQlFilename} refers to unknown fragment ${fragmentName}!`
+      );
+    }
+    parts.push(getFullGraphQl(fragment, filesByName));
+  });
+
+  return parts.join("\n");
+}
+
+export function loadPrefetchConfig(filename: string): PrefetchConfig {
+  const contents = fs.readFileSync(filename, { encoding: "utf-8" });
+  try {
+    return toml.parse(contents);
+  } catch (e) {
+    throw new ToolError(`Error parsing ${filename}: ${e}`);
+  }
+}
+
+export function createPrefetchManifest(
+  config: PrefetchConfig,
+  graphQlFiles: GraphQlFile[]
+): PrefetchManifestEntry[] {
+  const filesByName = new Map(graphQlFiles.map((f) => [f.basename, f]));
+
+  return (config.routes || []).map((route) => {
+    const file = filesByName.get(route.query);
+    if (!file || !file.graphQlContains(`query ${route.query}`)) {
+      throw new ToolError(
+        `Route ${route.path} refers to unknown GraphQL query ${route.query}!`
+      );
+    }
+    return {
+      site: route.site,
+      path: route.path,
+      graphQL: getFullGraphQl(file, filesByName),
+      input: route.input === undefined ? null : route.input,
+    };
+  });
+}
+
+/**
+ * Generate the prefetch manifest, returning a list of the files
+ * created (which will be empty if the manifest is unchanged).
+ */
+export function writePrefetchManifest(graphQlFiles: GraphQlFile[]): string[] {
+  const config = loadPrefetchConfig(PREFETCH_CONFIG_PATH);
+  const manifest = createPrefetchManifest(config, graphQlFiles);
+  const filesWritten: string[] = [];
+
+  if (
+    writeFileIfChangedSync(
+      PREFETCH_MANIFEST_PATH,
+      JSON.stringify(manifest, null, 2) + "\n"
+    )
+  ) {
+    filesWritten.push(PREFETCH_MANIFEST_PATH);
+  }
+
+  reportChanged(
+    filesWritten,
+    (number, s) => `Generated ${number} GraphQL prefetch manifest file${s}.`
+  );
+
+  return filesWritten;
+}
@@ -18,6 +18,7 @@ import {
   AUTOGEN_CONFIG_PATH,
 } from "./config";
 import { deleteStaleTsFiles } from "./stale-ts-files";
+import { writePrefetchManifest } from "./prefetch-manifest";
 import { AutogenContext } from "./autogen-graphql/context";
 import { loadAutogenConfig } from "./autogen-graphql/config";
 
@@ -146,8 +147,14 @@ export function main(
   const extraTsCode = generateBlankTypeLiterals(ctx);
   const filesWritten = generateGraphQlTsFiles(graphQlFiles, extraTsCode);
   const staleFiles = deleteStaleTsFiles(graphQlFiles);
-
-  filesChanged = [...filesWritten, ...staleFiles, ...filesChanged];
+  const manifestFiles = writePrefetchManifest(graphQlFiles);
+
+  filesChanged = [
+    ...filesWritten,
+    ...staleFiles,
+    ...manifestFiles,
+    ...filesChanged,
+  ];
 
   if (filesChanged.length === 0) {
     console.log(
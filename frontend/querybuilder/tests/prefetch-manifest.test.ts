@@ -0,0 +1,43 @@
+/** @jest-environment node */
+
+import { GraphQlFile } from "../graphql-file";
+import {
+  createPrefetchManifest,
+  loadPrefetchConfig,
+  PREFETCH_CONFIG_PATH,
+} from "../prefetch-manifest";
+import { ToolError } from "../util";
+
+describe("createPrefetchManifest()", () => {
+  const graphQlFiles = GraphQlFile.fromDir();
+
+  it("works with our prefetch configuration", () => {
+    const manifest = createPrefetchManifest(
+      loadPrefetchConfig(PREFETCH_CONFIG_PATH),
+      graphQlFiles
+    );
+    expect(manifest.length).toBeGreaterThan(0);
+  });
+
+  it("includes the query and defaults input to null", () => {
+    const [entry] = createPrefetchManifest(
+      {
+        routes: [
+          { site: "JUSTFIX", path: "/boop", query: "RecommendedLocLandlord" },
+        ],
+      },
+      graphQlFiles
+    );
+    expect(entry.graphQL).toContain("query RecommendedLocLandlord");
+    expect(entry.input).toBe(null);
+  });
+
+  it("raises an error on unknown queries", () => {
+    expect(() =>
+      createPrefetchManifest(
+        { routes: [{ site: "JUSTFIX", path: "/boop", query: "Blarg" }] },
+        graphQlFiles
+      )
+    ).toThrow(ToolError);
+  });
+});
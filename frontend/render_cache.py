@@ -0,0 +1,198 @@
+import json
+import time
+import hashlib
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from threading import RLock
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+from django.conf import settings
+from django.core.cache import cache
+
+from project.util.lambda_service import get_latest_mtime_for_bundle
+from .lambda_response import LambdaResponse
+
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY_PREFIX = "ssr_render_cache"
+
+
+@dataclass
+class RenderCacheStats:
+    """
+    Counts of how the render cache has been used by this process.
+    """
+
+    # Renders served from this process' in-memory cache.
+    local_hits: int = 0
+
+    # Renders served from the Django cache. Note that unless a shared
+    # backend is configured via the CACHES setting, Django's default cache
+    # is also local to this process, so these won't come from other workers.
+    shared_hits: int = 0
+
+    # Cacheable renders that weren't in either cache.
+    misses: int = 0
+
+    # Renders that weren't eligible for caching at all.
+    bypasses: int = 0
+
+
+class LocalLRUCache:
+    """
+    A small, thread-safe, in-process least-recently-used cache whose
+    entries expire after a given number of seconds.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = RLock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expiry, value = entry
+            if expiry < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, timeout: int) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + timeout, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class CachedRender(NamedTuple):
+    """
+    A server-side render, along with any GraphQL query response that
+    was pre-fetched for it. The latter needs to be passed on to the
+    client along with the render, so that the client doesn't have to
+    fetch it again.
+    """
+
+    lambda_response: LambdaResponse
+    prefetched_graphql_query_response: Optional[Dict[str, Any]]
+
+    def restore(self, initial_props: Dict[str, Any]) -> LambdaResponse:
+        if self.prefetched_graphql_query_response is not None:
+            initial_props["server"][
+                "prefetchedGraphQLQueryResponse"
+            ] = self.prefetched_graphql_query_response
+        return self.lambda_response
+
+
+stats = RenderCacheStats()
+
+local_cache = LocalLRUCache(settings.SSR_CACHE_MAX_LOCAL_ENTRIES)
+
+
+def reset() -> None:
+    """
+    Clear the in-process cache and its stats. Mostly useful for tests.
+    """
+
+    global stats
+
+    local_cache.clear()
+    stats = RenderCacheStats()
+
+
+def is_cacheable_request(request) -> bool:
+    return (
+        settings.SSR_CACHE_TIMEOUT > 0
+        and request.method in ("GET", "HEAD")
+        and not request.user.is_authenticated
+    )
+
+
+def is_cacheable_response(request, lr: LambdaResponse, csrf_token: str) -> bool:
+    if lr.status != 200 or request.session.modified:
+        return False
+
+    # Some pages embed the visitor's CSRF token in their server-rendered
+    # forms, so that they work without JavaScript. Those must never be
+    # shared with anyone else.
+    return not (
+        csrf_token and any(csrf_token in html for html in [lr.html, lr.modal_html, lr.script_tags])
+    )
+
+
+def get_cache_key(initial_props: Dict[str, Any], lambda_script: Path) -> str:
+    """
+    Return a cache key for the render of the given initial props.
+
+    The initial props already include the URL, locale, site and
+    Contentful common strings, so we hash them (minus the CSRF
+    token, which is different for every visitor) along with the
+    git revision and lambda bundle modification time.
+    """
+
+    session = {**initial_props["initialSession"], "csrfToken": None}
+    props = {**initial_props, "initialSession": session}
+    hasher = hashlib.sha256()
+    hasher.update(settings.GIT_INFO.get_version_str().encode("ascii"))
+    hasher.update(str(get_latest_mtime_for_bundle(lambda_script)).encode("ascii"))
+    hasher.update(json.dumps(props, sort_keys=True).encode("utf-8"))
+    return f"{CACHE_KEY_PREFIX}.{hasher.hexdigest()}"
+
+
+def get_or_render(
+    request,
+    initial_props: Dict[str, Any],
+    lambda_script: Path,
+    render: Callable[[], LambdaResponse],
+) -> LambdaResponse:
+    """
+    Return a cached render of the given initial props if one is
+    available and the request is eligible for caching; otherwise,
+    call `render()` and cache its result if it's safe to share with
+    other anonymous visitors.
+    """
+
+    if not is_cacheable_request(request):
+        stats.bypasses += 1
+        return render()
+
+    key = get_cache_key(initial_props, lambda_script)
+    entry: Optional[CachedRender] = local_cache.get(key)
+    if entry is not None:
+        stats.local_hits += 1
+        logger.debug(f"SSR render cache hit (local) for {initial_props['initialURL']}.")
+        return entry.restore(initial_props)
+
+    entry = cache.get(key)
+    if entry is not None:
+        stats.shared_hits += 1
+        logger.debug(f"SSR render cache hit (shared) for {initial_props['initialURL']}.")
+        local_cache.set(key, entry, settings.SSR_CACHE_TIMEOUT)
+        return entry.restore(initial_props)
+
+    lr = render()
+    csrf_token = initial_props["initialSession"].get("csrfToken", "")
+    if is_cacheable_response(request, lr, csrf_token):
+        stats.misses += 1
+        logger.debug(f"SSR render cache miss for {initial_props['initialURL']}.")
+        entry = CachedRender(
+            lambda_response=lr,
+            prefetched_graphql_query_response=initial_props["server"].get(
+                "prefetchedGraphQLQueryResponse"
+            ),
+        )
+        local_cache.set(key, entry, settings.SSR_CACHE_TIMEOUT)
+        cache.set(key, entry, settings.SSR_CACHE_TIMEOUT)
+    else:
+        stats.bypasses += 1
+    return lr
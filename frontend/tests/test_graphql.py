@@ -1,6 +1,8 @@
+from unittest.mock import patch
 import pytest
 
 from users.tests.factories import UserFactory
+from frontend import graphql
 from frontend.graphql import execute_query, get_initial_session
 from project.graphql_static_request import GraphQLStaticRequest
 
@@ -34,3 +36,12 @@ class TestGraphQLStaticRequest:
         assert session["csrfToken"] == ""
         assert session["isSafeModeEnabled"] is False
         assert request.session == {}
+
+
+def test_execute_query_only_validates_queries_once(graphql_client):
+    query = 'query { exampleQuery { hello(argument: "hi") } }'
+    graphql._validated_queries.discard(query)
+    with patch("graphql.backend.core.validate", return_value=[]) as validate:
+        execute_query(graphql_client.request, query)
+        execute_query(graphql_client.request, query)
+    assert validate.call_count == 1
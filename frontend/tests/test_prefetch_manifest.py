@@ -0,0 +1,89 @@
+import json
+from unittest.mock import patch
+import pytest
+
+from frontend import prefetch_manifest, views
+from frontend.graphql import MY_DIR
+
+
+EXAMPLE_QUERY = (MY_DIR / "lib" / "queries" / "ExampleQuery.graphql").read_text()
+
+
+@pytest.fixture
+def manifest_path(tmp_path, monkeypatch):
+    path = tmp_path / "prefetch-manifest.json"
+    monkeypatch.setattr(prefetch_manifest, "PREFETCH_MANIFEST_PATH", path)
+    prefetch_manifest.usage.clear()
+    yield path
+    prefetch_manifest.usage.clear()
+
+
+def write_manifest(path, entries):
+    path.write_text(json.dumps(entries))
+
+
+def test_missing_manifest_is_empty(manifest_path):
+    assert prefetch_manifest.get_manifest().entries == {}
+
+
+def test_manifest_is_parsed(manifest_path):
+    write_manifest(
+        manifest_path,
+        [{"site": "JUSTFIX", "path": "/boop", "graphQL": "query Boop {}", "input": None}],
+    )
+    entries = prefetch_manifest.get_manifest().entries
+    assert entries[("JUSTFIX", "/boop")].graphql == "query Boop {}"
+    assert entries[("JUSTFIX", "/boop")].input is None
+
+
+def test_find_query_to_prefetch_ignores_locale_and_site(manifest_path):
+    write_manifest(
+        manifest_path,
+        [{"site": "JUSTFIX", "path": "/boop", "graphQL": "query Boop {}", "input": None}],
+    )
+
+    def find(url, site_type="JUSTFIX"):
+        props = {
+            "initialURL": url,
+            "server": {"siteType": site_type, "enabledLocales": ["en", "es"]},
+        }
+        return prefetch_manifest.find_query_to_prefetch(props)
+
+    assert find("/en/boop?blah=1") is not None
+    assert find("/boop") is not None
+    assert find("/en/boop", site_type="NORENT") is None
+    assert find("/en/blap") is None
+
+
+class TestPagesWithPrefetchedGraphQLQueries:
+    @pytest.fixture(autouse=True)
+    def setup_fixtures(self, allow_lambda_http, db):
+        pass
+
+    def render(self, client):
+        with patch.object(views, "run_react_lambda", wraps=views.run_react_lambda) as render:
+            response = client.get("/dev/examples/query")
+        assert response.status_code == 200
+        s = "Output of example query is <code>Hello blah</code>!"
+        assert s in response.context["initial_render"]
+        return render.call_count
+
+    def test_routes_in_manifest_are_rendered_once(self, manifest_path, client):
+        write_manifest(
+            manifest_path,
+            [
+                {
+                    "site": "JUSTFIX",
+                    "path": "/dev/examples/query",
+                    "graphQL": EXAMPLE_QUERY,
+                    "input": {"input": "blah"},
+                }
+            ],
+        )
+        assert self.render(client) == 1
+        assert prefetch_manifest.usage == {("/dev/examples/query", "manifest"): 1}
+
+    def test_routes_not_in_manifest_are_rendered_twice(self, manifest_path, client):
+        write_manifest(manifest_path, [])
+        assert self.render(client) == 2
+        assert prefetch_manifest.usage == {("/dev/examples/query", "two_pass"): 1}
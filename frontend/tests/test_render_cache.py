@@ -0,0 +1,91 @@
+from unittest.mock import patch
+import pytest
+from django.core.cache import cache
+
+from frontend import render_cache, views
+from frontend.render_cache import LocalLRUCache
+from .util import react_url
+
+
+@pytest.fixture
+def ssr_cache(settings, allow_lambda_http, db):
+    settings.SSR_CACHE_TIMEOUT = 60
+    cache.clear()
+    render_cache.reset()
+    with patch.object(
+        views,
+        "run_react_lambda_with_prefetching",
+        wraps=views.run_react_lambda_with_prefetching,
+    ) as render:
+        yield render
+    render_cache.reset()
+    cache.clear()
+
+
+def test_lru_cache_evicts_least_recently_used_entries():
+    lru = LocalLRUCache(max_entries=2)
+    lru.set("a", 1, 60)
+    lru.set("b", 2, 60)
+    assert lru.get("a") == 1
+    lru.set("c", 3, 60)
+    assert lru.get("b") is None
+    assert lru.get("a") == 1
+    assert lru.get("c") == 3
+
+
+def test_lru_cache_expires_entries():
+    lru = LocalLRUCache(max_entries=2)
+    lru.set("a", 1, -1)
+    assert lru.get("a") is None
+
+
+def test_anonymous_renders_are_cached(ssr_cache, client):
+    first = client.get(react_url("/"))
+    second = client.get(react_url("/"))
+    assert first.status_code == second.status_code == 200
+    assert first.context["initial_render"] == second.context["initial_render"]
+    assert ssr_cache.call_count == 1
+    assert render_cache.stats.misses == 1
+    assert render_cache.stats.local_hits == 1
+
+
+def test_shared_cache_is_used_when_local_cache_is_empty(ssr_cache, client):
+    client.get(react_url("/"))
+    render_cache.local_cache.clear()
+    client.get(react_url("/"))
+    assert ssr_cache.call_count == 1
+    assert render_cache.stats.shared_hits == 1
+
+
+def test_different_urls_are_cached_separately(ssr_cache, client):
+    client.get(react_url("/"))
+    client.get(react_url("/login"))
+    assert ssr_cache.call_count == 2
+
+
+def test_logged_in_renders_are_not_cached(ssr_cache, admin_client):
+    admin_client.get(react_url("/"))
+    admin_client.get(react_url("/"))
+    assert ssr_cache.call_count == 2
+    assert render_cache.stats.bypasses == 2
+
+
+def test_renders_are_not_cached_when_disabled(ssr_cache, settings, client):
+    settings.SSR_CACHE_TIMEOUT = 0
+    client.get(react_url("/"))
+    client.get(react_url("/"))
+    assert ssr_cache.call_count == 2
+
+
+def test_non_200_renders_are_not_cached(ssr_cache, client):
+    client.get(react_url("/nonexistent-page"))
+    client.get(react_url("/nonexistent-page"))
+    assert ssr_cache.call_count == 2
+
+
+def test_prefetched_graphql_responses_are_cached(ssr_cache, client):
+    client.get("/dev/examples/query")
+    response = client.get("/dev/examples/query")
+    assert ssr_cache.call_count == 1
+    prefetched = response.context["initial_props"]["server"]["prefetchedGraphQLQueryResponse"]
+    assert prefetched["output"] == {"exampleQuery": {"hello": "Hello blah"}}
@@ -7,6 +7,7 @@ from django.conf import settings
 from project.justfix_environment import BASE_DIR
 from project.util.lambda_service import LambdaService
 
+from . import render_cache, prefetch_manifest
 from .graphql import execute_query
 from .lambda_response import GraphQLQueryPrefetchInfo, LambdaResponse
 from .legacy_forms import LegacyFormSubmissionError, get_legacy_form_submission
@@ -22,7 +23,31 @@ logger = logging.getLogger(__name__)
 
 lambda_service: LambdaService
 
-if settings.USE_LAMBDA_HTTP_SERVER:
+if settings.USE_LAMBDA_WORKER_POOL:
+    from project.util.lambda_worker_pool import LambdaWorkerPool
+
+    lambda_service = LambdaWorkerPool(
+        "ReactWorker",
+        LAMBDA_SCRIPT,
+        script_args=["--serve-framed-stdio"],
+        cwd=BASE_DIR,
+        size=settings.LAMBDA_WORKER_POOL_SIZE,
+        max_requests_per_worker=settings.LAMBDA_WORKER_MAX_REQUESTS,
+        max_rss_bytes=settings.LAMBDA_WORKER_MAX_RSS_MB * 1024 * 1024,
+        restart_on_script_change=settings.DEBUG,
+    )
+elif settings.USE_LAMBDA_HTTP_SERVER and settings.LAMBDA_HTTP_SERVER_REPLICAS > 1:
+    from project.util.lambda_http_client import LambdaHttpReplicaSet
+
+    lambda_service = LambdaHttpReplicaSet(
+        "ReactHttp",
+        LAMBDA_SCRIPT,
+        size=settings.LAMBDA_HTTP_SERVER_REPLICAS,
+        script_args=["--serve-http"],
+        cwd=BASE_DIR,
+        restart_on_script_change=settings.DEBUG,
+    )
+elif settings.USE_LAMBDA_HTTP_SERVER:
     from project.util.lambda_http_client import LambdaHttpClient
 
     lambda_service = LambdaHttpClient(
@@ -73,7 +98,22 @@ def run_react_lambda(initial_props, initial_render_time: int = 0) -> LambdaRespo
     return lr
 
 
+def prefetch_graphql_query(initial_props, request, pfquery: GraphQLQueryPrefetchInfo) -> None:
+    initial_props["server"]["prefetchedGraphQLQueryResponse"] = {
+        "graphQL": pfquery.graphql,
+        "input": pfquery.input,
+        "output": execute_query(request, pfquery.graphql, pfquery.input),
+    }
+
+
 def run_react_lambda_with_prefetching(initial_props, request) -> LambdaResponse:
+    manifest_query = prefetch_manifest.find_query_to_prefetch(initial_props)
+    if manifest_query:
+        # We know which GraphQL query this page will need, so we can
+        # pre-fetch it before rendering the page for the first time.
+        prefetch_graphql_query(initial_props, request, manifest_query)
+        prefetch_manifest.record_usage(initial_props, "manifest")
+
     lambda_response = run_react_lambda(initial_props)
 
     if lambda_response.status == 200 and lambda_response.graphql_query_to_prefetch:
@@ -82,12 +122,8 @@ def run_react_lambda_with_prefetching(initial_props, request) -> LambdaResponse:
         # request and re-render the page, so that the user receives it without
         # any such messages (and so the user can see all the content if their
         # JS isn't working).
-        pfquery = lambda_response.graphql_query_to_prefetch
-        initial_props["server"]["prefetchedGraphQLQueryResponse"] = {
-            "graphQL": pfquery.graphql,
-            "input": pfquery.input,
-            "output": execute_query(request, pfquery.graphql, pfquery.input),
-        }
+        prefetch_graphql_query(initial_props, request, lambda_response.graphql_query_to_prefetch)
+        prefetch_manifest.record_usage(initial_props, "two_pass")
         lambda_response = run_react_lambda(
             initial_props, initial_render_time=lambda_response.render_time
         )
@@ -137,7 +173,12 @@ def react_rendered_view(request):
         legacy_form_submission=legacy_form_submission,
     )
 
-    lambda_response = run_react_lambda_with_prefetching(initial_props, request)
+    lambda_response = render_cache.get_or_render(
+        request,
+        initial_props,
+        LAMBDA_SCRIPT,
+        lambda: run_react_lambda_with_prefetching(initial_props, request),
+    )
 
     script_tags = lambda_response.script_tags
     if lambda_response.status == 500:
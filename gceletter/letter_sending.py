@@ -26,12 +26,9 @@ logger = logging.getLogger(__name__)
 
 
 def render_pdf_bytes(html: str, css: str = None) -> bytes:
-    import weasyprint
-    from weasyprint.fonts import FontConfiguration
+    from project.util.pdf_render_context import get_pdf_render_context
 
-    font_config = FontConfiguration()
-
-    return weasyprint.HTML(string=html).write_pdf(font_config=font_config)
+    return get_pdf_render_context().render_pdf_bytes(html)
 
 
 def gceletter_pdf_response(pdf_bytes: bytes) -> FileResponse:
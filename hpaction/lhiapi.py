@@ -1,7 +1,10 @@
+from functools import lru_cache
 from typing import Union, Optional
 import logging
 from django.conf import settings
 import zeep
+import zeep.cache
+import zeep.transports
 
 from project.util.celery_util import threaded_fire_and_forget_task
 from project.util.site_util import absolute_reverse, get_site_name
@@ -24,6 +27,36 @@ def hdinfo_to_str(hdinfo: HDInfo) -> str:
     return hdinfo
 
 
+@lru_cache()
+def _get_client(wsdl: str, timeout: int, cache_path: str, cache_timeout: int) -> zeep.Client:
+    if cache_path:
+        cache: zeep.cache.Base = zeep.cache.SqliteCache(path=cache_path, timeout=cache_timeout)
+    else:
+        cache = zeep.cache.InMemoryCache(timeout=cache_timeout)
+    transport = zeep.transports.Transport(cache=cache, timeout=timeout, operation_timeout=timeout)
+    return zeep.Client(wsdl, transport=transport)
+
+
+def get_client() -> zeep.Client:
+    """
+    Return a SOAP client for Law Help Interactive's API.
+
+    Creating a client involves retrieving and parsing the API's WSDL,
+    which is slow, so clients are cached for the lifetime of the process.
+    """
+
+    return _get_client(
+        wsdl=settings.HP_ACTION_WSDL,
+        timeout=settings.HP_ACTION_TIMEOUT,
+        cache_path=settings.HP_ACTION_WSDL_CACHE_PATH,
+        cache_timeout=settings.HP_ACTION_WSDL_CACHE_TIMEOUT,
+    )
+
+
+def clear_client_cache() -> None:
+    _get_client.cache_clear()
+
+
 def get_answers_and_documents(token: UploadToken, hdinfo: HDInfo) -> Optional[HPActionDocuments]:
     """
     Given an upload token and HotDocs answers, call Law Help Interactive's
@@ -44,13 +77,9 @@ def get_answers_and_documents(token: UploadToken, hdinfo: HDInfo) -> Optional[HP
 
     hdinfo_str = hdinfo_to_str(hdinfo)
     postback_url = token.get_upload_url()
-    transport = zeep.transports.Transport(
-        timeout=settings.HP_ACTION_TIMEOUT, operation_timeout=settings.HP_ACTION_TIMEOUT
-    )
-    client = zeep.Client(f"{settings.HP_ACTION_API_ENDPOINT}?wsdl", transport=transport)
 
     try:
-        result = client.service.GetAnswersAndDocuments(
+        result = get_client().service.GetAnswersAndDocuments(
             CustomerKey=settings.HP_ACTION_CUSTOMER_KEY,
             TemplateId=settings.HP_ACTION_TEMPLATE_ID,
             HDInfo=hdinfo_str,
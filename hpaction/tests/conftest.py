@@ -3,6 +3,7 @@ from unittest.mock import patch, MagicMock
 
 from .factories import HPActionDocumentsFactory
 from ..views import SUCCESSFUL_UPLOAD_TEXT
+from .. import lhiapi
 
 
 class FakeSOAPCall:
@@ -18,6 +19,13 @@ class FakeSOAPCall:
         self.mock.side_effect = create_docs
 
 
+@pytest.fixture(autouse=True)
+def clear_lhiapi_client_cache():
+    lhiapi.clear_client_cache()
+    yield
+    lhiapi.clear_client_cache()
+
+
 @pytest.fixture
 def fake_soap_call():
     with patch("zeep.Client") as constructor_mock:
@@ -1,9 +1,46 @@
+from pathlib import Path
+from unittest.mock import patch
 from django.test import override_settings
+from lxml import etree
+import zeep.transports
 
-from .factories import UploadTokenFactory
+from .factories import UploadTokenFactory, HPActionDocumentsFactory
+from ..models import UploadToken
+from ..views import SUCCESSFUL_UPLOAD_TEXT
 from .. import lhiapi
 
 
+WSDL_PATH = Path(__file__).parent.resolve() / "lhiapi.wsdl"
+
+SOAP_RESPONSE = """\
+<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/">
+  <s:Body>
+    <GetAnswersAndDocumentsResponse xmlns="http://tempuri.org/">
+      <GetAnswersAndDocumentsResult>%s</GetAnswersAndDocumentsResult>
+    </GetAnswersAndDocumentsResponse>
+  </s:Body>
+</s:Envelope>
+"""
+
+
+class FakeSOAPResponder:
+    """
+    Pretends to be Law Help Interactive's SOAP endpoint, "uploading"
+    the documents for every request it receives.
+    """
+
+    def __init__(self, requests_mock, endpoint: str):
+        self.doc_ids = []
+        requests_mock.post(endpoint, text=self.respond)
+
+    def respond(self, request, context):
+        doc_id = etree.fromstring(request.body).findtext(".//{http://tempuri.org/}DocID")
+        self.doc_ids.append(doc_id)
+        HPActionDocumentsFactory.create(id=doc_id, user=UploadToken.objects.get(id=doc_id).user)
+        context.headers["Content-Type"] = "text/xml; charset=utf-8"
+        return SOAP_RESPONSE % SUCCESSFUL_UPLOAD_TEXT
+
+
 def test_it_returns_none_when_hp_action_is_disabled(db):
     tok = UploadTokenFactory()
     assert lhiapi.get_answers_and_documents(tok, "blah") is None
@@ -18,3 +55,39 @@ def test_it_returns_none_when_soap_call_raises_error(fake_soap_call, db):
     assert lhiapi.get_answers_and_documents(tok, "blah") is None
     tok.refresh_from_db()
     assert tok.errored is True
+
+
+@override_settings(HP_ACTION_CUSTOMER_KEY="boop", HP_ACTION_WSDL="/non-existent/lhi.wsdl")
+def test_it_returns_none_when_wsdl_cannot_be_loaded(db):
+    tok = UploadTokenFactory()
+    assert lhiapi.get_answers_and_documents(tok, "blah") is None
+    tok.refresh_from_db()
+    assert tok.errored is True
+
+
+def test_client_is_cached_until_settings_change(settings):
+    settings.HP_ACTION_WSDL = str(WSDL_PATH)
+    client = lhiapi.get_client()
+    assert lhiapi.get_client() is client
+    settings.HP_ACTION_TIMEOUT = 1
+    assert lhiapi.get_client() is not client
+    assert lhiapi.get_client().transport.load_timeout == 1
+
+
+def test_wsdl_is_only_loaded_once(db, settings, requests_mock):
+    settings.HP_ACTION_WSDL = str(WSDL_PATH)
+    settings.HP_ACTION_CUSTOMER_KEY = "boop"
+    responder = FakeSOAPResponder(requests_mock, settings.HP_ACTION_API_ENDPOINT)
+    transport_load = zeep.transports.Transport.load
+    tokens = [UploadTokenFactory(), UploadTokenFactory()]
+
+    with patch.object(
+        zeep.transports.Transport, "load", autospec=True, side_effect=transport_load
+    ) as load:
+        for token in tokens:
+            docs = lhiapi.get_answers_and_documents(token, "blah")
+            assert docs is not None
+            assert docs.id == token.id
+
+    load.assert_called_once()
+    assert responder.doc_ids == [token.id for token in tokens]
@@ -1,4 +1,5 @@
 from functools import wraps
+import time
 from django.urls import reverse
 import pytest
 
@@ -6,6 +7,7 @@ from users.tests.factories import UserFactory
 from loc.views import (
     can_we_render_pdfs,
     render_document,
+    render_pdf_bytes,
     normalize_prerendered_loc_html,
     react_render_loc_html,
     parse_comma_separated_ints,
@@ -196,3 +198,24 @@ def test_parse_comma_separated_ints_works():
     assert parse_comma_separated_ints("1,lol") == [1]
     assert parse_comma_separated_ints("") == []
     assert parse_comma_separated_ints("haha") == []
+
+
+NUM_BENCHMARK_RENDERS = 50
+
+
+@requires_pdf_rendering
+def test_benchmark_render_pdf_bytes():
+    from project.util.pdf_render_context import reset_pdf_render_context
+
+    html = normalize_prerendered_loc_html("<p>My apartment needs repairs.</p>")
+    reset_pdf_render_context()
+    times = []
+    for _ in range(NUM_BENCHMARK_RENDERS):
+        start = time.perf_counter()
+        assert render_pdf_bytes(html).startswith(b"%PDF")
+        times.append(time.perf_counter() - start)
+    cold, warm = times[0], sum(times[1:]) / len(times[1:])
+    print(
+        f"\nrender_pdf_bytes: {cold * 1000:.0f} ms cold, "
+        f"{warm * 1000:.0f} ms warm on average over {NUM_BENCHMARK_RENDERS - 1} renders."
+    )
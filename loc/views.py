@@ -42,21 +42,9 @@ def can_we_render_pdfs():
 
 
 def render_pdf_bytes(html: str, css: str = None) -> bytes:
-    import weasyprint
-    from weasyprint.fonts import FontConfiguration
+    from project.util.pdf_render_context import get_pdf_render_context
 
-    font_config = FontConfiguration()
-    font_css_str = LOC_FONTS_CSS.read_text().replace(
-        "url(./", f"url({LOC_FONTS_CSS.parent.as_uri()}/"
-    )
-    font_css = weasyprint.CSS(string=font_css_str, font_config=font_config)
-    stylesheets = [font_css]
-
-    if css is not None:
-        additional_css = weasyprint.CSS(string=css)
-        stylesheets.append(additional_css)
-
-    return weasyprint.HTML(string=html).write_pdf(stylesheets=stylesheets, font_config=font_config)
+    return get_pdf_render_context().render_pdf_bytes(html, [LOC_FONTS_CSS], css)
 
 
 def pdf_response(html: str, filename: str = ""):
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class NychaConfig(AppConfig):
     name = "nycha"
+
+    def ready(self):
+        from . import signals  # noqa
@@ -0,0 +1,108 @@
+"""
+A process-wide, in-memory index of NYCHA BBLs and the offices that
+manage them.
+
+The NYCHA data is small and only changes when `loadnycha` is run, so
+rather than querying the database every time we need to know whether
+a BBL is a NYCHA property, we load the whole thing into memory the first
+time it's needed.
+
+Whenever `loadnycha` is run, it records a new `NychaDataVersion`. We
+check the latest version at most once every `VERSION_CHECK_INTERVAL`
+seconds, reloading the index if it's changed. Changes to individual
+NYCHA properties or offices made in this process, e.g. via the admin,
+invalidate the index immediately.
+"""
+
+import time
+from threading import Lock
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from .models import NychaDataVersion, NychaProperty
+
+
+# The maximum number of seconds that the index may be out of date after
+# `loadnycha` is run in another process.
+VERSION_CHECK_INTERVAL = 60
+
+
+class NychaBblIndex(NamedTuple):
+    # The ID of the latest NychaDataVersion when the index was built, or
+    # None if `loadnycha` hasn't been run yet.
+    version: Optional[int]
+
+    bbls: FrozenSet[str]
+
+    # The IDs of the offices that manage each BBL, in ascending order.
+    office_ids: Dict[str, Tuple[int, ...]]
+
+    # The IDs of the offices that manage each (BBL, property address)
+    # pair, in ascending order.
+    office_ids_by_address: Dict[Tuple[str, str], Tuple[int, ...]]
+
+
+_index: Optional[NychaBblIndex] = None
+
+_last_checked_at = 0.0
+
+_lock = Lock()
+
+
+def get_data_version() -> Optional[int]:
+    return NychaDataVersion.objects.order_by("-id").values_list("id", flat=True).first()
+
+
+def build_index(version: Optional[int]) -> NychaBblIndex:
+    office_ids: Dict[str, Set[int]] = {}
+    office_ids_by_address: Dict[Tuple[str, str], Set[int]] = {}
+    for pad_bbl, address, office_id in NychaProperty.objects.values_list(
+        "pad_bbl", "address", "office_id"
+    ).iterator():
+        office_ids.setdefault(pad_bbl, set()).add(office_id)
+        office_ids_by_address.setdefault((pad_bbl, address), set()).add(office_id)
+    return NychaBblIndex(
+        version=version,
+        bbls=frozenset(office_ids),
+        office_ids={k: tuple(sorted(v)) for k, v in office_ids.items()},
+        office_ids_by_address={k: tuple(sorted(v)) for k, v in office_ids_by_address.items()},
+    )
+
+
+def get_index() -> NychaBblIndex:
+    """
+    Return the NYCHA BBL index, (re)loading it if needed.
+    """
+
+    global _index, _last_checked_at
+
+    now = time.monotonic()
+    index = _index
+    if index is not None and now - _last_checked_at < VERSION_CHECK_INTERVAL:
+        return index
+
+    with _lock:
+        version = get_data_version()
+        if _index is None or _index.version != version:
+            _index = build_index(version)
+        _last_checked_at = now
+        return _index
+
+
+def invalidate() -> None:
+    """
+    Make sure the index is reloaded the next time it's needed.
+    """
+
+    global _index
+
+    with _lock:
+        _index = None
+
+
+def is_nycha_bbl(pad_bbl: str) -> bool:
+    return pad_bbl in get_index().bbls
+
+
+def are_nycha_bbls(pad_bbls: Iterable[str]) -> List[bool]:
+    bbls = get_index().bbls
+    return [pad_bbl in bbls for pad_bbl in pad_bbls]
@@ -7,7 +7,8 @@ from django.db import transaction
 import pydantic
 
 from project.util.nyc import to_pad_bbl
-from nycha.models import NychaOffice, NychaProperty
+from nycha.models import NychaOffice, NychaProperty, NychaDataVersion
+from nycha import bbl_index
 
 
 MANHATTAN = "MANHATTAN"
@@ -155,6 +156,8 @@ class NychaCsvLoader:
                     for p in office.properties
                 ]
             )
+        NychaDataVersion.objects.create()
+        transaction.on_commit(bbl_index.invalidate)
         self.stdout.write(f"Done.")
 
     def report_stats(self) -> None:
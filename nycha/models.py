@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Iterable, List, Optional
 import logging
 from django.db import models
 
@@ -10,22 +10,26 @@ logger = logging.getLogger(__name__)
 
 class NychaOfficeManager(models.Manager):
     def find_for_property(self, pad_bbl: str, address: str) -> Optional["NychaOffice"]:
-        offices_for_bbl = self.filter(properties__pad_bbl=pad_bbl).distinct()
-        count = offices_for_bbl.count()
-        if count == 0:
+        from . import bbl_index
+
+        index = bbl_index.get_index()
+        office_ids = index.office_ids.get(pad_bbl)
+        if not office_ids:
             return None
-        elif count == 1:
-            return offices_for_bbl.get()
+        elif len(office_ids) == 1:
+            return self.filter(pk=office_ids[0]).first()
         else:
             addr_beginning_upper = address.split(",")[0].upper()
-            offices_for_address = offices_for_bbl.filter(properties__address=addr_beginning_upper)
-            if offices_for_address.exists():
-                return offices_for_address.first()
+            office_ids_for_address = index.office_ids_by_address.get(
+                (pad_bbl, addr_beginning_upper)
+            )
+            if office_ids_for_address:
+                return self.filter(pk=office_ids_for_address[0]).first()
             logger.info(
                 f"Multiple offices found for NYCHA BBL {pad_bbl} and "
                 f"unable to narrow by address {address}. Using the first one."
             )
-            return offices_for_bbl.first()
+            return self.filter(pk=office_ids[0]).first()
 
 
 class NychaOffice(MailingAddress):
@@ -61,5 +65,23 @@ class NychaProperty(models.Model):
     )
 
 
+class NychaDataVersion(models.Model):
+    """
+    A record of a time that NYCHA data was loaded into the database. The
+    ID of the most recent one is used as a version stamp for the data, so
+    that processes know when to reload their copies of it.
+    """
+
+    loaded_at = models.DateTimeField(auto_now_add=True)
+
+
 def is_nycha_bbl(pad_bbl: str) -> bool:
-    return NychaProperty.objects.filter(pad_bbl=pad_bbl).exists()
+    from . import bbl_index
+
+    return bbl_index.is_nycha_bbl(pad_bbl)
+
+
+def are_nycha_bbls(pad_bbls: Iterable[str]) -> List[bool]:
+    from . import bbl_index
+
+    return bbl_index.are_nycha_bbls(pad_bbls)
@@ -0,0 +1,12 @@
+from django.dispatch import receiver
+from django.db.models.signals import post_delete, post_save
+
+from . import bbl_index
+from .models import NychaOffice, NychaProperty
+
+
+@receiver(post_save, sender=NychaProperty)
+@receiver(post_delete, sender=NychaProperty)
+@receiver(post_delete, sender=NychaOffice)
+def invalidate_bbl_index(sender, **kwargs):
+    bbl_index.invalidate()
@@ -1,4 +1,13 @@
-from nycha.models import NychaOffice, is_nycha_bbl
+import pytest
+
+from nycha import bbl_index
+from nycha.models import (
+    NychaOffice,
+    NychaProperty,
+    NychaDataVersion,
+    is_nycha_bbl,
+    are_nycha_bbls,
+)
 
 
 find_for_property = NychaOffice.objects.find_for_property
@@ -28,3 +37,44 @@ class TestFindForProperty:
 def test_is_nycha_bbl_works(loaded_nycha_csv_data):
     assert is_nycha_bbl("123") is False
     assert is_nycha_bbl("2022150116") is True
+
+
+def test_are_nycha_bbls_works(loaded_nycha_csv_data):
+    assert are_nycha_bbls(["123", "2022150116", "3005380001"]) == [False, True, True]
+    assert are_nycha_bbls([]) == []
+
+
+class TestBblIndex:
+    @pytest.fixture(autouse=True)
+    def reset_index(self, loaded_nycha_csv_data):
+        bbl_index.invalidate()
+        yield
+        bbl_index.invalidate()
+
+    def test_it_is_only_loaded_once(self, django_assert_num_queries):
+        with django_assert_num_queries(2):
+            is_nycha_bbl("2022150116")
+        with django_assert_num_queries(0):
+            is_nycha_bbl("2022150116")
+            are_nycha_bbls(["123"])
+
+    def test_it_is_reloaded_only_when_version_changes(self, db, monkeypatch):
+        monkeypatch.setattr(bbl_index, "VERSION_CHECK_INTERVAL", 0)
+        assert is_nycha_bbl("2022150116") is True
+
+        # Note that this doesn't send any signals.
+        NychaProperty.objects.filter(pad_bbl="2022150116").update(pad_bbl="9999999999")
+        assert is_nycha_bbl("2022150116") is True
+
+        NychaDataVersion.objects.create()
+        assert is_nycha_bbl("2022150116") is False
+
+    def test_it_is_invalidated_when_properties_are_saved(self, db):
+        assert is_nycha_bbl("1234567890") is False
+        NychaProperty.objects.create(
+            pad_bbl="1234567890",
+            address="1 BOOP STREET",
+            development="BOOP",
+            office=NychaOffice.objects.first(),
+        )
+        assert is_nycha_bbl("1234567890") is True
@@ -1,9 +1,16 @@
+from pathlib import Path
 import datetime
-from typing import Any, Dict, Optional
+import itertools
+import json
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from django.conf import settings
 from django.core.management.base import BaseCommand
+from django.utils import timezone
 from django.utils.timezone import make_aware, utc
 
+from project import geocoding, mapbox
 from project.util.mailing_address import US_STATE_CHOICES
+from project.util.token_bucket import TokenBucket
 from onboarding.models import OnboardingInfo, BOROUGH_CHOICES
 
 
@@ -13,6 +20,24 @@ STRIP_SUFFIXES = [
 ]
 
 
+DEFAULT_BATCH_SIZE = 100
+
+DEFAULT_WORKERS = 8
+
+# The fields that geocoding an address can change, which need to be
+# written back to the database in batch mode.
+GEOCODED_FIELDS = [
+    "geocoded_address",
+    "geocoded_point",
+    "geometry",
+    "zipcode",
+    "pad_bbl",
+    "pad_bin",
+    "borough",
+    "non_nyc_city",
+    "updated_at",
+]
+
 NYC_COUNTY_BOROUGHS: Dict[str, str] = {
     "New York": BOROUGH_CHOICES.MANHATTAN,
     "Richmond": BOROUGH_CHOICES.STATEN_ISLAND,
@@ -61,6 +86,46 @@ def parse_since(value: str) -> datetime.datetime:
     return make_aware(datetime.datetime.strptime(value, "%Y-%m-%d"), timezone=utc)
 
 
+def read_checkpoint(path: Path) -> int:
+    """
+    Return the primary key of the last OnboardingInfo processed by a
+    previous batch run, or 0 if there was no previous run.
+    """
+
+    if not path.exists():
+        return 0
+    return json.loads(path.read_text())["last_pk"]
+
+
+def write_checkpoint(path: Path, last_pk: int) -> None:
+    # Write to a temporary file first, so that the checkpoint isn't
+    # corrupted if we're interrupted while writing it.
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(json.dumps({"last_pk": last_pk}))
+    tmp_path.replace(path)
+
+
+def iter_batches(qs, batch_size: int) -> Iterator[List[OnboardingInfo]]:
+    infos = qs.iterator(chunk_size=batch_size)
+    while True:
+        batch = list(itertools.islice(infos, batch_size))
+        if not batch:
+            break
+        yield batch
+
+
+def make_rate_limiters() -> Dict[str, TokenBucket]:
+    """
+    Return rate limiters for each kind of address lookup, keyed by
+    the kind of address (see `get_kind()`).
+    """
+
+    return {
+        "nyc": geocoding.make_bulk_rate_limiter(),
+        "national": mapbox.make_bulk_rate_limiter(),
+    }
+
+
 class Command(BaseCommand):
     help = "Manually verify user addresses that have no geocoding metadata."
 
@@ -90,6 +155,36 @@ class Command(BaseCommand):
                 "question."
             ),
         )
+        parser.add_argument(
+            "--batch",
+            action="store_true",
+            help=(
+                "geocode addresses concurrently in batches, only updating exact matches. "
+                "This implies --noinput."
+            ),
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f"number of users to process per batch (default {DEFAULT_BATCH_SIZE}).",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=DEFAULT_WORKERS,
+            help=(
+                f"number of concurrent geocoding lookups when running non-interactively "
+                f"(default {DEFAULT_WORKERS})."
+            ),
+        )
+        parser.add_argument(
+            "--checkpoint",
+            help=(
+                "file to record batch progress in. If it already exists, processing "
+                "will resume where the run that created it left off."
+            ),
+        )
 
     def confirm(self) -> bool:
         if self.interactive:
@@ -169,8 +264,86 @@ class Command(BaseCommand):
 
         return 0
 
+    def prefetch_addrs(
+        self, infos: Iterable[OnboardingInfo], workers: int, rate_limiters: Dict[str, TokenBucket]
+    ) -> None:
+        """
+        Look up the addresses of the given users concurrently, so that
+        verifying them will be fast because their results are cached.
+        """
+
+        nyc_texts: List[str] = []
+        national_queries: List[mapbox.AddressQuery] = []
+        for info in infos:
+            if info.non_nyc_city:
+                national_queries.append(
+                    mapbox.AddressQuery(info.address, info.non_nyc_city, info.state, info.zipcode)
+                )
+            elif info.full_nyc_address:
+                nyc_texts.append(info.full_nyc_address)
+        if not (settings.GEOCODING_SEARCH_URL and settings.GEOCODING_CACHE_TIMEOUT > 0):
+            nyc_texts = []
+        if not (settings.MAPBOX_ACCESS_TOKEN and settings.MAPBOX_CACHE_TIMEOUT > 0):
+            national_queries = []
+        if nyc_texts:
+            self.log(f"Prefetching {len(nyc_texts)} NYC address(es) from NYC GeoSearch.")
+            geocoding.search_many(nyc_texts, max_workers=workers, rate_limiter=rate_limiters["nyc"])
+        if national_queries:
+            self.log(f"Prefetching {len(national_queries)} national address(es) from Mapbox.")
+            mapbox.find_address_many(
+                national_queries, max_workers=workers, rate_limiter=rate_limiters["national"]
+            )
+
+    def geocode_for_batch(
+        self, info: OnboardingInfo, rate_limiters: Dict[str, TokenBucket]
+    ) -> bool:
+        """
+        Geocode the given user's address, which should have already been
+        prefetched, returning whether the result exactly matches it.
+        """
+
+        assert info.maybe_lookup_new_addr_metadata()
+        if info.geocoded_address and info.non_nyc_city and info.state == US_STATE_CHOICES.NY:
+            # The address may turn out to be in NYC, in which case it
+            # will be geocoded again via GeoSearch.
+            rate_limiters["nyc"].acquire()
+            self.convert_national_to_nyc_addr_if_needed(info)
+        if not info.geocoded_address:
+            return False
+        expected = get_expected_geocoded_addr(info)
+        return expected.lower() == strip_suffix(info.geocoded_address).lower()
+
+    def verify_in_batches(
+        self, qs, batch_size: int, workers: int, checkpoint: Optional[Path]
+    ) -> int:
+        last_pk = read_checkpoint(checkpoint) if checkpoint else 0
+        if last_pk:
+            self.stdout.write(f"Resuming after user with onboarding info #{last_pk}.")
+        qs = qs.filter(pk__gt=last_pk).order_by("pk")
+        rate_limiters = make_rate_limiters()
+        total_updates = 0
+
+        for batch in iter_batches(qs, batch_size):
+            self.prefetch_addrs(batch, workers, rate_limiters)
+            now = timezone.now()
+            updates: List[OnboardingInfo] = []
+            for info in batch:
+                if self.geocode_for_batch(info, rate_limiters):
+                    info.update_geocoded_point_from_geometry()
+                    info.updated_at = now
+                    updates.append(info)
+            OnboardingInfo.objects.bulk_update(updates, GEOCODED_FIELDS)
+            total_updates += len(updates)
+            if checkpoint:
+                write_checkpoint(checkpoint, batch[-1].pk)
+            self.log(
+                f"Updated {len(updates)} of {len(batch)} user(s) "
+                f"up to onboarding info #{batch[-1].pk}."
+            )
+        return total_updates
+
     def handle(self, *args, **options):
-        self.interactive = options["interactive"]
+        self.interactive = options["interactive"] and not options["batch"]
         self.verbosity = options["verbosity"]
         since: Optional[str] = options["since"]
         state: Optional[str] = options["state"]
@@ -186,6 +359,22 @@ class Command(BaseCommand):
             .order_by("-user__last_login")
         )
         self.stdout.write(f"{qs.count()} user(s) found.")
+        if options["batch"]:
+            checkpoint = options["checkpoint"]
+            try:
+                total_updates = self.verify_in_batches(
+                    qs,
+                    batch_size=options["batch_size"],
+                    workers=options["workers"],
+                    checkpoint=Path(checkpoint) if checkpoint else None,
+                )
+            except KeyboardInterrupt:
+                self.stdout.write("\nReceived SIGINT, exiting.")
+                return
+            self.stdout.write(f"{total_updates} user(s) updated.")
+            return
+        if not self.interactive:
+            self.prefetch_addrs(qs, options["workers"], make_rate_limiters())
         total_updates = 0
         for info in qs:
             try:
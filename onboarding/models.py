@@ -326,14 +326,10 @@ class OnboardingInfo(models.Model):
         return "\n".join(self.address_lines_for_mailing)
 
     def lookup_county(self) -> Optional[str]:
-        from findhelp.models import County
+        from findhelp import spatial_index
 
         if self.geocoded_point is not None:
-            county = County.objects.filter(
-                state=self.state, geom__contains=self.geocoded_point
-            ).first()
-            if county:
-                return county.name
+            return spatial_index.find_county(self.state, self.geocoded_point)
         return None
 
     def as_lob_params(self) -> Dict[str, str]:
@@ -478,3 +474,23 @@ class OnboardingInfo(models.Model):
     @admin_field(short_description="Building links", allow_tags=True)
     def get_building_links_html(self) -> str:
         return Hyperlink.join_admin_buttons(self.building_links)
+
+
+class MapboxCacheEntry(models.Model):
+    """
+    A cached response from the Mapbox Places API, which we use to
+    verify addresses.
+    """
+
+    # A hash of the request's query and arguments. We don't store the
+    # query itself, since it's usually someone's address.
+    key = models.CharField(max_length=64, primary_key=True)
+
+    # The response, as validated by `project.mapbox.MapboxResults`.
+    results = models.JSONField()
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    # When the response should no longer be used. Expired entries are
+    # purged whenever a new response is cached.
+    expires_at = models.DateTimeField(db_index=True)
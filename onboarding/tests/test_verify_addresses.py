@@ -1,7 +1,8 @@
 from datetime import date
 from io import StringIO
-from unittest.mock import patch
+from unittest.mock import ANY, MagicMock, patch
 from django.core.management import call_command
+from django.test import override_settings
 from django.utils import timezone
 import freezegun
 
@@ -9,6 +10,8 @@ import pytest
 
 from findhelp.tests.factories import CountyFactory
 from onboarding.management.commands import verify_addresses
+from onboarding.models import OnboardingInfo
+from project import geocoding, mapbox
 from project.tests.test_geocoding import EXAMPLE_SEARCH, enable_fake_geocoding
 from .factories import OnboardingInfoFactory, NationalOnboardingInfoFactory
 
@@ -151,6 +154,114 @@ def test_handle_works(db):
     ]
 
 
+class TestPrefetchAddrs:
+    @pytest.fixture(autouse=True)
+    def setup_fixture(self, settings, monkeypatch, db):
+        settings.GEOCODING_SEARCH_URL = "https://geosearch.example.com/v2/search"
+        settings.GEOCODING_CACHE_TIMEOUT = 60
+        settings.MAPBOX_ACCESS_TOKEN = "boop"
+        settings.MAPBOX_CACHE_TIMEOUT = 60
+        self.search_many = MagicMock()
+        self.find_address_many = MagicMock()
+        monkeypatch.setattr(geocoding, "search_many", self.search_many)
+        monkeypatch.setattr(mapbox, "find_address_many", self.find_address_many)
+        with override_settings(GEOCODING_SEARCH_URL="", MAPBOX_ACCESS_TOKEN=""):
+            NationalOnboardingInfoFactory(zipcode="90012")
+            OnboardingInfoFactory(user__username="boop2", user__phone_number="5551234568")
+
+    def prefetch(self):
+        cmd = make_cmd()
+        cmd.prefetch_addrs(OnboardingInfo.objects.all(), 4, verify_addresses.make_rate_limiters())
+        return cmd.stdout.getvalue()
+
+    def test_it_prefetches_addrs(self):
+        output = self.prefetch()
+        self.search_many.assert_called_once_with(
+            ["150 court street, Brooklyn"], max_workers=4, rate_limiter=ANY
+        )
+        self.find_address_many.assert_called_once_with(
+            [mapbox.AddressQuery("200 N Spring St", "Los Angeles", "CA", "90012")],
+            max_workers=4,
+            rate_limiter=ANY,
+        )
+        assert "Prefetching 1 NYC address(es)" in output
+        assert "Prefetching 1 national address(es)" in output
+
+    def test_it_does_nothing_when_caching_is_disabled(self, settings):
+        settings.GEOCODING_CACHE_TIMEOUT = 0
+        settings.MAPBOX_CACHE_TIMEOUT = 0
+        self.prefetch()
+        self.search_many.assert_not_called()
+        self.find_address_many.assert_not_called()
+
+    def test_noinput_prefetches_addrs(self):
+        call_command("verify_addresses", "--noinput", stdout=StringIO())
+        self.search_many.assert_called_once()
+        self.find_address_many.assert_called_once()
+
+    def test_batch_mode_prefetches_each_batch(self):
+        call_command("verify_addresses", "--batch", "--batch-size", "1", stdout=StringIO())
+        self.search_many.assert_called_once()
+        self.find_address_many.assert_called_once()
+
+
+class TestBatchMode:
+    @pytest.fixture(autouse=True)
+    def setup_fixture(self, db, requests_mock, settings):
+        with enable_fake_geocoding:
+            requests_mock.get(settings.GEOCODING_SEARCH_URL, json=EXAMPLE_SEARCH)
+            yield
+
+    def make_infos(self):
+        with override_settings(GEOCODING_SEARCH_URL=""):
+            exact = OnboardingInfoFactory(address_verified=False)
+            inexact = OnboardingInfoFactory(
+                user__username="boop2",
+                user__phone_number="5551234568",
+                address="123 funky street",
+            )
+        return exact, inexact
+
+    def verify(self, *args):
+        out = StringIO()
+        call_command("verify_addresses", "--batch", "--batch-size", "1", *args, stdout=out)
+        return out.getvalue()
+
+    def test_it_only_updates_exact_matches(self):
+        exact, inexact = self.make_infos()
+        assert "1 user(s) updated." in self.verify()
+        exact.refresh_from_db()
+        assert (
+            exact.geocoded_address
+            == "150 COURT STREET, Brooklyn, New York, NY, USA (via NYC GeoSearch)"
+        )
+        assert exact.geocoded_point is not None
+        inexact.refresh_from_db()
+        assert inexact.geocoded_address == ""
+
+    def test_it_resumes_from_checkpoints(self, tmp_path):
+        checkpoint = tmp_path / "checkpoint.json"
+        exact, inexact = self.make_infos()
+        verify_addresses.write_checkpoint(checkpoint, exact.pk)
+        output = self.verify("--checkpoint", str(checkpoint))
+        assert f"Resuming after user with onboarding info #{exact.pk}." in output
+        assert "0 user(s) updated." in output
+        exact.refresh_from_db()
+        assert exact.geocoded_address == ""
+        assert verify_addresses.read_checkpoint(checkpoint) == inexact.pk
+
+
+def test_read_checkpoint_returns_zero_if_file_does_not_exist(tmp_path):
+    assert verify_addresses.read_checkpoint(tmp_path / "nonexistent.json") == 0
+
+
+def test_checkpoints_can_be_written_and_read(tmp_path):
+    checkpoint = tmp_path / "checkpoint.json"
+    verify_addresses.write_checkpoint(checkpoint, 5)
+    verify_addresses.write_checkpoint(checkpoint, 10)
+    assert verify_addresses.read_checkpoint(checkpoint) == 10
+
+
 class TestConvertNationalToNycAddrIfNeeded:
     def make_national_nyc_onboarding_info(self):
         return NationalOnboardingInfoFactory(
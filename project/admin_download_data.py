@@ -4,7 +4,7 @@ from pathlib import Path
 from typing import NamedTuple, Callable, Any, Optional, List, Iterator, Dict
 from contextlib import contextmanager
 from django.http import HttpResponseNotFound, HttpResponse
-from django.db import connection, DEFAULT_DB_ALIAS
+from django.db import DEFAULT_DB_ALIAS
 from django.db.models import QuerySet
 from django.core.exceptions import PermissionDenied
 from django.shortcuts import reverse
@@ -17,7 +17,17 @@ from django.contrib.auth.models import AnonymousUser
 from users.models import JustfixUser
 from project.util.streaming_csv import generate_csv_rows, streaming_csv_response
 from project.util.streaming_json import generate_json_rows, streaming_json_response
+from project.util.streaming_arrow import (
+    ARROW_STREAM_CONTENT_TYPE,
+    PARQUET_CONTENT_TYPE,
+    generate_arrow_record_batches,
+    streaming_arrow_response,
+    streaming_parquet_response,
+)
 from project.util.data_dictionary import DataDictDocs, DataDictionary, get_data_dictionary
+from project.util.server_side_cursor import server_side_cursor, DEFAULT_ITERSIZE
+from data_snapshots.models import DataSnapshot
+from data_snapshots.snapshots import SnapshotConfig, execute_snapshot_query, get_snapshot
 
 
 logger = logging.getLogger(__name__)
@@ -27,6 +37,16 @@ logger = logging.getLogger(__name__)
 # django.db.backends.utils.CursorDebugWrapper but it feels weird to use that.
 DBCursor = Any
 
+CONTENT_TYPES = {
+    "csv": "text/csv",
+    "json": "application/json",
+    "parquet": PARQUET_CONTENT_TYPE,
+    "arrows": ARROW_STREAM_CONTENT_TYPE,
+}
+
+# The formats that data downloads can be exported in.
+DOWNLOAD_FORMATS = list(CONTENT_TYPES.keys())
+
 
 class DownloadUrl(NamedTuple):
     fmt: str
@@ -40,6 +60,11 @@ class DataDownload(NamedTuple):
     perms: List[str]
     execute_query: Callable[[DBCursor, JustfixUser], None]
 
+    # If provided, the dataset can be precomputed into a snapshot table
+    # (see the `refreshsnapshots` management command), which downloads
+    # will then be served from.
+    snapshot: Optional[SnapshotConfig] = None
+
     def _get_download_url(self, fmt: str) -> DownloadUrl:
         return DownloadUrl(
             fmt, reverse("admin:download-data", kwargs={"dataset": self.slug, "fmt": fmt})
@@ -49,24 +74,41 @@ class DataDownload(NamedTuple):
         return self._get_download_url("json").url
 
     def urls(self) -> List[DownloadUrl]:
-        return [self._get_download_url(fmt) for fmt in ["csv", "json"]]
+        return [self._get_download_url(fmt) for fmt in DOWNLOAD_FORMATS]
 
     def data_dictionary_url(self) -> str:
         return reverse("admin:download-data-dictionary", kwargs={"dataset": self.slug})
 
     @contextmanager
     def _get_cursor_and_execute_query(self, user: JustfixUser):
-        with connection.cursor() as cursor:
-            self.execute_query(cursor, user)
+        # We're using a server-side cursor so that large datasets don't
+        # need to be loaded into memory all at once.
+        with server_side_cursor() as cursor:
+            if not execute_snapshot_query(cursor, self):
+                self.execute_query(cursor, user)
             yield cursor
 
-    def generate_csv_rows(self, user: JustfixUser) -> Iterator[List[Any]]:
+    def generate_csv_rows(
+        self, user: JustfixUser, itersize: int = DEFAULT_ITERSIZE
+    ) -> Iterator[List[Any]]:
         with self._get_cursor_and_execute_query(user) as cursor:
-            yield from generate_csv_rows(cursor)
+            yield from generate_csv_rows(cursor, itersize)
 
-    def generate_json_rows(self, user: JustfixUser) -> Iterator[Dict[str, Any]]:
+    def generate_json_rows(
+        self, user: JustfixUser, itersize: int = DEFAULT_ITERSIZE
+    ) -> Iterator[Dict[str, Any]]:
         with self._get_cursor_and_execute_query(user) as cursor:
-            yield from generate_json_rows(cursor)
+            yield from generate_json_rows(cursor, itersize)
+
+    def generate_arrow_record_batches(
+        self, user: JustfixUser, itersize: int = DEFAULT_ITERSIZE
+    ) -> Iterator[Any]:
+        data_dictionary = self.get_data_dictionary(user)
+        with self._get_cursor_and_execute_query(user) as cursor:
+            yield from generate_arrow_record_batches(cursor, itersize, data_dictionary)
+
+    def get_snapshot(self) -> Optional[DataSnapshot]:
+        return get_snapshot(self)
 
     def has_data_dictionary(self) -> bool:
         return bool(self.get_data_dictionary(AnonymousUser()))
@@ -119,11 +161,9 @@ def get_available_datasets(user) -> List[DataDownload]:
 
 def _get_debug_data_response(dataset: str, fmt: str, filename: str):
     path = Path(settings.DEBUG_DATA_DIR) / f"{dataset}.{fmt}"
-    if settings.DEBUG and settings.DEBUG_DATA_DIR and path.exists():
+    if settings.DEBUG and settings.DEBUG_DATA_DIR and fmt in CONTENT_TYPES and path.exists():
         logger.info(f"Serving '{path}' as the '{dataset}' data download.")
-        response = HttpResponse(
-            path.read_bytes(), content_type={"csv": "text/csv", "json": "application/json"}[fmt]
-        )
+        response = HttpResponse(path.read_bytes(), content_type=CONTENT_TYPES[fmt])
         response["Content-Disposition"] = f'attachment; filename="{filename}"'
         return response
     return None
@@ -134,6 +174,10 @@ def _get_streaming_response(download: DataDownload, fmt: str, filename: str, use
         return streaming_csv_response(download.generate_csv_rows(user), filename)
     elif fmt == "json":
         return streaming_json_response(download.generate_json_rows(user), filename)
+    elif fmt == "parquet":
+        return streaming_parquet_response(download.generate_arrow_record_batches(user), filename)
+    elif fmt == "arrows":
+        return streaming_arrow_response(download.generate_arrow_record_batches(user), filename)
     else:
         return HttpResponseNotFound("Invalid format")
 
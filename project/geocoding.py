@@ -1,14 +1,35 @@
-from typing import Any, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+import hashlib
 import logging
 import pydantic
 import requests
 from django.conf import settings
+from django.core.cache import caches
 
 from project.util.geojson import FeatureGeometry
+from project.util.single_flight import SingleFlight
+from project.util.token_bucket import TokenBucket
 
 
 logger = logging.getLogger(__name__)
 
+# The Django cache that geocoding results are stored in. Unless a shared
+# backend is configured via the CACHES setting, this is local to each
+# process, so results aren't shared between workers.
+GEOCODING_CACHE = "default"
+
+# The default maximum number of concurrent requests that search_many()
+# will make to the geocoding service.
+SEARCH_MANY_MAX_WORKERS = 8
+
+# We reuse a single session for all our requests so that connections to
+# the geocoding service are kept alive and pooled. Note that its default
+# pool size of 10 connections is enough for all of search_many()'s workers.
+_session = requests.Session()
+
+_single_flight = SingleFlight()
+
 
 class FeatureProperties(pydantic.BaseModel):
     # The ZIP code, e.g. "11201". For some reason this isn't present in
@@ -138,15 +159,108 @@ def _geosearch_v2_to_v1(features: List[Any]):
     return features
 
 
-def search(text: str) -> Optional[List[Feature]]:
+class CachedGeocodingResult(NamedTuple):
+    """
+    The cached response of the geocoding service for a search. This
+    is wrapped in a tuple so that we can distinguish an empty list of
+    features from a cache miss.
+    """
+
+    # The JSON of the features in the response, converted to the V1 format.
+    json_features: List[Dict[str, Any]]
+
+
+def normalize_search_text(text: str) -> str:
+    """
+    Normalize the given search text so that trivially different searches
+    for the same address share cache entries, e.g.:
+
+        >>> normalize_search_text("  150  Court St,\tBrooklyn ")
+        '150 court st, brooklyn'
+    """
+
+    return " ".join(text.lower().split())
+
+
+def get_geocoding_cache_key(text: str) -> str:
+    # We hash the search text because it's user input, and some cache
+    # backends don't allow keys containing spaces or control characters.
+    # The search URL is included in case we switch to a different API.
+    key = f"{settings.GEOCODING_SEARCH_URL}\n{normalize_search_text(text)}"
+    return "geocoding-" + hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def _fetch_json_features(
+    text: str, rate_limiter: Optional[TokenBucket] = None
+) -> List[Dict[str, Any]]:
+    if rate_limiter is not None:
+        rate_limiter.acquire()
+    response = _session.get(
+        settings.GEOCODING_SEARCH_URL, params={"text": text}, timeout=settings.GEOCODING_TIMEOUT
+    )
+    if response.status_code != 200:
+        raise Exception(f"Expected 200 response, got {response.status_code}")
+    # Restructure the V2 Geosearch API response to the V1 format
+    # https://github.com/JustFixNYC/who-owns-what/issues/666
+    json_features = _geosearch_v2_to_v1(response.json()["features"])
+
+    # Make sure the response is valid before it's cached.
+    for kwargs in json_features:
+        Feature(**kwargs)
+    return json_features
+
+
+def _fetch_and_cache_json_features(
+    text: str, cache_key: str, rate_limiter: Optional[TokenBucket] = None
+) -> List[Dict[str, Any]]:
+    json_features = _fetch_json_features(text, rate_limiter)
+    if json_features:
+        timeout = settings.GEOCODING_CACHE_TIMEOUT
+    else:
+        timeout = settings.GEOCODING_NEGATIVE_CACHE_TIMEOUT
+    caches[GEOCODING_CACHE].set(cache_key, CachedGeocodingResult(json_features), timeout)
+    return json_features
+
+
+def _get_json_features(
+    text: str, use_cache: bool, rate_limiter: Optional[TokenBucket] = None
+) -> List[Dict[str, Any]]:
+    if not use_cache:
+        return _fetch_json_features(text, rate_limiter)
+
+    cache_key = get_geocoding_cache_key(text)
+    cached: Optional[CachedGeocodingResult] = caches[GEOCODING_CACHE].get(cache_key)
+    if cached is not None:
+        return cached.json_features
+
+    def run() -> List[Dict[str, Any]]:
+        # Another thread may have cached the results while we were
+        # waiting to run, so check again.
+        cached: Optional[CachedGeocodingResult] = caches[GEOCODING_CACHE].get(cache_key)
+        if cached is not None:
+            return cached.json_features
+        return _fetch_and_cache_json_features(text, cache_key, rate_limiter)
+
+    return _single_flight.run(cache_key, run)
+
+
+def search(
+    text: str, use_cache: bool = True, rate_limiter: Optional[TokenBucket] = None
+) -> Optional[List[Feature]]:
     """
     Retrieves geo search results for the given search
     criteria. For more details, see:
 
         https://geosearch.planninglabs.nyc/docs/#search
 
+    Results are cached by their normalized search text (unless
+    `use_cache` is False), and if multiple threads search for the
+    same uncached text at once, only one request is made. If a rate
+    limiter is given, it will be used to throttle any requests we
+    actually make to the geocoding service.
+
     If any errors occur, this function will log an
-    exception and return None.
+    exception and return None. Errors are never cached.
     """
 
     if not settings.GEOCODING_SEARCH_URL:
@@ -154,14 +268,7 @@ def search(text: str) -> Optional[List[Feature]]:
         return None
 
     try:
-        response = requests.get(
-            settings.GEOCODING_SEARCH_URL, {"text": text}, timeout=settings.GEOCODING_TIMEOUT
-        )
-        if response.status_code != 200:
-            raise Exception(f"Expected 200 response, got {response.status_code}")
-        # Restructure the V2 Geosearch API response to the V1 format
-        # https://github.com/JustFixNYC/who-owns-what/issues/666
-        json_features = _geosearch_v2_to_v1(response.json()["features"])
+        json_features = _get_json_features(text, use_cache, rate_limiter)
         features = [Feature(**kwargs) for kwargs in json_features]
     except pydantic.ValidationError:
         logger.exception(
@@ -174,3 +281,39 @@ def search(text: str) -> Optional[List[Feature]]:
         return None
 
     return _promote_exact_address(text, _promote_same_borough(text, features))
+
+
+def make_bulk_rate_limiter() -> TokenBucket:
+    """
+    Return a rate limiter that keeps requests to the geocoding service
+    within `settings.GEOCODING_RATE_LIMIT` requests per minute.
+    """
+
+    return TokenBucket(rate=settings.GEOCODING_RATE_LIMIT / 60)
+
+
+def search_many(
+    texts: Iterable[str],
+    max_workers: int = SEARCH_MANY_MAX_WORKERS,
+    rate_limiter: Optional[TokenBucket] = None,
+) -> List[Optional[List[Feature]]]:
+    """
+    Retrieves geo search results for each of the given search
+    criteria, making up to `max_workers` requests at once. If a
+    rate limiter is given, it will be used to throttle them. Since
+    results are cached, this can also be used to prefetch the
+    results of future calls to search().
+
+    The results are returned in the same order as the given
+    search criteria, and are the same as what search() would
+    return for each of them.
+    """
+
+    def search_text(text: str) -> Optional[List[Feature]]:
+        return search(text, rate_limiter=rate_limiter)
+
+    texts = list(texts)
+    if len(texts) <= 1:
+        return [search_text(text) for text in texts]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(texts))) as executor:
+        return list(executor.map(search_text, texts))
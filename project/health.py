@@ -51,7 +51,7 @@ class CheckGeocoding(HealthCheck):
         return bool(settings.GEOCODING_SEARCH_URL)
 
     def run_check(self) -> bool:
-        features = geocoding.search("150 court street, brooklyn")
+        features = geocoding.search("150 court street, brooklyn", use_cache=False)
         if features is None:
             return False
         return features[0].properties.pad_bbl == "3002920026"
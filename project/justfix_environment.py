@@ -46,6 +46,15 @@ class JustfixEnvironment(typed_environ.BaseEnvironment):
     #   https://github.com/JustFixNYC/who-owns-what
     WOW_DATABASE_URL: str = ""
 
+    # The number of seconds to cache the results of the data-driven
+    # onboarding (DDO) query for a BBL. Results are cached per-process
+    # unless a shared Django cache backend is configured.
+    DDO_SQL_CACHE_TIMEOUT: int = 60 * 60 * 24
+
+    # The number of seconds to remember that a BBL couldn't be found
+    # by the data-driven onboarding (DDO) query.
+    DDO_SQL_NEGATIVE_CACHE_TIMEOUT: int = 60 * 60
+
     # The Celery broker URL, e.g. 'amqp://'. If not provided, Celery integration
     # will be disabled.
     #
@@ -200,6 +209,17 @@ class JustfixEnvironment(typed_environ.BaseEnvironment):
         "https://lhiutility.lawhelpinteractive.org/LHIIntegration/LHIIntegration.svc"
     )
 
+    # The location of the WSDL for the HP Action SOAP endpoint. This can
+    # be a URL or the path to a local file, which avoids having to
+    # download it whenever a new process starts up. If empty, it will
+    # be retrieved from HP_ACTION_API_ENDPOINT.
+    HP_ACTION_WSDL: str = ""
+
+    # The path to a SQLite database that will be used to cache any
+    # WSDL and XSD documents the HP Action SOAP client retrieves over the
+    # network. If empty, they will only be cached in memory.
+    HP_ACTION_WSDL_CACHE_PATH: str = ""
+
     # The HotDocs template ID to pass to the HP Action SOAP endpoint,
     # e.g. "5395".
     HP_ACTION_TEMPLATE_ID: str = "7141"
@@ -220,6 +240,15 @@ class JustfixEnvironment(typed_environ.BaseEnvironment):
     # not provided, mapbox integration will be disabled.
     MAPBOX_ACCESS_TOKEN: str = ""
 
+    # The number of seconds to store responses from the Mapbox Places API
+    # in the database. If 0, responses won't be stored. Note that Mapbox's
+    # terms of service may limit how long results can be stored.
+    MAPBOX_CACHE_TIMEOUT: int = 60 * 60 * 24 * 7
+
+    # The maximum number of requests per minute that bulk operations will
+    # make to the Mapbox Places API.
+    MAPBOX_RATE_LIMIT: int = 600
+
     # The RapidPro API token to use. If not provided, RapidPro
     # integration is disabled.
     RAPIDPRO_API_TOKEN: str = ""
@@ -319,6 +348,50 @@ class JustfixEnvironment(typed_environ.BaseEnvironment):
     # use a long-lived HTTP server.
     USE_LAMBDA_HTTP_SERVER: bool = True
 
+    # The number of lambda HTTP server processes to run, if
+    # USE_LAMBDA_HTTP_SERVER is true. If more than one, requests will
+    # be routed to whichever server has the fewest requests in flight.
+    LAMBDA_HTTP_SERVER_REPLICAS: int = 1
+
+    # The number of seconds to cache server-side renders of pages for
+    # anonymous visitors. If zero (the default), renders are not cached.
+    #
+    # Renders are cached in the Django cache, which is local to each
+    # process unless a shared backend is configured via the CACHES
+    # setting, so workers don't see each other's renders.
+    SSR_CACHE_TIMEOUT: int = 0
+
+    # How often, in minutes, to refresh the precomputed snapshots of admin
+    # data downloads via Celery beat (which needs to be running separately,
+    # e.g. via `celery -A project beat`). If zero (the default), snapshots
+    # are only refreshed by the `refreshsnapshots` management command.
+    DATA_SNAPSHOT_REFRESH_MINUTES: int = 0
+
+    # The number of hours after which the precomputed snapshots of admin
+    # data downloads are rebuilt from scratch rather than refreshed
+    # incrementally, so that changes which can't be detected incrementally
+    # (such as deletions) are eventually reflected in them.
+    DATA_SNAPSHOT_FULL_REFRESH_HOURS: int = 24
+
+    # Whether to use a pool of long-lived lambda worker processes that
+    # each handle many server-side rendering requests. If true, this
+    # takes precedence over USE_LAMBDA_HTTP_SERVER.
+    USE_LAMBDA_WORKER_POOL: bool = False
+
+    # The maximum number of lambda worker processes to run, if
+    # USE_LAMBDA_WORKER_POOL is true.
+    LAMBDA_WORKER_POOL_SIZE: int = 5
+
+    # The number of requests a lambda worker process handles before
+    # it is replaced with a fresh one. If zero, workers are never
+    # replaced for this reason.
+    LAMBDA_WORKER_MAX_REQUESTS: int = 1000
+
+    # The resident memory size, in megabytes, above which a lambda
+    # worker process is replaced with a fresh one. If zero, workers
+    # are never replaced for this reason.
+    LAMBDA_WORKER_MAX_RSS_MB: int = 0
+
     # The RapidPro group name and date field key, separated by a comma, that
     # trigger the follow-up campaign for rent history. If empty, this follow-up
     # campaign will be disabled.
@@ -443,6 +516,19 @@ class JustfixEnvironment(typed_environ.BaseEnvironment):
     # The origin of the NYC GeoSearch API.
     NYC_GEOSEARCH_ORIGIN: str = "https://geosearch.planninglabs.nyc"
 
+    # The number of seconds to cache the results of geocoding an address.
+    # Results are cached per-process unless a shared Django cache backend
+    # is configured.
+    GEOCODING_CACHE_TIMEOUT: int = 60 * 60 * 24 * 7
+
+    # The number of seconds to remember that geocoding an address
+    # didn't return any results.
+    GEOCODING_NEGATIVE_CACHE_TIMEOUT: int = 60 * 60
+
+    # The maximum number of requests per minute that bulk operations will
+    # make to NYC GeoSearch.
+    GEOCODING_RATE_LIMIT: int = 600
+
     # The Contentful Space ID to use for retrieving common strings. For more
     # details, see: https://github.com/JustFixNYC/tenants2/pull/2125
     #
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Iterator, Optional
 import argparse
 import textwrap
 from django.core.management.base import BaseCommand
@@ -6,13 +6,19 @@ from django.utils.html import strip_tags
 from django.contrib.auth.models import AnonymousUser
 
 from users.models import JustfixUser
-from project.admin_download_data import get_all_data_downloads, strict_get_data_download
+from project.admin_download_data import (
+    get_all_data_downloads,
+    DOWNLOAD_FORMATS,
+    strict_get_data_download,
+)
 from project.util.streaming_csv import generate_streaming_csv
 from project.util.streaming_json import generate_streaming_json
+from project.util.streaming_arrow import generate_streaming_arrow, generate_streaming_parquet
+from project.util.server_side_cursor import DEFAULT_ITERSIZE
 
 
 class Command(BaseCommand):
-    help = "Output CSV or JSON data containing statistics."
+    help = "Output CSV, JSON, Parquet or Arrow data containing statistics."
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -22,11 +28,20 @@ class Command(BaseCommand):
         )
         parser.add_argument(
             "--format",
-            choices=["csv", "json"],
+            choices=DOWNLOAD_FORMATS,
             default="csv",
             help="Format in which to output statistics (default: %(default)s)",
         )
         parser.add_argument("--user", help="Username to make the export the dataset as.")
+        parser.add_argument(
+            "--itersize",
+            type=int,
+            default=DEFAULT_ITERSIZE,
+            help=(
+                "Number of rows to fetch from the database at once; the dataset is "
+                "streamed to stdout in batches of this size (default: %(default)s)"
+            ),
+        )
         parser.formatter_class = argparse.RawDescriptionHelpFormatter
         parser.epilog = self.get_epilog()
 
@@ -44,11 +59,26 @@ class Command(BaseCommand):
         username: Optional[str] = options["user"]
         user = JustfixUser.objects.get(username=username) if username else AnonymousUser()
         dd = strict_get_data_download(options["dataset"])
-        if options["format"] == "csv":
-            iterator = generate_streaming_csv(dd.generate_csv_rows(user))
+        itersize: int = options["itersize"]
+        fmt: str = options["format"]
+        if fmt in ("parquet", "arrows"):
+            encode = generate_streaming_parquet if fmt == "parquet" else generate_streaming_arrow
+            self.write_binary(encode(dd.generate_arrow_record_batches(user, itersize)))
+            return
+        if fmt == "csv":
+            iterator = generate_streaming_csv(dd.generate_csv_rows(user, itersize))
         else:
-            assert options["format"] == "json"
-            iterator = generate_streaming_json(dd.generate_json_rows(user))
+            assert fmt == "json"
+            iterator = generate_streaming_json(dd.generate_json_rows(user, itersize))
         self.stdout.ending = ""
         for string in iterator:
             self.stdout.write(string)
+
+    def write_binary(self, chunks: Iterator[bytes]):
+        # The columnar formats are binary, so we need to bypass our
+        # text-based stdout wrapper and write to its underlying buffer.
+        self.stdout.flush()
+        out = self.stdout.buffer
+        for chunk in chunks:
+            out.write(chunk)
+        out.flush()
@@ -1,12 +1,20 @@
-from typing import Optional, Dict, List, NamedTuple, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Iterable, List, NamedTuple, Tuple
+import datetime
+import hashlib
+import json
 import re
 import urllib.parse
 import pydantic
 import logging
 from django.conf import settings
+from django.db import connections
+from django.db.models import Q
+from django.utils import timezone
 import requests
 
 from project.util.geojson import FeatureGeometry
+from project.util.token_bucket import TokenBucket
 
 
 logger = logging.getLogger(__name__)
@@ -17,6 +25,10 @@ MAPBOX_STATE_SHORT_CODE_RE = r"^US-([A-Z][A-Z])$"
 
 MAPBOX_CITY_ID_RE = r"^(place|locality)\..*"
 
+# The default maximum number of concurrent requests that bulk
+# operations will make to the Mapbox Places API.
+BULK_MAX_WORKERS = 8
+
 
 class MapboxFeatureContext(pydantic.BaseModel):
     id: str
@@ -45,6 +57,13 @@ class StreetAddress(NamedTuple):
     geometry: FeatureGeometry
 
 
+class AddressQuery(NamedTuple):
+    address: str
+    city: str
+    state: str
+    zip_code: str
+
+
 def _encode_query_for_places_request(query: str) -> str:
     # Mapbox's API prohibits semicolons, so replace them with commas.
     query = query.replace(";", ",")
@@ -58,13 +77,49 @@ def _encode_query_for_places_request(query: str) -> str:
     return query
 
 
-def mapbox_places_request(query: str, args: Dict[str, str]) -> Optional[MapboxResults]:
+def get_places_cache_key(encoded_query: str, args: Dict[str, str]) -> str:
+    key = json.dumps([encoded_query, args], sort_keys=True)
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def _get_cached_places_results(cache_key: str) -> Optional[MapboxResults]:
+    from onboarding.models import MapboxCacheEntry
+
+    entry = MapboxCacheEntry.objects.filter(key=cache_key, expires_at__gt=timezone.now()).first()
+    if entry is None:
+        return None
+    return MapboxResults(**entry.results)
+
+
+def _cache_places_results(cache_key: str, results: MapboxResults) -> None:
+    from onboarding.models import MapboxCacheEntry
+
+    now = timezone.now()
+    expires_at = now + datetime.timedelta(seconds=settings.MAPBOX_CACHE_TIMEOUT)
+    # Any existing entry for this key has expired, so replace it, and purge
+    # every other expired entry while we're at it. Note that another process
+    # may have cached the same results in the meantime, in which case we'll
+    # just keep theirs.
+    MapboxCacheEntry.objects.filter(Q(key=cache_key) | Q(expires_at__lt=now)).delete()
+    MapboxCacheEntry.objects.bulk_create(
+        [MapboxCacheEntry(key=cache_key, results=results.dict(), expires_at=expires_at)],
+        ignore_conflicts=True,
+    )
+
+
+def mapbox_places_request(
+    query: str, args: Dict[str, str], rate_limiter: Optional[TokenBucket] = None
+) -> Optional[MapboxResults]:
     """
     Make a request for the given place to the Mapbox Places API [1], using the
     given arguments.
 
     Returns None if Mapbox isn't configured, or if a network error occurs.
 
+    Successful responses are stored in the database for
+    `settings.MAPBOX_CACHE_TIMEOUT` seconds. If a rate limiter is given, it
+    will be used to throttle any requests we actually make to Mapbox.
+
     Note that Mapbox's Places API prohibits semicolons from
     being in the query, so this function will replace them with commas.
 
@@ -75,6 +130,16 @@ def mapbox_places_request(query: str, args: Dict[str, str]) -> Optional[MapboxRe
         return None
 
     query = _encode_query_for_places_request(query)
+    use_cache = settings.MAPBOX_CACHE_TIMEOUT > 0
+    cache_key = get_places_cache_key(query, args)
+
+    if use_cache:
+        cached = _get_cached_places_results(cache_key)
+        if cached is not None:
+            return cached
+
+    if rate_limiter is not None:
+        rate_limiter.acquire()
 
     try:
         response = requests.get(
@@ -90,13 +155,18 @@ def mapbox_places_request(query: str, args: Dict[str, str]) -> Optional[MapboxRe
         if response.status_code == 422:
             # Unprocessable entity; our query was likely too long, so return
             # an empty result set.
-            return MapboxResults(features=[])
-        response.raise_for_status()
-        return MapboxResults(**response.json())
+            results = MapboxResults(features=[])
+        else:
+            response.raise_for_status()
+            results = MapboxResults(**response.json())
     except Exception:
         logger.exception(f"Error while retrieving data from {MAPBOX_PLACES_URL}")
         return None
 
+    if use_cache:
+        _cache_places_results(cache_key, results)
+    return results
+
 
 def find_city(city: str, state: str) -> Optional[List[Tuple[str, Tuple[float, float]]]]:
     """
@@ -126,7 +196,11 @@ def find_city(city: str, state: str) -> Optional[List[Tuple[str, Tuple[float, fl
 
 
 def find_address(
-    address: str, city: str, state: str, zip_code: str
+    address: str,
+    city: str,
+    state: str,
+    zip_code: str,
+    rate_limiter: Optional[TokenBucket] = None,
 ) -> Optional[List[StreetAddress]]:
     """
     Attempts to find matches for the closest street address in the given
@@ -151,6 +225,7 @@ def find_address(
         {
             "types": "address",
         },
+        rate_limiter=rate_limiter,
     )
     if not results:
         return None
@@ -173,6 +248,47 @@ def find_address(
     return in_city_addrs + out_of_city_addrs
 
 
+def make_bulk_rate_limiter() -> TokenBucket:
+    """
+    Return a rate limiter that keeps requests to Mapbox within
+    `settings.MAPBOX_RATE_LIMIT` requests per minute.
+    """
+
+    return TokenBucket(rate=settings.MAPBOX_RATE_LIMIT / 60)
+
+
+def find_address_many(
+    queries: Iterable[AddressQuery],
+    max_workers: int = BULK_MAX_WORKERS,
+    rate_limiter: Optional[TokenBucket] = None,
+) -> List[Optional[List[StreetAddress]]]:
+    """
+    Like find_address(), but finds matches for many addresses at once,
+    making up to `max_workers` concurrent requests to Mapbox while
+    respecting its rate limit. Since results are cached, this can also
+    be used to prefetch the results of future calls to find_address().
+
+    The results are returned in the same order as the given queries.
+    """
+
+    queries = list(queries)
+    if rate_limiter is None:
+        rate_limiter = make_bulk_rate_limiter()
+
+    def find(query: AddressQuery) -> Optional[List[StreetAddress]]:
+        try:
+            return find_address(*query, rate_limiter=rate_limiter)
+        finally:
+            # This runs in a worker thread, which has its own database
+            # connection that Django won't close for us.
+            connections.close_all()
+
+    if not queries:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(queries))) as executor:
+        return list(executor.map(find, queries))
+
+
 def get_mapbox_street_addr(feature: MapboxFeature) -> str:
     """
     Given a Mapbox Feature that represents an address, returns
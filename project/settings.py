@@ -117,8 +117,28 @@ GCE_ORIGIN = env.GCE_ORIGIN
 IS_EFNY_SUSPENDED = env.IS_EFNY_SUSPENDED
 IS_NORENT_DEPRECATED = env.IS_NORENT_DEPRECATED
 
+SSR_CACHE_TIMEOUT = env.SSR_CACHE_TIMEOUT
+
+# The maximum number of server-side renders to keep in each process'
+# memory, in front of the Django cache.
+SSR_CACHE_MAX_LOCAL_ENTRIES = 256
+
 USE_LAMBDA_HTTP_SERVER = env.USE_LAMBDA_HTTP_SERVER
 
+LAMBDA_HTTP_SERVER_REPLICAS = env.LAMBDA_HTTP_SERVER_REPLICAS
+
+DATA_SNAPSHOT_REFRESH_MINUTES = env.DATA_SNAPSHOT_REFRESH_MINUTES
+
+DATA_SNAPSHOT_FULL_REFRESH_HOURS = env.DATA_SNAPSHOT_FULL_REFRESH_HOURS
+
+USE_LAMBDA_WORKER_POOL = env.USE_LAMBDA_WORKER_POOL
+
+LAMBDA_WORKER_POOL_SIZE = env.LAMBDA_WORKER_POOL_SIZE
+
+LAMBDA_WORKER_MAX_REQUESTS = env.LAMBDA_WORKER_MAX_REQUESTS
+
+LAMBDA_WORKER_MAX_RSS_MB = env.LAMBDA_WORKER_MAX_RSS_MB
+
 FACEBOOK_APP_ID = env.FACEBOOK_APP_ID
 LATAC_FACEBOOK_PIXEL_ID = env.LATAC_FACEBOOK_PIXEL_ID
 LATAC_GTM_ID = env.LATAC_GTM_ID
@@ -171,6 +191,7 @@ INSTALLED_APPS = [
     "gce.apps.GoodCauseEvictionScreenerConfig",
     "gceletter.apps.GCELetterConfig",
     "efnyc.apps.EfnycConfig",
+    "data_snapshots.apps.DataSnapshotsConfig",
 ]
 
 MIDDLEWARE = [
@@ -256,6 +277,10 @@ if env.WOW_DATABASE_URL:
     DATABASES["wow"] = dj_database_url.parse(env.WOW_DATABASE_URL)
     WOW_DATABASE = "wow"
 
+DDO_SQL_CACHE_TIMEOUT = env.DDO_SQL_CACHE_TIMEOUT
+
+DDO_SQL_NEGATIVE_CACHE_TIMEOUT = env.DDO_SQL_NEGATIVE_CACHE_TIMEOUT
+
 DWH_DATABASE = "default"
 
 if env.DWH_DATABASE_URL:
@@ -445,6 +470,12 @@ GEOCODING_SEARCH_URL = f"{NYC_GEOSEARCH_ORIGIN}/v2/search"
 
 GEOCODING_TIMEOUT = 8
 
+GEOCODING_CACHE_TIMEOUT = env.GEOCODING_CACHE_TIMEOUT
+
+GEOCODING_NEGATIVE_CACHE_TIMEOUT = env.GEOCODING_NEGATIVE_CACHE_TIMEOUT
+
+GEOCODING_RATE_LIMIT = env.GEOCODING_RATE_LIMIT
+
 GCE_API_TOKEN = env.GCE_API_TOKEN
 
 GCE_CORS_ALLOWED_ORIGINS = [
@@ -525,12 +556,20 @@ AIRTABLE_TIMEOUT = 3
 
 HP_ACTION_API_ENDPOINT = env.HP_ACTION_API_ENDPOINT
 
+HP_ACTION_WSDL = env.HP_ACTION_WSDL or f"{HP_ACTION_API_ENDPOINT}?wsdl"
+
+HP_ACTION_WSDL_CACHE_PATH = env.HP_ACTION_WSDL_CACHE_PATH
+
 HP_ACTION_TEMPLATE_ID = env.HP_ACTION_TEMPLATE_ID
 
 HP_ACTION_CUSTOMER_KEY = env.HP_ACTION_CUSTOMER_KEY
 
 HP_ACTION_TIMEOUT = 90
 
+# How long, in seconds, the HP Action SOAP client will cache any WSDL
+# and XSD documents it retrieves over the network.
+HP_ACTION_WSDL_CACHE_TIMEOUT = 60 * 60 * 24
+
 TWOFACTOR_VERIFY_DURATION = env.TWOFACTOR_VERIFY_DURATION
 
 MAPBOX_ACCESS_TOKEN = env.MAPBOX_ACCESS_TOKEN
@@ -541,6 +580,10 @@ MAPBOX_TILES_ORIGIN = MAPBOX_API_ORIGIN
 
 MAPBOX_TIMEOUT = 10
 
+MAPBOX_CACHE_TIMEOUT = env.MAPBOX_CACHE_TIMEOUT
+
+MAPBOX_RATE_LIMIT = env.MAPBOX_RATE_LIMIT
+
 RAPIDPRO_API_TOKEN = env.RAPIDPRO_API_TOKEN
 
 RAPIDPRO_HOSTNAME = env.RAPIDPRO_HOSTNAME
@@ -669,6 +712,14 @@ CELERY_WORKER_HIJACK_ROOT_LOGGER = False
 # When executing tasks synchronously, make sure exceptions propagate.
 CELERY_TASK_EAGER_PROPAGATES = True
 
+CELERY_BEAT_SCHEDULE = {}
+
+if DATA_SNAPSHOT_REFRESH_MINUTES:
+    CELERY_BEAT_SCHEDULE["refresh-data-snapshots"] = {
+        "task": "data_snapshots.tasks.refresh_data_snapshots",
+        "schedule": DATA_SNAPSHOT_REFRESH_MINUTES * 60,
+    }
+
 if not CELERY_BROKER_URL:
     # If Celery integration is disabled, just execute tasks synchronously.
     CELERY_TASK_ALWAYS_EAGER = True
@@ -60,6 +60,12 @@ MAILCHIMP_LIST_ID = ""
 MAILCHIMP_CORS_ORIGINS = []
 FRONTAPP_PLUGIN_AUTH_SECRET = ""
 
+# Don't cache geocoding results by default, so that tests which mock
+# different responses for the same address don't interfere with each other.
+GEOCODING_CACHE_TIMEOUT = 0
+GEOCODING_NEGATIVE_CACHE_TIMEOUT = 0
+MAPBOX_CACHE_TIMEOUT = 0
+
 # Because we generally *don't* do things when we're on a demo
 # deployment, we'll default this to true, which will force tests
 # to set it to false in order to pass, which feels like a more
@@ -0,0 +1,43 @@
+//@ts-check
+
+const FRAME_HEADER_SIZE = 4;
+
+let buffer = Buffer.alloc(0);
+
+/** @param {any} result */
+function handle(result) {
+  if (result.stderr) {
+    process.stderr.write(Buffer.from(result.stderr, "utf-8"));
+  }
+
+  if (result.pid) {
+    return JSON.stringify({ pid: process.pid });
+  } else if (result.output) {
+    return result.output;
+  } else if (result.errorText) {
+    throw new Error(result.errorText);
+  } else if (result.infiniteLoop) {
+    while (true) {}
+  }
+  return "null";
+}
+
+process.stdin.on("data", (data) => {
+  buffer = Buffer.concat([buffer, data]);
+  while (buffer.length >= FRAME_HEADER_SIZE) {
+    const end = FRAME_HEADER_SIZE + buffer.readUInt32BE(0);
+    if (buffer.length < end) {
+      break;
+    }
+    const event = JSON.parse(buffer.slice(FRAME_HEADER_SIZE, end).toString("utf-8"));
+    buffer = buffer.slice(end);
+    const output = Buffer.from(handle(event), "utf-8");
+    const header = Buffer.alloc(FRAME_HEADER_SIZE);
+    header.writeUInt32BE(output.length, 0);
+    process.stdout.write(Buffer.concat([header, output]));
+  }
+});
+
+process.stdin.on("end", () => {
+  process.exit(0);
+});
@@ -1,5 +1,8 @@
+import io
 import json
 from django.contrib.auth.models import AnonymousUser
+import pyarrow.ipc as pyarrow_ipc
+import pyarrow.parquet as pyarrow_parquet
 import pytest
 
 from project import admin_download_data
@@ -45,6 +48,30 @@ def test_json_works(outreach_client):
     assert records[0]["rapidpro_contact_groups"] == ["Boop", "Goop"]
 
 
+def test_arrow_works(outreach_client):
+    user = OnboardingInfoFactory().user
+
+    res = outreach_client.get("/admin/download-data/userstats.arrows")
+    assert res.status_code == 200
+    assert res["Content-Type"] == "application/vnd.apache.arrow.stream"
+    table = pyarrow_ipc.open_stream(b"".join(res.streaming_content)).read_all()
+    records = table.to_pylist()
+    assert len(records) == 1
+    assert records[0]["user_id"] == user.pk
+
+
+def test_parquet_works(outreach_client):
+    user = OnboardingInfoFactory().user
+
+    res = outreach_client.get("/admin/download-data/userstats.parquet")
+    assert res.status_code == 200
+    assert res["Content-Type"] == "application/vnd.apache.parquet"
+    table = pyarrow_parquet.read_table(io.BytesIO(b"".join(res.streaming_content)))
+    records = table.to_pylist()
+    assert len(records) == 1
+    assert records[0]["user_id"] == user.pk
+
+
 def test_datasets_return_appropriate_errors(
     outreach_client, disable_locale_middleware, monkeypatch
 ):
@@ -1,7 +1,12 @@
+from concurrent.futures import ThreadPoolExecutor
 import json
 from pathlib import Path
+import threading
+import time
+from unittest.mock import MagicMock
 import pytest
 from django.conf import settings
+from django.core.cache import caches
 from django.test import override_settings
 from django.core.management import call_command
 from django.core.management.base import CommandError
@@ -70,3 +75,97 @@ def test_search_promotes_exact_matches(requests_mock):
     requests_mock.get(settings.GEOCODING_SEARCH_URL, json=EXAMPLE_SEARCH)
     results = geocoding.search("150 brightwatr court, brooklyn")
     assert results[0].properties.label == "150 BRIGHTWATR COURT, Brooklyn, New York, NY, USA"
+
+
+def test_normalize_search_text_works():
+    assert geocoding.normalize_search_text(" 150  COURT st,\nBrooklyn ") == "150 court st, brooklyn"
+
+
+class TestCaching:
+    @pytest.fixture(autouse=True)
+    def setup_fixture(self, settings):
+        settings.GEOCODING_SEARCH_URL = "http://localhost:12345/geo"
+        settings.GEOCODING_CACHE_TIMEOUT = 60
+        settings.GEOCODING_NEGATIVE_CACHE_TIMEOUT = 60
+        caches[geocoding.GEOCODING_CACHE].clear()
+        yield
+        caches[geocoding.GEOCODING_CACHE].clear()
+
+    def test_results_are_cached_by_normalized_text(self, requests_mock):
+        requests_mock.get(settings.GEOCODING_SEARCH_URL, json=EXAMPLE_SEARCH)
+        first = geocoding.search("150 court")
+        second = geocoding.search("  150 COURT ")
+        assert requests_mock.call_count == 1
+        assert first == second
+
+    def test_empty_results_are_cached(self, requests_mock):
+        requests_mock.get(settings.GEOCODING_SEARCH_URL, json={"features": []})
+        assert geocoding.search("zzzzzz") == []
+        assert geocoding.search("zzzzzz") == []
+        assert requests_mock.call_count == 1
+
+    def test_errors_are_not_cached(self, requests_mock):
+        requests_mock.get(settings.GEOCODING_SEARCH_URL, status_code=500)
+        assert geocoding.search("150 court") is None
+        requests_mock.get(settings.GEOCODING_SEARCH_URL, json=EXAMPLE_SEARCH)
+        assert geocoding.search("150 court") is not None
+        assert requests_mock.call_count == 2
+
+    def test_invalid_responses_are_not_cached(self, requests_mock):
+        requests_mock.get(settings.GEOCODING_SEARCH_URL, json={"features": [{"blah": 1}]})
+        assert geocoding.search("150 court") is None
+        requests_mock.get(settings.GEOCODING_SEARCH_URL, json=EXAMPLE_SEARCH)
+        assert geocoding.search("150 court") is not None
+
+    def test_cache_can_be_bypassed(self, requests_mock):
+        requests_mock.get(settings.GEOCODING_SEARCH_URL, json=EXAMPLE_SEARCH)
+        geocoding.search("150 court")
+        geocoding.search("150 court", use_cache=False)
+        assert requests_mock.call_count == 2
+
+    def test_concurrent_identical_searches_make_one_request(self, requests_mock):
+        started = threading.Event()
+        proceed = threading.Event()
+
+        def respond(request, context):
+            started.set()
+            proceed.wait(5)
+            return EXAMPLE_SEARCH
+
+        requests_mock.get(settings.GEOCODING_SEARCH_URL, json=respond)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            first = executor.submit(geocoding.search, "150 court")
+            assert started.wait(5)
+            second = executor.submit(geocoding.search, "150 court")
+            # Give the second search a moment to start waiting on the first.
+            time.sleep(0.1)
+            proceed.set()
+            assert first.result() == second.result()
+        assert requests_mock.call_count == 1
+
+
+@enable_fake_geocoding
+def test_search_many_works(requests_mock):
+    requests_mock.get(
+        settings.GEOCODING_SEARCH_URL,
+        json=lambda request, context: (
+            {"features": []} if "zzzzzz" in request.qs["text"] else EXAMPLE_SEARCH
+        ),
+    )
+    results = geocoding.search_many(["150 court", "zzzzzz", "150 cody court, staten island"])
+    assert len(results) == 3
+    assert results[0][0].properties.label == "150 COURT STREET, Brooklyn, New York, NY, USA"
+    assert results[1] == []
+    assert results[2][0].properties.label == "150 CODY COURT, Staten Island, New York, NY, USA"
+
+
+@enable_fake_geocoding
+def test_search_many_uses_rate_limiter(requests_mock):
+    requests_mock.get(settings.GEOCODING_SEARCH_URL, json=EXAMPLE_SEARCH)
+    rate_limiter = MagicMock()
+    geocoding.search_many(["150 court", "150 cody court"], rate_limiter=rate_limiter)
+    assert rate_limiter.acquire.call_count == 2
+
+
+def test_search_many_works_with_no_searches():
+    assert geocoding.search_many([]) == []
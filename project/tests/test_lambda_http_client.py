@@ -2,7 +2,7 @@ from pathlib import Path
 from requests.exceptions import HTTPError, ReadTimeout
 import pytest
 
-from project.util.lambda_http_client import LambdaHttpClient
+from project.util.lambda_http_client import LambdaHttpClient, LambdaHttpReplicaSet
 from project.justfix_environment import BASE_DIR
 
 MY_DIR = Path(__file__).parent.resolve()
@@ -31,6 +31,21 @@ def lambda_server(module_scoped_lambda_server, requests_mock):
     yield http
 
 
+@pytest.fixture
+def lambda_replica_set(requests_mock):
+    rs = LambdaHttpReplicaSet(
+        "test lambda http replica set",
+        LAMBDA_SCRIPT,
+        cwd=BASE_DIR,
+        size=2,
+        interpreter_args=["-r", "./frontend/webpack/babel-register"],
+    )
+    for replica in rs.replicas:
+        requests_mock.register_uri("POST", replica.get_url(), real_http=True)
+    yield rs
+    rs.shutdown()
+
+
 def test_instacrash_raises_error():
     http = LambdaHttpClient("crashy", "", cwd=BASE_DIR, interpreter_args=["-e", r"process.exit(5)"])
     with pytest.raises(Exception, match="Subprocess failed with exit code 5"):
@@ -75,3 +90,18 @@ def test_hanging_in_requests_raises_timeout_error(lambda_server):
         lambda_server.run_handler({"hang": True}, timeout=0.0001)
     # The error should have shut down the misbehaving server.
     assert lambda_server.is_running is False
+
+
+def test_replica_set_works(lambda_replica_set):
+    assert lambda_replica_set.run_handler({"echo": "hi"}) == {"echo": "hi"}
+    assert all(replica.is_running for replica in lambda_replica_set.replicas)
+
+
+def test_replica_set_only_shuts_down_misbehaving_replica(lambda_replica_set):
+    with pytest.raises(HTTPError, match="500 Server Error"):
+        lambda_replica_set.run_handler({"explode": True})
+    running = [replica.is_running for replica in lambda_replica_set.replicas]
+    assert sorted(running) == [False, True]
+
+    # The healthy replica should still be routed to.
+    assert lambda_replica_set.run_handler({"echo": "hi"}) == {"echo": "hi"}
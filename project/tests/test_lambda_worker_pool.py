@@ -0,0 +1,110 @@
+import os
+import json
+import time
+from io import BytesIO
+from pathlib import Path
+from subprocess import CalledProcessError, TimeoutExpired
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+
+from project.util.lambda_pool import MalformedResponseError
+from project.util.lambda_worker_pool import (
+    LambdaWorkerPool,
+    WorkerCheckoutTimeoutError,
+    get_rss_bytes,
+)
+
+MY_DIR = Path(__file__).parent.resolve()
+
+LAMBDA_SCRIPT = MY_DIR / "lambda_worker_script.js"
+
+
+def wait_for_stderr(pool, value: bytes):
+    for _ in range(100):
+        if pool.stderr.getvalue() == value:
+            return
+        time.sleep(0.01)
+    assert pool.stderr.getvalue() == value
+
+
+@pytest.fixture
+def pool():
+    pool = LambdaWorkerPool(
+        "test lambda worker script", LAMBDA_SCRIPT, cwd=MY_DIR, stderr=BytesIO()
+    )
+    yield pool
+    pool.empty()
+
+
+def get_pid(pool) -> int:
+    return pool.run_handler({"pid": True})["pid"]
+
+
+def test_output_is_returned(pool):
+    assert pool.run_handler({"output": json.dumps({"here": "is some output\u2026"})}) == {
+        "here": "is some output\u2026"
+    }
+
+
+def test_workers_are_reused(pool):
+    assert get_pid(pool) == get_pid(pool)
+
+
+def test_workers_are_recycled_after_max_requests(pool):
+    pool.max_requests_per_worker = 2
+    first_pid = get_pid(pool)
+    assert get_pid(pool) == first_pid
+    assert get_pid(pool) != first_pid
+
+
+def test_workers_are_recycled_when_rss_is_too_large(pool):
+    if get_rss_bytes(os.getpid()) is None:
+        pytest.skip("RSS cannot be determined on this platform")
+    pool.max_rss_bytes = 1
+    first_pid = get_pid(pool)
+    assert get_pid(pool) != first_pid
+
+
+def test_stderr_is_output(pool):
+    assert (
+        pool.run_handler({"stderr": "here is a stderr message\n", "output": '"hello"'}) == "hello"
+    )
+    wait_for_stderr(pool, b"here is a stderr message\n")
+
+
+def test_concurrent_callers_share_workers():
+    two_worker_pool = LambdaWorkerPool(
+        "test lambda worker script", LAMBDA_SCRIPT, cwd=MY_DIR, size=2
+    )
+    try:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            pids = set(executor.map(lambda _: get_pid(two_worker_pool), range(32)))
+        assert 1 <= len(pids) <= 2
+    finally:
+        two_worker_pool.empty()
+
+
+def test_error_raised_if_no_worker_becomes_available():
+    empty_pool = LambdaWorkerPool(
+        "test lambda worker script", LAMBDA_SCRIPT, cwd=MY_DIR, size=0, checkout_timeout_secs=0.01
+    )
+    with pytest.raises(WorkerCheckoutTimeoutError):
+        empty_pool.run_handler({"output": '"hello"'})
+
+
+def test_error_raised_if_output_is_malformed(pool):
+    with pytest.raises(MalformedResponseError) as excinfo:
+        pool.run_handler({"output": "this is not valid json"})
+    assert b"this is not valid json" in excinfo.value.output
+
+
+def test_error_raised_if_worker_crashes(pool):
+    with pytest.raises(CalledProcessError):
+        pool.run_handler({"errorText": "uh-oh"})
+    assert pool.run_handler({"output": '"still works"'}) == "still works"
+
+
+def test_error_raised_if_timeout_expires(pool):
+    with pytest.raises(TimeoutExpired):
+        pool.run_handler({"infiniteLoop": True}, timeout_secs=0.1)
+    assert pool.run_handler({"output": '"still works"'}) == "still works"
@@ -1,10 +1,11 @@
 import json
 from pathlib import Path
-from io import StringIO
+from io import StringIO, BytesIO, TextIOWrapper
 from unittest.mock import patch
 from django.test import TestCase, override_settings
 from django.core.management import call_command
 from django.core.management.base import CommandError
+import pyarrow.parquet as pyarrow_parquet
 import pytest
 
 from project.management.commands import sendtestslack
@@ -91,6 +92,15 @@ class TestExportStats:
         assert results[0]["pad_bbl"] == self.redacted
         assert results[0]["rapidpro_contact_groups"] == ["Boop", "Goop"]
 
+    def test_it_works_with_parquet(self, db):
+        out = TextIOWrapper(BytesIO())
+        call_command("exportstats", "userstats", "--format=parquet", stdout=out)
+        out.buffer.seek(0)
+        results = pyarrow_parquet.read_table(out.buffer).to_pylist()
+        assert len(results) == 1
+        assert results[0]["pad_bbl"] == self.redacted
+        assert results[0]["rapidpro_contact_groups"] == ["Boop", "Goop"]
+
     def test_it_works_with_csv(self, db):
         out = StringIO()
         call_command("exportstats", "userstats", stdout=out)
@@ -1,10 +1,14 @@
+import datetime
 import json
+from unittest.mock import MagicMock
 from project.util.geojson import FeatureGeometry
 import pytest
 from django.core.management import call_command
+from django.utils import timezone
 import urllib.parse
 
 from project.justfix_environment import BASE_DIR
+from onboarding.models import MapboxCacheEntry
 from project.mapbox import (
     _encode_query_for_places_request,
     mapbox_places_request,
@@ -14,6 +18,9 @@ from project.mapbox import (
     get_mapbox_street_addr,
     does_city_match,
     find_address,
+    find_address_many,
+    get_places_cache_key,
+    AddressQuery,
     StreetAddress,
     MapboxFeature,
     MAPBOX_PLACES_URL,
@@ -145,6 +152,69 @@ class TestMapboxPlacesRequest:
         assert results and results.features[0].text == "Brooklyn"
 
 
+class TestMapboxPlacesRequestCaching:
+    @pytest.fixture(autouse=True)
+    def enable_caching(self, settings, db):
+        settings.MAPBOX_CACHE_TIMEOUT = 60
+
+    def test_it_caches_results(self, requests_mock):
+        requests_mock.get(f"{MAPBOX_PLACES_URL}/br.json", json=BROOKLYN_RESULTS_JSON)
+        first = mapbox_places_request("br", {})
+        second = mapbox_places_request("br", {})
+        assert requests_mock.call_count == 1
+        assert first == second
+        assert MapboxCacheEntry.objects.count() == 1
+
+    def test_it_caches_results_separately_for_different_args(self, requests_mock):
+        requests_mock.get(f"{MAPBOX_PLACES_URL}/br.json", json=BROOKLYN_RESULTS_JSON)
+        mapbox_places_request("br", {"types": "place"})
+        mapbox_places_request("br", {"types": "address"})
+        assert requests_mock.call_count == 2
+
+    def test_it_caches_empty_results_on_http_422(self, requests_mock):
+        requests_mock.get(f"{MAPBOX_PLACES_URL}/a%20b.json", status_code=422)
+        mapbox_places_request("a b", {})
+        assert mapbox_places_request("a b", {}).features == []
+        assert requests_mock.call_count == 1
+
+    def test_it_does_not_cache_errors(self, requests_mock):
+        requests_mock.get(f"{MAPBOX_PLACES_URL}/br.json", status_code=500)
+        assert mapbox_places_request("br", {}) is None
+        assert MapboxCacheEntry.objects.count() == 0
+
+    def test_it_ignores_and_replaces_expired_results(self, requests_mock):
+        requests_mock.get(f"{MAPBOX_PLACES_URL}/br.json", json=BROOKLYN_RESULTS_JSON)
+        mapbox_places_request("br", {})
+        MapboxCacheEntry.objects.update(expires_at=timezone.now() - datetime.timedelta(seconds=1))
+        mapbox_places_request("br", {})
+        assert requests_mock.call_count == 2
+        entry = MapboxCacheEntry.objects.get()
+        assert entry.expires_at > timezone.now()
+
+    def test_it_purges_other_expired_results(self, requests_mock):
+        MapboxCacheEntry.objects.create(
+            key="expired",
+            results={"features": []},
+            expires_at=timezone.now() - datetime.timedelta(seconds=1),
+        )
+        MapboxCacheEntry.objects.create(
+            key="unexpired",
+            results={"features": []},
+            expires_at=timezone.now() + datetime.timedelta(seconds=60),
+        )
+        requests_mock.get(f"{MAPBOX_PLACES_URL}/br.json", json=BROOKLYN_RESULTS_JSON)
+        mapbox_places_request("br", {})
+        keys = set(MapboxCacheEntry.objects.values_list("key", flat=True))
+        assert keys == {"unexpired", get_places_cache_key("br", {})}
+
+    def test_it_does_not_rate_limit_cached_results(self, requests_mock):
+        requests_mock.get(f"{MAPBOX_PLACES_URL}/br.json", json=BROOKLYN_RESULTS_JSON)
+        rate_limiter = MagicMock()
+        mapbox_places_request("br", {}, rate_limiter=rate_limiter)
+        mapbox_places_request("br", {}, rate_limiter=rate_limiter)
+        assert rate_limiter.acquire.call_count == 1
+
+
 class TestFindCity:
     def test_it_returns_none_on_mapbox_failure(self, settings):
         settings.MAPBOX_ACCESS_TOKEN = ""
@@ -184,6 +254,25 @@ class TestFindAddress:
         assert find_address("1 boop st", "bespin", "NY", "12345") == [self.BRL]
 
 
+class TestFindAddressMany:
+    def test_it_returns_results_in_order(self, requests_mock):
+        mock_brl_results("150 court st, brooklyn, NY 12345", requests_mock)
+        mock_no_results("1 boop st, bespin, OH 12345", requests_mock)
+        rate_limiter = MagicMock()
+        results = find_address_many(
+            [
+                AddressQuery("150 court st", "brooklyn", "NY", "12345"),
+                AddressQuery("1 boop st", "bespin", "OH", "12345"),
+            ],
+            rate_limiter=rate_limiter,
+        )
+        assert results == [[TestFindAddress.BRL], []]
+        assert rate_limiter.acquire.call_count == 2
+
+    def test_it_works_with_no_queries(self):
+        assert find_address_many([]) == []
+
+
 def test_findmapboxcity_command_does_not_explode(settings):
     settings.MAPBOX_ACCESS_TOKEN = ""
     call_command("findmapboxcity", "brooklyn", "NY")
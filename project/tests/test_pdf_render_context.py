@@ -0,0 +1,67 @@
+import os
+from pathlib import Path
+import pytest
+
+from loc.views import can_we_render_pdfs
+from project.util import pdf_render_context
+from project.util.pdf_render_context import PdfRenderContext, read_stylesheet
+
+requires_pdf_rendering = pytest.mark.skipif(
+    not can_we_render_pdfs(), reason="PDF generation is unsupported"
+)
+
+
+@pytest.fixture
+def stylesheet(tmp_path) -> Path:
+    path = tmp_path / "styles.css"
+    path.write_text("p { color: red; }")
+    return path
+
+
+def test_read_stylesheet_makes_relative_urls_absolute(tmp_path):
+    path = tmp_path / "fonts.css"
+    path.write_text("@font-face { src: url(./boop.ttf); }")
+    assert read_stylesheet(path) == (
+        "@font-face { src: url(" + (tmp_path / "boop.ttf").as_uri() + "); }"
+    )
+
+
+def test_get_pdf_render_context_returns_the_same_context():
+    pdf_render_context.reset_pdf_render_context()
+    context = pdf_render_context.get_pdf_render_context()
+    assert pdf_render_context.get_pdf_render_context() is context
+    pdf_render_context.reset_pdf_render_context()
+    assert pdf_render_context.get_pdf_render_context() is not context
+
+
+@requires_pdf_rendering
+class TestPdfRenderContext:
+    def test_font_config_is_reused(self):
+        context = PdfRenderContext()
+        assert context.font_config is context.font_config
+
+    def test_stylesheets_are_cached(self, stylesheet):
+        context = PdfRenderContext()
+        css = context.get_stylesheet(stylesheet)
+        assert context.get_stylesheet(stylesheet) is css
+
+    def test_modified_stylesheets_are_reparsed(self, stylesheet):
+        context = PdfRenderContext()
+        css = context.get_stylesheet(stylesheet)
+        stat = stylesheet.stat()
+        os.utime(stylesheet, (stat.st_atime, stat.st_mtime + 1))
+        assert context.get_stylesheet(stylesheet) is not css
+
+    def test_css_strings_are_cached(self, monkeypatch):
+        monkeypatch.setattr(pdf_render_context, "MAX_CACHED_CSS_STRINGS", 2)
+        context = PdfRenderContext()
+        a = context.get_css("a { color: red; }")
+        assert context.get_css("a { color: red; }") is a
+        context.get_css("b { color: red; }")
+        context.get_css("i { color: red; }")
+        assert context.get_css("a { color: red; }") is not a
+
+    def test_render_pdf_bytes_works(self, stylesheet):
+        context = PdfRenderContext()
+        pdf = context.render_pdf_bytes("<p>hi</p>", [stylesheet], css="p { color: blue; }")
+        assert pdf.startswith(b"%PDF")
@@ -0,0 +1,81 @@
+import os
+import pytest
+
+from project.util.lambda_worker_pool import get_rss_bytes
+from project.util.server_side_cursor import (
+    server_side_cursor,
+    iter_cursor_batches,
+    get_columns_and_rows,
+)
+
+
+class FakeColumn:
+    def __init__(self, name):
+        self.name = name
+
+
+class FakeServerSideCursor:
+    def __init__(self, rows):
+        self.rows = rows
+        self.description = None
+        self.fetch_sizes = []
+
+    def fetchmany(self, size):
+        self.description = [FakeColumn("foo"), FakeColumn("bar")]
+        self.fetch_sizes.append(size)
+        batch, self.rows = self.rows[:size], self.rows[size:]
+        return batch
+
+
+def test_iter_cursor_batches_works():
+    cursor = FakeServerSideCursor([(i, i) for i in range(5)])
+    assert list(iter_cursor_batches(cursor, 2)) == [
+        [(0, 0), (1, 1)],
+        [(2, 2), (3, 3)],
+        [(4, 4)],
+    ]
+    assert cursor.fetch_sizes == [2, 2, 2, 2]
+
+
+def test_get_columns_and_rows_fetches_before_reading_description():
+    cursor = FakeServerSideCursor([(1, 2), (3, 4), (5, 6)])
+    columns, rows = get_columns_and_rows(cursor, 2)
+    assert columns == ["foo", "bar"]
+    assert list(rows) == [(1, 2), (3, 4), (5, 6)]
+
+
+def test_get_columns_and_rows_works_with_no_rows():
+    columns, rows = get_columns_and_rows(FakeServerSideCursor([]))
+    assert columns == ["foo", "bar"]
+    assert list(rows) == []
+
+
+@pytest.mark.django_db
+def test_server_side_cursor_works():
+    with server_side_cursor() as cursor:
+        cursor.execute("SELECT generate_series(1, 5) AS n")
+        columns, rows = get_columns_and_rows(cursor, 2)
+        assert columns == ["n"]
+        assert [row[0] for row in rows] == [1, 2, 3, 4, 5]
+
+
+@pytest.mark.django_db
+def test_server_side_cursor_uses_bounded_memory():
+    if get_rss_bytes(os.getpid()) is None:
+        pytest.skip("Unable to determine RSS of this process")
+
+    max_growth = 50 * 1024 * 1024
+    initial_rss = get_rss_bytes(os.getpid())
+    peak_rss = initial_rss
+    count = 0
+    with server_side_cursor() as cursor:
+        cursor.execute(
+            "SELECT n, repeat(md5(n::text), 4) AS blob FROM generate_series(1, 1000000) AS n"
+        )
+        _, rows = get_columns_and_rows(cursor, 2000)
+        for _ in rows:
+            count += 1
+            if count % 50000 == 0:
+                peak_rss = max(peak_rss, get_rss_bytes(os.getpid()) or 0)
+    assert count == 1000000
+    assert peak_rss - initial_rss < max_growth
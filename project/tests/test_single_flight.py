@@ -0,0 +1,62 @@
+import time
+from threading import Barrier, Thread
+import pytest
+
+from project.util.single_flight import SingleFlight
+
+
+NUM_THREADS = 5
+
+
+def run_concurrently(flight: SingleFlight, fn):
+    barrier = Barrier(NUM_THREADS)
+    results = []
+
+    def run():
+        barrier.wait()
+        try:
+            results.append(flight.run("key", fn))
+        except Exception as e:
+            results.append(e)
+
+    threads = [Thread(target=run) for _ in range(NUM_THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_calls_share_one_result():
+    calls = []
+
+    def work():
+        calls.append(1)
+        time.sleep(0.1)
+        return "done"
+
+    assert run_concurrently(SingleFlight(), work) == ["done"] * NUM_THREADS
+    assert len(calls) == 1
+
+
+def test_concurrent_calls_share_one_exception():
+    calls = []
+
+    def work():
+        calls.append(1)
+        time.sleep(0.1)
+        raise ValueError("oops")
+
+    results = run_concurrently(SingleFlight(), work)
+    assert len(results) == NUM_THREADS
+    assert all(isinstance(result, ValueError) for result in results)
+    assert len(calls) == 1
+
+
+def test_sequential_calls_do_not_share_results():
+    flight = SingleFlight()
+    assert flight.run("key", lambda: 1) == 1
+    assert flight.run("key", lambda: 2) == 2
+    with pytest.raises(ValueError):
+        flight.run("key", lambda: int("boop"))
+    assert flight.run("key", lambda: 3) == 3
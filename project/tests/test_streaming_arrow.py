@@ -0,0 +1,150 @@
+import datetime
+import decimal
+from typing import Any, NamedTuple
+import pyarrow
+import pyarrow.ipc
+import pyarrow.parquet as pyarrow_parquet
+
+from project.util.data_dictionary import DataDictionary, DataDictionaryEntry
+from project.util.streaming_arrow import (
+    PG_BOOL,
+    PG_INT4,
+    PG_NUMERIC,
+    PG_TEXT,
+    PG_TIMESTAMPTZ,
+    generate_arrow_record_batches,
+    generate_streaming_arrow,
+    generate_streaming_parquet,
+    get_arrow_columns,
+    streaming_parquet_response,
+)
+
+
+class FakeColumn(NamedTuple):
+    name: str
+    type_code: int
+
+
+class FakeCursor:
+    def __init__(self, description, rows):
+        self._description = description
+        self.description = None
+        self.rows = rows
+
+    def fetchmany(self, size):
+        self.description = self._description
+        batch, self.rows = self.rows[:size], self.rows[size:]
+        return batch
+
+
+UNKNOWN_OID = 2950
+
+DESCRIPTION = [
+    FakeColumn("id", PG_INT4),
+    FakeColumn("is_cool", PG_BOOL),
+    FakeColumn("name", PG_TEXT),
+    FakeColumn("amount", PG_NUMERIC),
+    FakeColumn("created_at", PG_TIMESTAMPTZ),
+    FakeColumn("tags", 1009),
+    FakeColumn("blob", UNKNOWN_OID),
+]
+
+NOW = datetime.datetime(2021, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc)
+
+ROWS = [
+    (1, True, "boop", decimal.Decimal("1.5"), NOW, ["a", "b"], {"x": 1}),
+    (2, None, None, None, None, None, None),
+    (3, False, "jones", decimal.Decimal("2"), NOW, [], "hi"),
+]
+
+
+def make_cursor(rows=ROWS):
+    return FakeCursor(DESCRIPTION, rows)
+
+
+def to_pylist(batches) -> Any:
+    return pyarrow.Table.from_batches(list(batches)).to_pylist()
+
+
+def test_get_arrow_columns_works():
+    columns = get_arrow_columns(DESCRIPTION)
+    assert [str(column.field.type) for column in columns] == [
+        "int32",
+        "bool",
+        "string",
+        "double",
+        "timestamp[us, tz=UTC]",
+        "list<item: string>",
+        "string",
+    ]
+
+
+def test_get_arrow_columns_uses_data_dictionary():
+    from users.models import JustfixUser
+
+    dd = DataDictionary(
+        blob=DataDictionaryEntry(
+            help_text="When the user joined.", field=JustfixUser._meta.get_field("date_joined")
+        ),
+    )
+    field = get_arrow_columns(DESCRIPTION, dd)[-1].field
+    assert str(field.type) == "timestamp[us, tz=UTC]"
+    assert field.metadata == {b"description": b"When the user joined."}
+
+
+def test_generate_arrow_record_batches_works():
+    batches = list(generate_arrow_record_batches(make_cursor(), itersize=2))
+    assert [batch.num_rows for batch in batches] == [2, 1]
+    assert to_pylist(batches) == [
+        {
+            "id": 1,
+            "is_cool": True,
+            "name": "boop",
+            "amount": 1.5,
+            "created_at": NOW,
+            "tags": ["a", "b"],
+            "blob": '{"x": 1}',
+        },
+        {**dict.fromkeys([column.name for column in DESCRIPTION]), "id": 2},
+        {
+            "id": 3,
+            "is_cool": False,
+            "name": "jones",
+            "amount": 2.0,
+            "created_at": NOW,
+            "tags": [],
+            "blob": "hi",
+        },
+    ]
+
+
+def test_generate_arrow_record_batches_yields_empty_batch_if_no_rows():
+    batches = list(generate_arrow_record_batches(make_cursor([])))
+    assert len(batches) == 1
+    assert batches[0].num_rows == 0
+    assert batches[0].schema.names == [column.name for column in DESCRIPTION]
+
+
+def test_generate_streaming_arrow_works():
+    batches = generate_arrow_record_batches(make_cursor(), itersize=2)
+    data = b"".join(generate_streaming_arrow(batches))
+    table = pyarrow.ipc.open_stream(data).read_all()
+    assert table.to_pylist() == to_pylist(generate_arrow_record_batches(make_cursor()))
+
+
+def test_generate_streaming_parquet_works(tmp_path):
+    batches = generate_arrow_record_batches(make_cursor(ROWS * 100), itersize=2)
+    path = tmp_path / "boop.parquet"
+    path.write_bytes(b"".join(generate_streaming_parquet(batches, row_group_size=100)))
+    parquet_file = pyarrow_parquet.ParquetFile(path)
+    assert parquet_file.num_row_groups == 3
+    assert parquet_file.read().to_pylist() == to_pylist(
+        generate_arrow_record_batches(make_cursor(ROWS * 100))
+    )
+
+
+def test_streaming_parquet_response_works():
+    r = streaming_parquet_response(generate_arrow_record_batches(make_cursor()), "boop.parquet")
+    assert r["Content-Type"] == "application/vnd.apache.parquet"
+    assert r["Content-Disposition"] == 'attachment; filename="boop.parquet"'
+    assert b"".join(r).startswith(b"PAR1")
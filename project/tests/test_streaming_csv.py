@@ -12,17 +12,26 @@ rows = [["a", "b", "c"], ["d", "e", "f\u2026"]]
 
 def test_generate_streaming_csv_works():
     g = generate_streaming_csv(rows)
-    assert next(g) == "a,b,c\r\n"
-    assert next(g) == "d,e,f\u2026\r\n"
+    assert next(g) == "a,b,c\r\nd,e,f\u2026\r\n"
     with pytest.raises(StopIteration):
         next(g)
 
 
+def test_generate_streaming_csv_yields_chunks():
+    chunks = list(generate_streaming_csv([["boop"]] * 250, chunk_size=1000))
+    assert [len(chunk) for chunk in chunks] == [1200, 300]
+    assert "".join(chunks) == "boop\r\n" * 250
+
+
+def test_generate_streaming_csv_works_with_no_rows():
+    assert list(generate_streaming_csv([])) == []
+
+
 def test_streaming_csv_response_works():
     r = streaming_csv_response(rows, "boop.csv")
     assert r["Content-Type"] == "text/csv"
     assert r["Content-Disposition"] == 'attachment; filename="boop.csv"'
-    assert list(r) == [b"a,b,c\r\n", "d,e,f\u2026\r\n".encode("utf-8")]
+    assert list(r) == ["a,b,c\r\nd,e,f\u2026\r\n".encode("utf-8")]
 
 
 def test_transform_csv_row_works():
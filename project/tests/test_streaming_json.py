@@ -36,15 +36,21 @@ def test_generate_json_rows_works(db):
 
 def test_generate_streaming_json_works():
     g = generate_streaming_json(rows)
-    assert next(g) == "["
-    assert json.loads(next(g)) == rows[0]
-    assert next(g) == ","
-    assert json.loads(next(g)) == rows[1]
-    assert next(g) == "]"
+    assert next(g) == '[{"a": 1, "b": "hi"},{"a": 2, "b": "boop\\u2026"}]'
     with pytest.raises(StopIteration):
         next(g)
 
 
+def test_generate_streaming_json_yields_chunks():
+    chunks = list(generate_streaming_json([{"a": 1}] * 250, chunk_size=1000))
+    assert [len(chunk) for chunk in chunks] == [1800, 451]
+    assert json.loads("".join(chunks)) == [{"a": 1}] * 250
+
+
+def test_generate_streaming_json_works_with_no_rows():
+    assert list(generate_streaming_json([])) == ["[]"]
+
+
 def test_streaming_json_response_works():
     r = streaming_json_response(rows, "boop.json")
     assert r["Content-Type"] == "application/json"
@@ -0,0 +1,64 @@
+import pytest
+
+from project.util.token_bucket import TokenBucket
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def make_bucket(rate, capacity=1.0):
+    fake_time = FakeTime()
+    return fake_time, TokenBucket(rate, capacity, clock=fake_time.clock, sleep=fake_time.sleep)
+
+
+def test_it_does_not_wait_when_tokens_are_available():
+    fake_time, bucket = make_bucket(rate=1.0, capacity=3)
+    for _ in range(3):
+        bucket.acquire()
+    assert fake_time.sleeps == []
+
+
+def test_it_waits_when_tokens_are_exhausted():
+    fake_time, bucket = make_bucket(rate=2.0)
+    bucket.acquire()
+    bucket.acquire()
+    bucket.acquire()
+    assert fake_time.sleeps == [0.5, 0.5]
+
+
+def test_it_refills_over_time():
+    fake_time, bucket = make_bucket(rate=2.0)
+    bucket.acquire()
+    fake_time.now += 0.25
+    bucket.acquire()
+    assert fake_time.sleeps == [0.25]
+
+
+def test_it_does_not_refill_beyond_capacity():
+    fake_time, bucket = make_bucket(rate=1.0, capacity=2)
+    fake_time.now += 100
+    for _ in range(3):
+        bucket.acquire()
+    assert fake_time.sleeps == [1.0]
+
+
+def test_it_queues_concurrent_callers():
+    fake_time, bucket = make_bucket(rate=1.0)
+    # Simulate several threads reserving tokens before any of them sleep.
+    assert [bucket._reserve() for _ in range(3)] == [0.0, 1.0, 2.0]
+
+
+@pytest.mark.parametrize("rate,capacity", [(0, 1), (-1, 1), (1, 0.5)])
+def test_it_validates_arguments(rate, capacity):
+    with pytest.raises(ValueError):
+        TokenBucket(rate, capacity)
@@ -1,22 +1,25 @@
 from pathlib import Path
+from typing import Any, Dict, Tuple
 from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX
 
 from project.util.site_util import absolute_reverse
 from project.admin_download_data import DataDownload
 from users.models import CHANGE_USER_PERMISSION
+from data_snapshots.snapshots import SnapshotConfig
 
 
 MY_DIR = Path(__file__).parent.resolve()
 USER_STATS_SQLFILE = MY_DIR / "userstats.sql"
+USER_STATS_CHANGED_USERS_SQLFILE = MY_DIR / "userstats_changed_users.sql"
 
 
-def execute_user_stats_query(cursor, include_pad_bbl: bool = False):
+def get_user_stats_query(include_pad_bbl: bool = False) -> Tuple[str, Dict[str, Any]]:
     from hpaction.models import HP_DOCUSIGN_STATUS_CHOICES
 
     admin_url_begin, admin_url_end = absolute_reverse(
         "admin:users_justfixuser_change", args=(999,)
     ).split("999")
-    cursor.execute(
+    return (
         USER_STATS_SQLFILE.read_text(),
         {
             "include_pad_bbl": include_pad_bbl,
@@ -28,6 +31,18 @@ def execute_user_stats_query(cursor, include_pad_bbl: bool = False):
     )
 
 
+def execute_user_stats_query(cursor, include_pad_bbl: bool = False):
+    cursor.execute(*get_user_stats_query(include_pad_bbl))
+
+
+def get_user_stats_snapshot_config(include_pad_bbl: bool) -> SnapshotConfig:
+    return SnapshotConfig(
+        get_query=lambda: get_user_stats_query(include_pad_bbl),
+        key_column="user_id",
+        changed_keys_sql=USER_STATS_CHANGED_USERS_SQLFILE.read_text(),
+    )
+
+
 DATA_DOWNLOADS = [
     DataDownload(
         name="User statistics",
@@ -39,6 +54,7 @@ DATA_DOWNLOADS = [
             """,
         perms=[CHANGE_USER_PERMISSION],
         execute_query=lambda cur, user: execute_user_stats_query(cur, include_pad_bbl=False),
+        snapshot=get_user_stats_snapshot_config(include_pad_bbl=False),
     ),
     DataDownload(
         name="User statistics with BBLs",
@@ -49,5 +65,6 @@ DATA_DOWNLOADS = [
             """,
         perms=[CHANGE_USER_PERMISSION],
         execute_query=lambda cur, user: execute_user_stats_query(cur, include_pad_bbl=True),
+        snapshot=get_user_stats_snapshot_config(include_pad_bbl=True),
     ),
 ]
@@ -0,0 +1,30 @@
+-- The ids of all users whose statistics may have changed since a given
+-- time, used to incrementally refresh snapshots of user statistics.
+--
+-- Note that some of the tables that user statistics are derived from
+-- don't keep track of when their rows were last changed, and none of
+-- them keep track of deletions, so those kinds of changes are only
+-- picked up when a snapshot is fully refreshed.
+SELECT user_id FROM onboarding_onboardinginfo WHERE updated_at > %(since)s
+UNION
+SELECT id FROM users_justfixuser WHERE date_joined > %(since)s OR last_login > %(since)s
+UNION
+SELECT user_id FROM issues_issue WHERE updated_at > %(since)s
+UNION
+SELECT user_id FROM issues_customissue WHERE updated_at > %(since)s
+UNION
+SELECT user_id FROM loc_letterrequest WHERE updated_at > %(since)s
+UNION
+SELECT user_id FROM hpaction_hpactiondocuments WHERE updated_at > %(since)s
+UNION
+SELECT hp.user_id
+FROM hpaction_docusignenvelope AS de
+INNER JOIN hpaction_hpactiondocuments AS hp ON de.docs_id = hp.id
+WHERE de.created_at > %(since)s
+UNION
+SELECT jfuser.id
+FROM users_justfixuser AS jfuser
+INNER JOIN
+    texting_phonenumberlookup AS phone_number_lookup
+    ON jfuser.phone_number = phone_number_lookup.phone_number
+WHERE phone_number_lookup.updated_at > %(since)s
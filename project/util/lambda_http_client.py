@@ -7,6 +7,7 @@ from dataclasses import dataclass, field
 from threading import RLock, Thread
 from pathlib import Path
 import requests
+import requests.adapters
 
 from .lambda_service import get_latest_mtime_for_bundle, LambdaService
 
@@ -61,7 +62,16 @@ class LambdaHttpClient(LambdaService):
     # Extra arguments to pass to the interpreter.
     interpreter_args: List[str] = field(default_factory=list)
 
+    # The maximum number of keep-alive connections to the server that
+    # we'll keep open at once.
+    max_connections: int = 10
+
     def __post_init__(self) -> None:
+        self.__session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=1, pool_maxsize=self.max_connections
+        )
+        self.__session.mount("http://", adapter)
         self.__process: Optional[subprocess.Popen] = None
         self.__process_output = b""
         self.__port: Optional[int] = None
@@ -81,6 +91,7 @@ class LambdaHttpClient(LambdaService):
                 self.__process = None
                 child.kill()
                 logger.debug(f"Destroyed {self.name} lambda process with pid {child.pid}.")
+            self.__session.close()
             atexit.unregister(self.shutdown)
 
     def __kill_process_if_script_changed(self):
@@ -183,10 +194,116 @@ class LambdaHttpClient(LambdaService):
         """
 
         try:
-            res = requests.post(self.get_url(), json=event, timeout=timeout or self.timeout_secs)
+            res = self.__session.post(
+                self.get_url(), json=event, timeout=timeout or self.timeout_secs
+            )
             res.raise_for_status()
             return res.json()
         except Exception:
             logger.warning("Lambda process is misbehaving, shutting it down.")
             self.shutdown()
             raise
+
+
+@dataclass
+class LambdaHttpReplicaSet(LambdaService):
+    """
+    This class runs several replicas of the same lambda HTTP server,
+    each in its own process listening on its own port, and routes each
+    request to the replica with the fewest requests currently in flight.
+
+    This allows a single host process to use several cores for its
+    lambda requests, rather than serializing them all on one server's
+    event loop. If a replica misbehaves, only that replica is shut down;
+    it will be restarted the next time a request is routed to it.
+    """
+
+    # A descriptive name for the servers, used in logging messages.
+    name: str
+
+    # A path to the servers' script.
+    script_path: Path
+
+    # The current working directory to run the servers in.
+    cwd: Path
+
+    # How many server processes to run.
+    size: int = 2
+
+    # The path to the interpreter for the servers' script.
+    interpreter_path: Path = Path("node")
+
+    # The number of seconds we'll give a server to start up, and to
+    # handle its event and return a response before we consider it a
+    # runaway and terminate it.
+    timeout_secs: float = 5.0
+
+    # Whether to restart a server whenever we detect that its script has
+    # changed. This is useful for development.
+    restart_on_script_change: bool = False
+
+    # Extra arguments to pass to the servers' script.
+    script_args: List[str] = field(default_factory=list)
+
+    # Extra arguments to pass to the interpreter.
+    interpreter_args: List[str] = field(default_factory=list)
+
+    # The maximum number of keep-alive connections to each server that
+    # we'll keep open at once.
+    max_connections: int = 10
+
+    def __post_init__(self) -> None:
+        self.replicas = [
+            LambdaHttpClient(
+                f"{self.name}[{i}]",
+                self.script_path,
+                cwd=self.cwd,
+                interpreter_path=self.interpreter_path,
+                timeout_secs=self.timeout_secs,
+                restart_on_script_change=self.restart_on_script_change,
+                script_args=self.script_args,
+                interpreter_args=self.interpreter_args,
+                max_connections=self.max_connections,
+            )
+            for i in range(self.size)
+        ]
+        self.__outstanding = [0] * self.size
+        self.__lock = RLock()
+
+    def shutdown(self):
+        """
+        Shutdown all the servers that are running.
+        """
+
+        for replica in self.replicas:
+            replica.shutdown()
+
+    def __acquire_replica(self) -> int:
+        with self.__lock:
+            # Prefer running replicas, so that we don't pay a server's
+            # startup cost when there's an idle one ready to go.
+            index = min(
+                range(self.size),
+                key=lambda i: (self.__outstanding[i], not self.replicas[i].is_running),
+            )
+            self.__outstanding[index] += 1
+            return index
+
+    def __release_replica(self, index: int) -> None:
+        with self.__lock:
+            self.__outstanding[index] -= 1
+
+    def run_handler(self, event: Any, timeout: Optional[float] = None) -> Any:
+        """
+        Make a request to the least busy server, passing it the given
+        JSON-serializable event as input, and returning the server's
+        response as deserialized JSON.
+
+        If the server misbehaves in any way, it alone is shut down.
+        """
+
+        index = self.__acquire_replica()
+        try:
+            return self.replicas[index].run_handler(event, timeout=timeout)
+        finally:
+            self.__release_replica(index)
@@ -0,0 +1,344 @@
+import os
+import sys
+import time
+import json
+import atexit
+import select
+import struct
+import logging
+import subprocess
+from dataclasses import dataclass, field
+from typing import List, Any, BinaryIO, Optional
+from threading import RLock, BoundedSemaphore, Thread
+from pathlib import Path
+
+from .lambda_service import LambdaService, get_latest_mtime_for_bundle
+from .lambda_pool import MalformedResponseError
+
+
+logger = logging.getLogger(__name__)
+
+# Each frame is prefixed with its length, encoded as a 32-bit
+# big-endian unsigned integer.
+FRAME_HEADER = struct.Struct(">I")
+
+READ_CHUNK_SIZE = 65536
+
+
+class WorkerCheckoutTimeoutError(Exception):
+    """
+    This error is raised if no lambda worker becomes available
+    within the pool's checkout timeout.
+    """
+
+    pass
+
+
+def get_rss_bytes(pid: int) -> Optional[int]:
+    """
+    Return the resident set size of the given process in bytes,
+    or None if it can't be determined (e.g. because we're not on
+    Linux, or the process no longer exists).
+    """
+
+    try:
+        with open(f"/proc/{pid}/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+class LambdaWorker:
+    """
+    A single long-lived lambda process that handles many events,
+    one at a time, over a length-prefixed stdin/stdout protocol.
+    """
+
+    def __init__(self, pool: "LambdaWorkerPool", generation: int) -> None:
+        self.pool = pool
+        self.generation = generation
+        self.request_count = 0
+        self.child = subprocess.Popen(
+            [
+                str(pool.interpreter_path),
+                *pool.interpreter_args,
+                str(pool.script_path),
+                *pool.script_args,
+            ],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=pool.cwd,
+        )
+        self.__stderr_thread = Thread(target=self.__pump_stderr)
+        self.__stderr_thread.daemon = True
+        self.__stderr_thread.start()
+        logger.debug(f"Created {pool.name} lambda worker with pid {self.pid}.")
+
+    @property
+    def pid(self) -> int:
+        return self.child.pid
+
+    @property
+    def is_alive(self) -> bool:
+        return self.child.poll() is None
+
+    def __pump_stderr(self) -> None:
+        assert self.child.stderr is not None
+        for line in iter(self.child.stderr.readline, b""):
+            self.pool._write_stderr(line)
+
+    def __read_exactly(self, size: int, deadline: float) -> bytes:
+        assert self.child.stdout is not None
+        fd = self.child.stdout.fileno()
+        chunks: List[bytes] = []
+        remaining = size
+        while remaining > 0:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0 or not select.select([fd], [], [], timeout)[0]:
+                raise subprocess.TimeoutExpired(self.child.args, self.pool.timeout_secs)
+            chunk = os.read(fd, min(remaining, READ_CHUNK_SIZE))
+            if not chunk:
+                self.child.wait(timeout=self.pool.timeout_secs)
+                raise subprocess.CalledProcessError(
+                    self.child.returncode, self.child.args, output=b"".join(chunks)
+                )
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        return b"".join(chunks)
+
+    def send(self, event: Any, timeout_secs: float) -> Any:
+        """
+        Send an event to the worker and return its response.
+        """
+
+        assert self.child.stdin is not None
+        deadline = time.monotonic() + timeout_secs
+        payload = json.dumps(event).encode("utf-8")
+        self.request_count += 1
+        try:
+            self.child.stdin.write(FRAME_HEADER.pack(len(payload)) + payload)
+            self.child.stdin.flush()
+        except BrokenPipeError:
+            self.child.wait(timeout=self.pool.timeout_secs)
+            raise subprocess.CalledProcessError(self.child.returncode, self.child.args)
+        (length,) = FRAME_HEADER.unpack(self.__read_exactly(FRAME_HEADER.size, deadline))
+        output = self.__read_exactly(length, deadline)
+        try:
+            return json.loads(output.decode("utf-8"))
+        except Exception as e:
+            raise MalformedResponseError(e, self.pool.name, output=output, stderr=b"")
+
+    def kill(self) -> None:
+        self.child.kill()
+        self.child.wait()
+        logger.debug(f"Destroyed {self.pool.name} lambda worker with pid {self.pid}.")
+
+
+@dataclass
+class LambdaWorkerPool(LambdaService):
+    """
+    This class maintains a pool of long-lived lambda processes, each of
+    which handles many events over its lifetime. Unlike LambdaPool, which
+    spawns a new process for every event, this avoids paying the
+    interpreter's startup and script parsing costs on every request.
+
+    Specifically, by "lambda worker" we mean a process that:
+
+        * Is a language interpreter (by default, Node.js) running a script.
+
+        * Repeatedly reads a length-prefixed, UTF-8 JSON-encoded event
+          from stdin and writes a length-prefixed, UTF-8 JSON-encoded
+          response to stdout. Each length prefix is a 32-bit big-endian
+          unsigned integer.
+
+        * Exits with a nonzero exit code if it fails to handle an event.
+
+    Concurrent callers check workers out of the pool; if all workers
+    are busy, callers wait (up to a timeout) for one to be returned.
+
+    Workers are recycled after they have handled a maximum number of
+    requests, or if their memory usage grows too large.
+    """
+
+    # A descriptive name for the lambda process, used in logging messages.
+    name: str
+
+    # A path to the lambda process' script.
+    script_path: Path
+
+    # The current working directory to run the lambda process in.
+    cwd: Path
+
+    # The maximum number of lambda workers to have running.
+    size: int = 5
+
+    # The number of seconds we'll give a lambda worker to handle its
+    # event and return a response before we consider it a runaway and
+    # terminate it.
+    timeout_secs: float = 5.0
+
+    # The number of seconds a caller will wait for a lambda worker to
+    # become available before a WorkerCheckoutTimeoutError is raised.
+    checkout_timeout_secs: float = 10.0
+
+    # The number of events a lambda worker will handle before it is
+    # recycled. If zero, workers are never recycled for this reason.
+    max_requests_per_worker: int = 1000
+
+    # The resident set size, in bytes, above which a lambda worker will be
+    # recycled. If zero, workers are never recycled for this reason.
+    max_rss_bytes: int = 0
+
+    # The path to the interpreter for the lambda process' script.
+    interpreter_path: Path = Path("node")
+
+    # Extra arguments to pass to the lambda process' script.
+    script_args: List[str] = field(default_factory=list)
+
+    # Extra arguments to pass to the interpreter.
+    interpreter_args: List[str] = field(default_factory=list)
+
+    # Whether to restart the pool's workers whenever we detect that the
+    # lambda process' script has changed. This is useful for development.
+    restart_on_script_change: bool = False
+
+    # Stream to automatically send any stderr output from
+    # lambda workers to.
+    stderr: Optional[BinaryIO] = sys.stderr.buffer if hasattr(sys.stderr, "buffer") else None
+
+    def __post_init__(self) -> None:
+        self.__idle_workers: List[LambdaWorker] = []
+        self.__lock = RLock()
+        self.__stderr_lock = RLock()
+        self.__checkouts = BoundedSemaphore(self.size)
+        self.__generation = 0
+        self.__script_path_mtime = 0.0
+
+    def _write_stderr(self, data: bytes) -> None:
+        with self.__stderr_lock:
+            if self.stderr:
+                self.stderr.write(data)
+                self.stderr.flush()
+
+    def __restart_if_script_changed(self) -> None:
+        mtime = get_latest_mtime_for_bundle(self.script_path)
+        if mtime != self.__script_path_mtime:
+            self.__script_path_mtime = mtime
+            logger.debug(
+                f"Change detected in {self.script_path.name}, "
+                f"restarting {self.name} lambda workers."
+            )
+            self.empty()
+
+    def __should_recycle(self, worker: LambdaWorker) -> bool:
+        if worker.generation != self.__generation or not worker.is_alive:
+            return True
+        if self.max_requests_per_worker and worker.request_count >= self.max_requests_per_worker:
+            logger.debug(
+                f"Recycling {self.name} lambda worker with pid {worker.pid} after "
+                f"{worker.request_count} requests."
+            )
+            return True
+        if self.max_rss_bytes:
+            rss = get_rss_bytes(worker.pid)
+            if rss is not None and rss > self.max_rss_bytes:
+                logger.info(
+                    f"Recycling {self.name} lambda worker with pid {worker.pid} because "
+                    f"its RSS is {rss} bytes."
+                )
+                return True
+        return False
+
+    def __checkout(self) -> LambdaWorker:
+        if not self.__checkouts.acquire(timeout=self.checkout_timeout_secs):
+            raise WorkerCheckoutTimeoutError(
+                f"No {self.name} lambda worker became available within "
+                f"{self.checkout_timeout_secs}s"
+            )
+        try:
+            with self.__lock:
+                if self.restart_on_script_change:
+                    self.__restart_if_script_changed()
+
+                # Make sure we clean up when the process exits.
+                atexit.register(self.empty)
+
+                # It's important that we pop from the *end* of our list, as
+                # the most recently used workers are the ones most likely
+                # to have warm caches.
+                while self.__idle_workers:
+                    worker = self.__idle_workers.pop()
+                    if worker.is_alive:
+                        return worker
+                    worker.kill()
+                return LambdaWorker(self, self.__generation)
+        except BaseException:
+            self.__checkouts.release()
+            raise
+
+    def __checkin(self, worker: LambdaWorker, is_healthy: bool) -> None:
+        try:
+            with self.__lock:
+                if is_healthy and not self.__should_recycle(worker):
+                    self.__idle_workers.append(worker)
+                    return
+            worker.kill()
+        finally:
+            self.__checkouts.release()
+
+    def empty(self) -> None:
+        """
+        Terminate any idle lambda workers. Workers that are currently
+        handling events will be terminated once they're done.
+        """
+
+        with self.__lock:
+            self.__generation += 1
+            while self.__idle_workers:
+                self.__idle_workers.pop().kill()
+
+            # We know we're empty at this point, so we don't need to clean up
+            # anything later.
+            atexit.unregister(self.empty)
+
+    def run_handler(self, event: Any, timeout_secs: Optional[float] = None) -> Any:
+        """
+        Send an event to a lambda worker and return its response.
+
+        A subprocess.TimeoutExpired exception will be raised if the worker
+        takes too long to respond (it will automatically be terminated as well).
+
+        A subprocess.CalledProcessError will be raised if the worker exits
+        before returning a response.
+
+        A MalformedResponseError will be raised if the worker didn't return
+        valid UTF-8 encoded JSON.
+
+        A WorkerCheckoutTimeoutError will be raised if no worker becomes
+        available in time.
+        """
+
+        if timeout_secs is None:
+            timeout_secs = self.timeout_secs
+
+        worker = self.__checkout()
+        is_healthy = False
+        try:
+            response = worker.send(event, timeout_secs)
+            is_healthy = True
+            return response
+        except subprocess.TimeoutExpired:
+            logger.warning(f"Killed runaway {self.name} lambda worker with pid {worker.pid}.")
+            raise
+        except subprocess.CalledProcessError:
+            logger.warning(f"{self.name} lambda worker crashed.")
+            raise
+        except MalformedResponseError:
+            logger.warning(f"{self.name} lambda worker returned a malformed response.")
+            raise
+        finally:
+            self.__checkin(worker, is_healthy)
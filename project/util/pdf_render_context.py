@@ -0,0 +1,131 @@
+"""
+A process-wide context for rendering PDFs with WeasyPrint.
+
+Creating a WeasyPrint `FontConfiguration` makes fontconfig scan for fonts,
+and parsing stylesheets (especially ones with lots of @font-face rules)
+is slow, so when rendering many PDFs in the same process (e.g. in a
+Celery worker), we build these once and reuse them across renders.
+"""
+
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+
+# The maximum number of stylesheets passed as strings that we'll
+# keep parsed versions of.
+MAX_CACHED_CSS_STRINGS = 16
+
+
+def read_stylesheet(path: Path) -> str:
+    """
+    Read the given stylesheet, converting any URLs in it that are relative
+    to its directory into absolute file URLs, since WeasyPrint won't
+    otherwise know where to find them.
+    """
+
+    return path.read_text().replace("url(./", f"url({path.parent.as_uri()}/")
+
+
+class PdfRenderContext:
+    def __init__(self):
+        self._lock = Lock()
+        self._font_config: Any = None
+        self._stylesheets: Dict[Path, Tuple[float, Any]] = {}
+        self._css_strings: "OrderedDict[str, Any]" = OrderedDict()
+
+    @property
+    def font_config(self):
+        with self._lock:
+            if self._font_config is None:
+                from weasyprint.fonts import FontConfiguration
+
+                self._font_config = FontConfiguration()
+            return self._font_config
+
+    def get_stylesheet(self, path: Path):
+        """
+        Return the parsed version of the stylesheet at the given path,
+        re-parsing it if it has been modified since we last did.
+
+        Any @font-face rules in the stylesheet are added to our font
+        configuration.
+        """
+
+        import weasyprint
+
+        mtime = path.stat().st_mtime
+        with self._lock:
+            cached = self._stylesheets.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        css = weasyprint.CSS(string=read_stylesheet(path), font_config=self.font_config)
+        with self._lock:
+            self._stylesheets[path] = (mtime, css)
+        return css
+
+    def get_css(self, css: str):
+        """
+        Return the parsed version of the given stylesheet.
+        """
+
+        import weasyprint
+
+        with self._lock:
+            if css in self._css_strings:
+                self._css_strings.move_to_end(css)
+                return self._css_strings[css]
+        parsed = weasyprint.CSS(string=css)
+        with self._lock:
+            self._css_strings[css] = parsed
+            while len(self._css_strings) > MAX_CACHED_CSS_STRINGS:
+                self._css_strings.popitem(last=False)
+        return parsed
+
+    def render_pdf_bytes(
+        self, html: str, stylesheet_paths: Sequence[Path] = (), css: Optional[str] = None
+    ) -> bytes:
+        """
+        Render the given HTML to a PDF using the stylesheets at the given
+        paths, followed by the given additional CSS, if any.
+        """
+
+        import weasyprint
+
+        stylesheets: List[Any] = [self.get_stylesheet(path) for path in stylesheet_paths]
+        if css is not None:
+            stylesheets.append(self.get_css(css))
+        return weasyprint.HTML(string=html).write_pdf(
+            stylesheets=stylesheets, font_config=self.font_config
+        )
+
+
+_context: Optional[PdfRenderContext] = None
+
+_context_lock = Lock()
+
+
+def get_pdf_render_context() -> PdfRenderContext:
+    """
+    Return the process-wide PDF render context, creating it if needed.
+    """
+
+    global _context
+
+    with _context_lock:
+        if _context is None:
+            _context = PdfRenderContext()
+        return _context
+
+
+def reset_pdf_render_context() -> None:
+    """
+    Discard the process-wide PDF render context, so that the next render
+    starts from scratch. This is mostly useful for tests and benchmarks.
+    """
+
+    global _context
+
+    with _context_lock:
+        _context = None
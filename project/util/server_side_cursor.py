@@ -0,0 +1,89 @@
+import itertools
+from contextlib import contextmanager
+from typing import Any, Iterator, List, Sequence, Tuple
+from django.db import connections, transaction, DEFAULT_DB_ALIAS
+
+
+# The default number of rows to fetch from the database at once when
+# iterating over a cursor's results.
+DEFAULT_ITERSIZE = 2000
+
+
+@contextmanager
+def server_side_cursor(using: str = DEFAULT_DB_ALIAS):
+    """
+    Yield a database cursor whose results stay on the database server
+    until they're fetched, so that iterating over a large result set in
+    batches uses a bounded amount of memory.
+
+    A transaction is opened for the lifetime of the cursor, since
+    Postgres only supports server-side cursors within one (outside of
+    a transaction, Django would have to declare it WITH HOLD, which
+    makes Postgres materialize the whole result set first).
+
+    Note that the cursor's `description` won't be available until its
+    first rows have been fetched, and that only a single query can be
+    executed on it.
+
+    If the DISABLE_SERVER_SIDE_CURSORS database setting is set (e.g.
+    because a transaction-pooling connection pooler is in use),
+    this falls back to a regular cursor.
+    """
+
+    with transaction.atomic(using=using):
+        with connections[using].chunked_cursor() as cursor:
+            yield cursor
+
+
+def iter_cursor_batches(cursor, itersize: int = DEFAULT_ITERSIZE) -> Iterator[List[Tuple]]:
+    """
+    Iterate through the given cursor's results in lists of
+    up to `itersize` rows.
+    """
+
+    while True:
+        rows = cursor.fetchmany(itersize)
+        if not rows:
+            break
+        yield rows
+
+
+def get_description_and_batches(
+    cursor, itersize: int = DEFAULT_ITERSIZE
+) -> Tuple[Sequence[Any], Iterator[List[Tuple]]]:
+    """
+    Return the given cursor's description, along with an iterator
+    over lists of up to `itersize` of its rows.
+
+    This works with both regular and server-side cursors.
+    """
+
+    batches = iter_cursor_batches(cursor, itersize)
+
+    # Server-side cursors don't know their description until their
+    # first rows have been fetched.
+    first_batch = next(batches, [])
+    description = cursor.description
+
+    def iter_batches() -> Iterator[List[Tuple]]:
+        if first_batch:
+            yield first_batch
+        yield from batches
+
+    return description, iter_batches()
+
+
+def get_columns_and_rows(
+    cursor, itersize: int = DEFAULT_ITERSIZE
+) -> Tuple[List[str], Iterator[Tuple[Any, ...]]]:
+    """
+    Return the names of the given cursor's columns, along with an
+    iterator over its rows, which are fetched `itersize` at a time.
+
+    This works with both regular and server-side cursors.
+    """
+
+    description, batches = get_description_and_batches(cursor, itersize)
+    columns = [column.name for column in description]
+
+    return columns, itertools.chain.from_iterable(batches)
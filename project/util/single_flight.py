@@ -0,0 +1,51 @@
+from threading import Event, Lock
+from typing import Any, Callable, Dict, Optional
+
+
+class _Call:
+    def __init__(self) -> None:
+        self.done = Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent calls for the same key within this process:
+    while one thread is doing the work for a key, any other threads that
+    ask for the same key wait for it to finish and share its result (or
+    exception), rather than doing the work themselves, e.g.:
+
+        >>> flight = SingleFlight()
+        >>> flight.run("boop", lambda: 5)
+        5
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._calls: Dict[str, _Call] = {}
+
+    def run(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if call is None:
+                call = _Call()
+                self._calls[key] = call
+
+        if not is_leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
@@ -0,0 +1,292 @@
+import json
+import itertools
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+from django.http import StreamingHttpResponse
+from django.core.serializers.json import DjangoJSONEncoder
+import pyarrow
+import pyarrow.ipc
+import pyarrow.parquet
+
+from .server_side_cursor import DEFAULT_ITERSIZE, get_description_and_batches
+from .data_dictionary import DataDictionary
+
+
+# The Arrow IPC streaming format. For more details, see:
+# https://arrow.apache.org/docs/format/Columnar.html#ipc-streaming-format
+ARROW_STREAM_CONTENT_TYPE = "application/vnd.apache.arrow.stream"
+
+PARQUET_CONTENT_TYPE = "application/vnd.apache.parquet"
+
+# The number of rows we'll write to each Parquet row group. Row groups
+# that are too small make Parquet files slow to read, so we buffer up
+# record batches until we have at least this many rows.
+PARQUET_ROW_GROUP_SIZE = 65536
+
+# Postgres type OIDs, as they appear in the `type_code` of a
+# psycopg2 cursor's description.
+PG_BOOL = 16
+PG_INT8 = 20
+PG_INT2 = 21
+PG_INT4 = 23
+PG_TEXT = 25
+PG_FLOAT4 = 700
+PG_FLOAT8 = 701
+PG_VARCHAR = 1043
+PG_NUMERIC = 1700
+PG_DATE = 1082
+PG_TIME = 1083
+PG_TIMESTAMP = 1114
+PG_TIMESTAMPTZ = 1184
+PG_INTERVAL = 1186
+
+# Postgres array type OIDs, mapped to the OIDs of their elements.
+PG_ARRAY_ELEMENTS = {
+    1000: PG_BOOL,
+    1005: PG_INT2,
+    1007: PG_INT4,
+    1009: PG_TEXT,
+    1015: PG_VARCHAR,
+    1016: PG_INT8,
+    1021: PG_FLOAT4,
+    1022: PG_FLOAT8,
+    1182: PG_DATE,
+    1115: PG_TIMESTAMP,
+    1185: PG_TIMESTAMPTZ,
+}
+
+# Django model field types, as returned by `Field.get_internal_type()`,
+# mapped to the Postgres type OIDs they're stored as. We use these for
+# columns whose types we can't determine from the cursor alone.
+DJANGO_FIELD_TYPES = {
+    "AutoField": PG_INT4,
+    "BigAutoField": PG_INT8,
+    "BigIntegerField": PG_INT8,
+    "BooleanField": PG_BOOL,
+    "CharField": PG_VARCHAR,
+    "DateField": PG_DATE,
+    "DateTimeField": PG_TIMESTAMPTZ,
+    "DurationField": PG_INTERVAL,
+    "FloatField": PG_FLOAT8,
+    "IntegerField": PG_INT4,
+    "NullBooleanField": PG_BOOL,
+    "PositiveIntegerField": PG_INT4,
+    "PositiveSmallIntegerField": PG_INT2,
+    "SmallIntegerField": PG_INT2,
+    "TextField": PG_TEXT,
+    "TimeField": PG_TIME,
+}
+
+
+def _to_str(value: Any) -> Optional[str]:
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (list, tuple, dict)):
+        return json.dumps(value, cls=DjangoJSONEncoder)
+    return str(value)
+
+
+def _to_float(value: Any) -> Optional[float]:
+    return None if value is None else float(value)
+
+
+class ArrowColumn(NamedTuple):
+    field: Any
+
+    # A function that converts each of the column's values from the
+    # database into something pyarrow can put in an array of the
+    # column's type, or None if no conversion is needed.
+    convert: Optional[Callable[[Any], Any]] = None
+
+
+def _get_arrow_type_for_oid(oid: int) -> Optional[Tuple[Any, Optional[Callable[[Any], Any]]]]:
+    """
+    Return the Arrow type for the given Postgres type OID, along with
+    a function to convert its values, if needed. Return None if the
+    OID isn't one we know about.
+    """
+
+    scalar_types = {
+        PG_BOOL: pyarrow.bool_(),
+        PG_INT2: pyarrow.int16(),
+        PG_INT4: pyarrow.int32(),
+        PG_INT8: pyarrow.int64(),
+        PG_FLOAT4: pyarrow.float32(),
+        PG_FLOAT8: pyarrow.float64(),
+        PG_TEXT: pyarrow.string(),
+        PG_VARCHAR: pyarrow.string(),
+        PG_DATE: pyarrow.date32(),
+        PG_TIME: pyarrow.time64("us"),
+        PG_TIMESTAMP: pyarrow.timestamp("us"),
+        PG_TIMESTAMPTZ: pyarrow.timestamp("us", tz="UTC"),
+        PG_INTERVAL: pyarrow.duration("us"),
+    }
+    if oid in scalar_types:
+        return scalar_types[oid], None
+    if oid == PG_NUMERIC:
+        # The precision of numeric expressions generally isn't known, and
+        # analysts will be converting these to floats anyways.
+        return pyarrow.float64(), _to_float
+    if oid in PG_ARRAY_ELEMENTS:
+        return pyarrow.list_(scalar_types[PG_ARRAY_ELEMENTS[oid]]), None
+    return None
+
+
+def get_arrow_columns(
+    description: Sequence[Any], data_dictionary: Optional[DataDictionary] = None
+) -> List[ArrowColumn]:
+    """
+    Return the Arrow fields for the columns in the given cursor description.
+
+    Column types are determined by their Postgres types, falling back to the
+    types of their Django model fields in the given data dictionary, if any.
+    Any other columns are converted to strings (JSON values are encoded
+    as JSON).
+
+    The help text of any column in the data dictionary is added to its field's
+    metadata, under the "description" key.
+    """
+
+    data_dictionary = data_dictionary or DataDictionary()
+    columns: List[ArrowColumn] = []
+    for column in description:
+        entry = data_dictionary.get(column.name)
+        arrow_type = _get_arrow_type_for_oid(column.type_code)
+        if arrow_type is None and entry and entry.field:
+            field_oid = DJANGO_FIELD_TYPES.get(entry.field.get_internal_type())
+            arrow_type = field_oid and _get_arrow_type_for_oid(field_oid)
+        type_, convert = arrow_type or (pyarrow.string(), _to_str)
+        metadata: Optional[Dict[str, str]] = None
+        if entry and entry.help_text:
+            metadata = {"description": entry.help_text}
+        field = pyarrow.field(column.name, type_, metadata=metadata)
+        columns.append(ArrowColumn(field, convert))
+    return columns
+
+
+def generate_arrow_record_batches(
+    cursor, itersize: int = DEFAULT_ITERSIZE, data_dictionary: Optional[DataDictionary] = None
+) -> Iterator[Any]:
+    """
+    Iterate through the given cursor's results as Arrow record batches of
+    up to `itersize` rows each.
+
+    At least one record batch is always yielded (if there are no results,
+    it will be empty), so that consumers can determine the schema from it.
+    """
+
+    description, batches = get_description_and_batches(cursor, itersize)
+    columns = get_arrow_columns(description, data_dictionary)
+    schema = pyarrow.schema([column.field for column in columns])
+
+    yielded_any = False
+    for rows in batches:
+        arrays = []
+        for column, values in zip(columns, zip(*rows)):
+            if column.convert:
+                values = tuple(map(column.convert, values))
+            arrays.append(pyarrow.array(values, type=column.field.type))
+        yield pyarrow.RecordBatch.from_arrays(arrays, schema=schema)
+        yielded_any = True
+
+    if not yielded_any:
+        yield pyarrow.RecordBatch.from_pylist([], schema=schema)
+
+
+class ChunkSink:
+    """
+    A write-only file-like object that holds on to whatever's been
+    written to it until it's drained.
+    """
+
+    def __init__(self) -> None:
+        self.chunks: List[bytes] = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        chunk = bytes(data)
+        self.chunks.append(chunk)
+        self.position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        result = b"".join(self.chunks)
+        self.chunks.clear()
+        return result
+
+
+def generate_streaming_arrow(record_batches: Iterator[Any]) -> Iterator[bytes]:
+    """
+    Encode the given record batches in the Arrow IPC streaming format,
+    yielding each batch's bytes as soon as it's been written.
+
+    The schema is taken from the first record batch, so there must
+    be at least one.
+    """
+
+    record_batches = iter(record_batches)
+    first_batch = next(record_batches)
+    sink = ChunkSink()
+    with pyarrow.ipc.new_stream(sink, first_batch.schema) as writer:
+        for batch in itertools.chain([first_batch], record_batches):
+            writer.write_batch(batch)
+            yield sink.drain()
+    yield sink.drain()
+
+
+def generate_streaming_parquet(
+    record_batches: Iterator[Any], row_group_size: int = PARQUET_ROW_GROUP_SIZE
+) -> Iterator[bytes]:
+    """
+    Encode the given record batches as a Parquet file, yielding each
+    row group's bytes as soon as it's been written.
+
+    The schema is taken from the first record batch, so there must
+    be at least one.
+    """
+
+    record_batches = iter(record_batches)
+    first_batch = next(record_batches)
+    schema = first_batch.schema
+    sink = ChunkSink()
+    pending: List[Any] = []
+    pending_rows = 0
+    with pyarrow.parquet.ParquetWriter(sink, schema) as writer:
+        for batch in itertools.chain([first_batch], record_batches):
+            pending.append(batch)
+            pending_rows += batch.num_rows
+            if pending_rows >= row_group_size:
+                writer.write_table(pyarrow.Table.from_batches(pending, schema=schema))
+                pending.clear()
+                pending_rows = 0
+                yield sink.drain()
+        if pending:
+            writer.write_table(pyarrow.Table.from_batches(pending, schema=schema))
+    yield sink.drain()
+
+
+def streaming_arrow_response(record_batches: Iterator[Any], filename: str) -> StreamingHttpResponse:
+    response = StreamingHttpResponse(
+        generate_streaming_arrow(record_batches), content_type=ARROW_STREAM_CONTENT_TYPE
+    )
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+def streaming_parquet_response(
+    record_batches: Iterator[Any], filename: str
+) -> StreamingHttpResponse:
+    response = StreamingHttpResponse(
+        generate_streaming_parquet(record_batches), content_type=PARQUET_CONTENT_TYPE
+    )
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
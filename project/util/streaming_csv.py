@@ -1,55 +1,95 @@
+import io
 import csv
-from typing import Any, Iterator, List
+import itertools
+from typing import Any, Iterator, Sequence
 from django.http import StreamingHttpResponse
 
+from .server_side_cursor import DEFAULT_ITERSIZE, get_columns_and_rows
+
+
+# The approximate size, in characters, of each chunk of output yielded
+# by our streaming encoders. Yielding a few large chunks rather than
+# lots of tiny ones is much cheaper for the WSGI server (and any gzip
+# middleware) to process.
+DEFAULT_CHUNK_SIZE = 65536
+
+# The number of rows our streaming encoders write at once before
+# checking whether they've filled a chunk.
+ENCODE_BATCH_SIZE = 100
+
+
+SEQUENCE_TYPES = (list, tuple)
+
+
+def flatten_csv_item(item: Sequence[Any]) -> str:
+    # Since CSVs can't contain heirarchial data, we'll
+    # concatenate the list into a single comma-separated field,
+    # which is similar to how Google Forms handles checkboxes.
+    return ", ".join([str(listitem) for listitem in item])
+
 
 def transform_csv_row(row: Iterator[Any]) -> Iterator[Any]:
     for item in row:
-        if isinstance(item, (list, tuple)):
-            # Since CSVs can't contain heirarchial data, we'll
-            # concatenate the list into a single comma-separated field,
-            # which is similar to how Google Forms handles checkboxes.
-            yield ", ".join([str(listitem) for listitem in item])
+        if isinstance(item, SEQUENCE_TYPES):
+            yield flatten_csv_item(item)
         else:
             yield item
 
 
-def generate_csv_rows(cursor) -> Iterator[List[Any]]:
-    yield [column.name for column in cursor.description]
+def transform_csv_rows(rows: Iterator[Sequence[Any]]) -> Iterator[Sequence[Any]]:
+    """
+    Transform rows just like transform_csv_row(), but pass through rows
+    that don't need transforming as-is, which is much faster for large
+    result sets, e.g.:
 
-    while True:
-        row = cursor.fetchone()
-        if row is None:
-            break
-        yield list(transform_csv_row(row))
+        >>> list(transform_csv_rows([("blah", ["no", 2]), ("boop", None)]))
+        [['blah', 'no, 2'], ('boop', None)]
+    """
 
+    for row in rows:
+        for item in row:
+            if isinstance(item, SEQUENCE_TYPES):
+                yield [
+                    flatten_csv_item(item) if isinstance(item, SEQUENCE_TYPES) else item
+                    for item in row
+                ]
+                break
+        else:
+            yield row
 
-# This is a variation on the Echo class from the Django docs:
-# https://docs.djangoproject.com/en/2.1/howto/outputting-csv/#streaming-large-csv-files
-#
-# It seems, though, that the original class was using an undocumented feature
-# of the csvwriter.writerow() method, which isn't actually supposed to return
-# anything, so instead we'll just store the latest written data in an attribute.
-#
-# It is very odd that this is so complicated.
-class Echo:
-    value: str = ""
 
-    def write(self, value: str):
-        assert isinstance(value, str)
-        self.value += value
+def generate_csv_rows(cursor, itersize: int = DEFAULT_ITERSIZE) -> Iterator[Sequence[Any]]:
+    columns, rows = get_columns_and_rows(cursor, itersize)
+    yield columns
 
+    yield from transform_csv_rows(rows)
 
-def generate_streaming_csv(rows: Iterator[List[Any]]) -> Iterator[str]:
-    pseudo_buffer = Echo()
-    writer = csv.writer(pseudo_buffer)
-    for row in rows:
-        writer.writerow(row)
-        yield pseudo_buffer.value
-        pseudo_buffer.value = ""
+
+def generate_streaming_csv(
+    rows: Iterator[Sequence[Any]], chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[str]:
+    """
+    Encode the given rows as CSV, yielding chunks of roughly
+    `chunk_size` characters.
+    """
+
+    rows = iter(rows)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    while True:
+        batch = list(itertools.islice(rows, ENCODE_BATCH_SIZE))
+        if not batch:
+            break
+        writer.writerows(batch)
+        if buffer.tell() >= chunk_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
 
 
-def streaming_csv_response(rows: Iterator[List[Any]], filename: str) -> StreamingHttpResponse:
+def streaming_csv_response(rows: Iterator[Sequence[Any]], filename: str) -> StreamingHttpResponse:
     response = StreamingHttpResponse(generate_streaming_csv(rows), content_type="text/csv")
     response["Content-Disposition"] = f'attachment; filename="{filename}"'
     return response
@@ -1,28 +1,51 @@
-import json
-from typing import Any, Iterator, Dict
+import itertools
+from typing import Any, Iterator, Dict, List
 from django.http import StreamingHttpResponse
 from django.core.serializers.json import DjangoJSONEncoder
 
+from .server_side_cursor import DEFAULT_ITERSIZE, get_columns_and_rows
+from .streaming_csv import DEFAULT_CHUNK_SIZE, ENCODE_BATCH_SIZE
 
-def generate_json_rows(cursor) -> Iterator[Dict[str, Any]]:
-    columns = [column.name for column in cursor.description]
 
-    while True:
-        row = cursor.fetchone()
-        if row is None:
-            break
+def generate_json_rows(cursor, itersize: int = DEFAULT_ITERSIZE) -> Iterator[Dict[str, Any]]:
+    columns, rows = get_columns_and_rows(cursor, itersize)
+
+    for row in rows:
         yield dict(zip(columns, row))
 
 
-def generate_streaming_json(rows: Iterator[Dict[str, Any]]) -> Iterator[str]:
-    yield "["
-    yielded_first = False
-    for row in rows:
-        if yielded_first:
-            yield ","
-        yielded_first = True
-        yield json.dumps(row, cls=DjangoJSONEncoder)
-    yield "]"
+def generate_streaming_json(
+    rows: Iterator[Dict[str, Any]], chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[str]:
+    """
+    Encode the given rows as a JSON array, yielding chunks of roughly
+    `chunk_size` characters.
+    """
+
+    # This is equivalent to calling `json.dumps(row, cls=DjangoJSONEncoder)`
+    # for each row, only without the cost of instantiating a new encoder
+    # every time.
+    encode = DjangoJSONEncoder().encode
+    rows = iter(rows)
+    parts: List[str] = ["["]
+    size = 0
+    is_first_batch = True
+    while True:
+        batch = list(itertools.islice(rows, ENCODE_BATCH_SIZE))
+        if not batch:
+            break
+        if not is_first_batch:
+            parts.append(",")
+        is_first_batch = False
+        part = ",".join(map(encode, batch))
+        parts.append(part)
+        size += len(part)
+        if size >= chunk_size:
+            yield "".join(parts)
+            parts.clear()
+            size = 0
+    parts.append("]")
+    yield "".join(parts)
 
 
 def streaming_json_response(rows: Iterator[Dict[str, Any]], filename: str) -> StreamingHttpResponse:
@@ -0,0 +1,64 @@
+import time
+from threading import Lock
+from typing import Callable
+
+
+class TokenBucket:
+    """
+    A thread-safe token bucket rate limiter, which allows up to `rate`
+    operations per second on average, in bursts of up to `capacity`
+    operations, e.g.:
+
+        >>> bucket = TokenBucket(rate=10.0, capacity=2)
+        >>> bucket.acquire()
+        >>> bucket.acquire()
+
+    The bucket starts out full.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = Lock()
+        self._tokens = capacity
+        self._updated_at = clock()
+
+    def _reserve(self) -> float:
+        """
+        Take a token from the bucket, returning the number of seconds
+        the caller needs to wait before using it.
+        """
+
+        with self._lock:
+            now = self._clock()
+            elapsed = now - self._updated_at
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated_at = now
+
+            # Note that the bucket can go into debt here: this ensures that
+            # waiting callers are served in the order they arrived.
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self) -> None:
+        """
+        Wait until the rate limit allows another operation to proceed.
+        """
+
+        delay = self._reserve()
+        if delay > 0:
+            self._sleep(delay)
@@ -1,11 +1,11 @@
 import re
-from typing import List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, TypeVar
 from datetime import datetime, timedelta
 from django.conf import settings
 from django.db import transaction
 from django.core.management.base import CommandError, BaseCommand
 from django.utils import timezone
-from temba_client.v2 import TembaClient
+from temba_client.v2 import TembaClient, types as temba_types
 
 from rapidpro.models import Metadata, ContactGroup, UserContactGroup, Contact
 from rapidpro import rapidpro_util
@@ -15,6 +15,12 @@ URN_TEL_REGEX = re.compile(r"^tel:\+1(\d+)$")
 
 CLOCK_SKEW = timedelta(minutes=5)
 
+# The number of contacts we'll sync in each transaction. If a sync is
+# interrupted, it will resume from the last chunk that was committed.
+CHUNK_SIZE = 1000
+
+T = TypeVar("T")
+
 
 def find_phone_number_from_urns(urns: List[str]) -> Optional[str]:
     """
@@ -38,9 +44,28 @@ def find_user_from_urns(urns: List[str]) -> Optional[JustfixUser]:
     return JustfixUser.objects.filter(phone_number=phone_number).first()
 
 
-def get_contact_batches(after: Optional[datetime]):
+def get_contact_batches(after: Optional[datetime], before: Optional[datetime]):
     client = get_rapidpro_client()
-    return client.get_contacts(after=after).iterfetches(retry_on_rate_exceed=True)
+    return client.get_contacts(after=after, before=before).iterfetches(retry_on_rate_exceed=True)
+
+
+def iter_chunks(batches: Iterable[List[T]], size: int) -> Iterator[List[T]]:
+    """
+    Regroup the given batches into chunks of the given size, e.g.:
+
+        >>> list(iter_chunks([[1, 2, 3], [4], [5, 6]], 2))
+        [[1, 2], [3, 4], [5, 6]]
+    """
+
+    chunk: List[T] = []
+    for batch in batches:
+        for item in batch:
+            chunk.append(item)
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
 
 
 def ensure_rapidpro_is_configured():
@@ -63,60 +88,136 @@ class Command(BaseCommand):
             "--full-resync", action="store_true", help="Completely re-sync all users."
         )
 
-    def sync_contact_group(self, group) -> ContactGroup:
-        cg, _ = ContactGroup.objects.get_or_create(uuid=group.uuid, defaults={"name": group.name})
-        if cg.name != group.name:
-            cg.name = group.name
-            cg.save()
-        return cg
-
-    def _sync_contact_model(self, temba_contact):
-        phone_number = find_phone_number_from_urns(temba_contact.urns)
-        if phone_number is None:
-            return
-        contact, created = Contact.objects.get_or_create(uuid=temba_contact.uuid)
-        contact.phone_number = phone_number
-        contact.save()
-
-    def sync_contact(self, contact):
-        self._sync_contact_model(contact)
-        user = find_user_from_urns(contact.urns)
-        if user is None:
-            # NOTE: Because we ignore contact groups that don't map to existing users,
-            # new app users who have been RapidPro contacts for a long time won't
-            # necessarily be perfectly in-sync (any RapidPro contact information
-            # will only show up on the Django side when the RapidPro contact is
-            # next modified, or when a full resync occurs).
-            return
-        self.stdout.write(f"Syncing user {user} ({len(contact.groups)} groups).\n")
-        for group in contact.groups:
-            # Get the contact group from the database, creating it if needed.
-            cg = self.sync_contact_group(group)
+    def _sync_contact_models(self, contacts: Dict[str, str]) -> None:
+        """
+        Sync the given mapping from RapidPro contact UUIDs to phone numbers.
+        """
+
+        existing = Contact.objects.in_bulk(list(contacts.keys()))
+        to_create: List[Contact] = []
+        to_update: List[Contact] = []
+        for uuid, phone_number in contacts.items():
+            contact = existing.get(uuid)
+            if contact is None:
+                to_create.append(Contact(uuid=uuid, phone_number=phone_number))
+            elif contact.phone_number != phone_number:
+                contact.phone_number = phone_number
+                to_update.append(contact)
+        Contact.objects.bulk_create(to_create)
+        Contact.objects.bulk_update(to_update, ["phone_number"])
+
+    def _sync_contact_groups(self, groups: Iterable[temba_types.Group]) -> None:
+        names = {group.uuid: group.name for group in groups}
+        existing = ContactGroup.objects.in_bulk(list(names.keys()))
+        to_create: List[ContactGroup] = []
+        to_update: List[ContactGroup] = []
+        for uuid, name in names.items():
+            cg = existing.get(uuid)
+            if cg is None:
+                to_create.append(ContactGroup(uuid=uuid, name=name))
+            elif cg.name != name:
+                cg.name = name
+                to_update.append(cg)
+        ContactGroup.objects.bulk_create(to_create)
+        ContactGroup.objects.bulk_update(to_update, ["name"])
+
+    def _sync_user_contact_groups(
+        self, contacts_by_user: Dict[JustfixUser, temba_types.Contact]
+    ) -> None:
+        existing: Dict[int, Dict[str, int]] = {user.pk: {} for user in contacts_by_user}
+        for ucg_id, user_id, group_id in UserContactGroup.objects.filter(
+            user__in=list(contacts_by_user.keys())
+        ).values_list("id", "user_id", "group_id"):
+            existing[user_id][group_id] = ucg_id
+
+        to_create: List[UserContactGroup] = []
+        to_delete: List[int] = []
+        for user, contact in contacts_by_user.items():
+            self.stdout.write(f"Syncing user {user} ({len(contact.groups)} groups).\n")
+            user_groups = existing[user.pk]
+            group_uuids = set(group.uuid for group in contact.groups)
+
             # Associate the user with any groups they're in that we don't
             # already know of.
-            UserContactGroup.objects.get_or_create(
-                user=user, group=cg, defaults={"earliest_known_date": contact.modified_on}
+            for group_uuid in sorted(group_uuids - set(user_groups.keys())):
+                to_create.append(
+                    UserContactGroup(
+                        user=user, group_id=group_uuid, earliest_known_date=contact.modified_on
+                    )
+                )
+
+            # Now find any existing groups the user is no longer in, and
+            # delete the user's association with them.
+            to_delete.extend(
+                ucg_id
+                for group_uuid, ucg_id in user_groups.items()
+                if group_uuid not in group_uuids
             )
+        UserContactGroup.objects.bulk_create(to_create)
+        UserContactGroup.objects.filter(id__in=to_delete).delete()
+
+    def sync_contacts(self, contacts: List[temba_types.Contact]) -> None:
+        """
+        Sync the given RapidPro contacts, using a constant number of queries
+        regardless of how many contacts there are.
+        """
+
+        phone_numbers: Dict[str, str] = {}
+        contacts_by_phone_number: Dict[str, List[temba_types.Contact]] = {}
+        for contact in contacts:
+            phone_number = find_phone_number_from_urns(contact.urns)
+            if phone_number is None:
+                continue
+            phone_numbers.setdefault(contact.uuid, phone_number)
+            contacts_by_phone_number.setdefault(phone_number, []).append(contact)
+        self._sync_contact_models(phone_numbers)
+
+        # NOTE: Because we ignore contact groups that don't map to existing users,
+        # new app users who have been RapidPro contacts for a long time won't
+        # necessarily be perfectly in-sync (any RapidPro contact information
+        # will only show up on the Django side when the RapidPro contact is
+        # next modified, or when a full resync occurs).
+        users: Dict[str, JustfixUser] = {}
+        for user in JustfixUser.objects.filter(
+            phone_number__in=list(contacts_by_phone_number.keys())
+        ).order_by("pk"):
+            users.setdefault(user.phone_number, user)
+        contacts_by_user: Dict[JustfixUser, temba_types.Contact] = {}
+        for phone_number, user in users.items():
+            # If multiple contacts share a phone number, the last one wins.
+            contacts_by_user[user] = contacts_by_phone_number[phone_number][-1]
+
+        self._sync_contact_groups(
+            group for contact in contacts_by_user.values() for group in contact.groups
+        )
+        self._sync_user_contact_groups(contacts_by_user)
 
-        # Now find any existing groups the user is no longer in, and
-        # delete the user's association with them.
-        UserContactGroup.objects.filter(user=user).exclude(
-            group__uuid__in=[group.uuid for group in contact.groups]
-        ).delete()
-
-    @transaction.atomic
     def sync(self, full_resync: bool):
         hostname = settings.RAPIDPRO_HOSTNAME
         self.stdout.write(f"Syncing with {hostname}...")
-        sync_time = timezone.now() - CLOCK_SKEW
         metadata, _ = Metadata.objects.get_or_create()
-        after = None if full_resync else metadata.last_sync
-        batches = get_contact_batches(after=after)
-        for contact_batch in batches:
-            self.stdout.write(f"Processing a batch of {len(contact_batch)} contacts.\n")
-            for contact in contact_batch:
-                self.sync_contact(contact)
-        metadata.last_sync = sync_time
+        if full_resync or metadata.resume_sync_time is None:
+            metadata.resume_sync_time = timezone.now() - CLOCK_SKEW
+            metadata.resume_before = None
+            if full_resync:
+                # This ensures that if we're interrupted, the sync
+                # will still be a full one when it's resumed.
+                metadata.last_sync = None
+            metadata.save()
+        else:
+            self.stdout.write(f"Resuming interrupted sync from {metadata.resume_before}.\n")
+
+        # Note that RapidPro returns the most recently modified contacts first.
+        batches = get_contact_batches(after=metadata.last_sync, before=metadata.resume_before)
+        for chunk in iter_chunks(batches, CHUNK_SIZE):
+            self.stdout.write(f"Processing a chunk of {len(chunk)} contacts.\n")
+            with transaction.atomic():
+                self.sync_contacts(chunk)
+                metadata.resume_before = min(contact.modified_on for contact in chunk)
+                metadata.save()
+        metadata.last_sync = metadata.resume_sync_time
+        metadata.resume_sync_time = None
+        metadata.resume_before = None
         metadata.save()
         self.stdout.write(f"Done syncing with {hostname}.\n")
 
@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rapidpro', '0002_contact'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='metadata',
+            name='resume_before',
+            field=models.DateTimeField(help_text="If the most recent sync was interrupted, the modification date of the oldest contact it synced. The next sync will resume from here.", null=True),
+        ),
+        migrations.AddField(
+            model_name='metadata',
+            name='resume_sync_time',
+            field=models.DateTimeField(help_text="If the most recent sync was interrupted, the time it started syncing from, which will become the last sync time once it's resumed and finished.", null=True),
+        ),
+    ]
@@ -23,6 +23,22 @@ class Metadata(models.Model):
         help_text="The date and time RapidPro was last synced with, if ever.", null=True
     )
 
+    resume_before = models.DateTimeField(
+        help_text=(
+            "If the most recent sync was interrupted, the modification date of the "
+            "oldest contact it synced. The next sync will resume from here."
+        ),
+        null=True,
+    )
+
+    resume_sync_time = models.DateTimeField(
+        help_text=(
+            "If the most recent sync was interrupted, the time it started syncing "
+            "from, which will become the last sync time once it's resumed and finished."
+        ),
+        null=True,
+    )
+
 
 class Contact(models.Model):
     """
@@ -1,7 +1,9 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from io import StringIO
 from unittest.mock import MagicMock
 from django.core.management import call_command, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils.timezone import make_aware
 from temba_client.v2.types import Contact, Group
 import pytest
@@ -28,17 +30,68 @@ def make_phone_number_urn(phone_number: str) -> str:
     return f"tel:+1{phone_number}"
 
 
-def make_contact(phone_number="5551234567", groups=None, uuid="blarg"):
+def make_contact(
+    phone_number="5551234567",
+    groups=None,
+    uuid="blarg",
+    modified_on=make_aware(datetime(2018, 1, 2, 3, 4, 5)),
+):
     if groups is None:
         groups = []
     return Contact.create(
         uuid=uuid,
         urns=[make_phone_number_urn(phone_number)],
         groups=groups,
-        modified_on=make_aware(datetime(2018, 1, 2, 3, 4, 5)),
+        modified_on=modified_on,
     )
 
 
+class FakeTembaError(Exception):
+    pass
+
+
+class FakeTembaClient:
+    """
+    Pretends to be a RapidPro API client that serves contacts in pages,
+    most recently modified first, optionally failing once a certain
+    number of pages have been served.
+    """
+
+    def __init__(self, contacts, page_size=2, fail_after_pages=None):
+        self.contacts = contacts
+        self.page_size = page_size
+        self.fail_after_pages = fail_after_pages
+        self.queries = []
+
+    def get_contacts(self, after=None, before=None):
+        self.queries.append((after, before))
+        contacts = sorted(
+            [
+                contact
+                for contact in self.contacts
+                if (after is None or contact.modified_on >= after)
+                and (before is None or contact.modified_on <= before)
+            ],
+            key=lambda contact: contact.modified_on,
+            reverse=True,
+        )
+        return FakeTembaQuery(self, contacts)
+
+
+class FakeTembaQuery:
+    def __init__(self, client, contacts):
+        self.client = client
+        self.contacts = contacts
+
+    def iterfetches(self, retry_on_rate_exceed=False):
+        pages_served = 0
+        for i in range(0, len(self.contacts), self.client.page_size):
+            if pages_served == self.client.fail_after_pages:
+                raise FakeTembaError("the network is down")
+            yield self.contacts[i : i + self.client.page_size]
+            pages_served += 1
+
+
 class TestSyncrapidpro:
     @pytest.fixture(autouse=True)
     def setup_fixture(self, db, settings, monkeypatch):
@@ -58,19 +111,10 @@ class TestSyncrapidpro:
         cm = ContactModel.objects.get(uuid="blarg")
         assert cm.phone_number == "5552221111"
 
-    def test_it_syncs_contact_groups(self):
-        cmd = syncrapidpro.Command()
-        group = make_group("funky", "Funky Group")
-        cmd.sync_contact_group(group)
-        assert str(list(ContactGroup.objects.all())) == "[<ContactGroup: Funky Group>]"
-        group.name = "Monkey Group"
-        cmd.sync_contact_group(group)
-        assert str(list(ContactGroup.objects.all())) == "[<ContactGroup: Monkey Group>]"
-
     def test_it_updates_metadata_with_sync_time_minus_clock_skew(self):
         with freezegun.freeze_time("2012-01-14 12:00:00"):
             call()
-            self.get_contact_batches.assert_called_once_with(after=None)
+            self.get_contact_batches.assert_called_once_with(after=None, before=None)
 
         m = Metadata.objects.first()
         last_sync = m.last_sync
@@ -80,16 +124,16 @@ class TestSyncrapidpro:
         self.get_contact_batches.return_value = [[]]
         with freezegun.freeze_time("2012-01-15 03:00:00"):
             call()
-            self.get_contact_batches.assert_called_once_with(after=last_sync)
+            self.get_contact_batches.assert_called_once_with(after=last_sync, before=None)
 
         assert Metadata.objects.count() == 1
         assert str(Metadata.objects.first().last_sync) == "2012-01-15 02:55:00+00:00"
 
     def test_full_resync_works(self):
         call()
-        self.get_contact_batches.assert_called_with(after=None)
+        self.get_contact_batches.assert_called_with(after=None, before=None)
         call("--full-resync")
-        self.get_contact_batches.assert_called_with(after=None)
+        self.get_contact_batches.assert_called_with(after=None, before=None)
 
     def test_it_does_nothing_with_contacts_that_do_not_map_to_existing_users(self):
         self.get_contact_batches.return_value = [[make_contact()]]
@@ -125,6 +169,88 @@ class TestSyncrapidpro:
         assert UserContactGroup.objects.count() == 0
 
 
+class TestChunkedSync:
+    @pytest.fixture(autouse=True)
+    def setup_fixture(self, db, settings, monkeypatch):
+        settings.RAPIDPRO_API_TOKEN = "boop"
+        monkeypatch.setattr(syncrapidpro, "CHUNK_SIZE", 3)
+        self.contacts = [
+            make_contact(
+                f"555123{i:04}",
+                uuid=f"contact{i}",
+                modified_on=make_aware(datetime(2018, 1, 1) + timedelta(days=i)),
+            )
+            for i in range(10)
+        ]
+        self.client = FakeTembaClient(self.contacts, page_size=2)
+        monkeypatch.setattr(syncrapidpro, "get_rapidpro_client", lambda: self.client)
+
+    def test_it_syncs_all_contacts_in_chunks(self):
+        out = call()
+        assert out.count("Processing a chunk of 3 contacts.") == 3
+        assert "Processing a chunk of 1 contacts." in out
+        assert ContactModel.objects.count() == 10
+
+    def test_it_resumes_interrupted_syncs(self):
+        self.client.fail_after_pages = 3
+        with freezegun.freeze_time("2019-01-14 12:00:00"):
+            with pytest.raises(FakeTembaError):
+                call()
+
+        # Only the contacts in chunks that were completely processed
+        # should have been committed.
+        synced = set(ContactModel.objects.values_list("uuid", flat=True))
+        assert synced == set(f"contact{i}" for i in range(4, 10))
+        metadata = Metadata.objects.get()
+        assert metadata.last_sync is None
+        assert metadata.resume_before == self.contacts[4].modified_on
+
+        self.client.fail_after_pages = None
+        with freezegun.freeze_time("2019-01-15 12:00:00"):
+            assert "Resuming interrupted sync" in call()
+        assert self.client.queries[-1] == (None, self.contacts[4].modified_on)
+        assert ContactModel.objects.count() == 10
+
+        # The sync should be recorded as having started when the
+        # interrupted sync did.
+        metadata = Metadata.objects.get()
+        assert str(metadata.last_sync) == "2019-01-14 11:55:00+00:00"
+        assert metadata.resume_before is None
+        assert metadata.resume_sync_time is None
+
+    def test_full_resync_restarts_interrupted_syncs(self):
+        self.client.fail_after_pages = 3
+        with pytest.raises(FakeTembaError):
+            call()
+        self.client.fail_after_pages = None
+        assert "Resuming interrupted sync" not in call("--full-resync")
+        assert self.client.queries[-1] == (None, None)
+
+
+def test_sync_contacts_uses_constant_number_of_queries(db):
+    def count_queries(num_users):
+        cmd = syncrapidpro.Command(stdout=StringIO())
+        contacts = [
+            make_contact(
+                UserFactory(
+                    username=f"user{num_users}_{i}", phone_number=f"55{num_users}123{i:04}"
+                ).phone_number,
+                groups=[make_group(f"group{i}", f"Group {i}")],
+                uuid=f"contact{num_users}_{i}",
+            )
+            for i in range(num_users)
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            cmd.sync_contacts(contacts)
+        assert (
+            UserContactGroup.objects.filter(user__username__startswith=f"user{num_users}_").count()
+            == num_users
+        )
+        return len(queries)
+
+    assert count_queries(1) == count_queries(5)
+
+
 def test_it_raises_error_when_settings_are_not_defined():
     with pytest.raises(CommandError, match="RAPIDPRO_API_TOKEN must be configured"):
         call()
@@ -0,0 +1,46 @@
+from typing import Any, Dict, Iterable, Optional
+from django.db import connection, transaction
+
+from .models import LatestConversationMessage, Message
+
+
+def _get_upsert_sql(where_clause: str = "") -> str:
+    latest_table = LatestConversationMessage._meta.db_table
+    message_table = Message._meta.db_table
+    return f"""
+    INSERT INTO {latest_table}
+        (user_phone_number, ordering, date_sent, is_from_us, body, error_message)
+    SELECT DISTINCT ON (user_phone_number)
+        user_phone_number, ordering, date_sent, is_from_us, body, error_message
+    FROM
+        {message_table}
+    {where_clause}
+    ORDER BY user_phone_number, ordering DESC, sid DESC
+    ON CONFLICT (user_phone_number) DO UPDATE SET
+        ordering = EXCLUDED.ordering,
+        date_sent = EXCLUDED.date_sent,
+        is_from_us = EXCLUDED.is_from_us,
+        body = EXCLUDED.body,
+        error_message = EXCLUDED.error_message
+    """
+
+
+def update_latest_conversation_messages(phone_numbers: Optional[Iterable[str]] = None) -> None:
+    """
+    Update the latest message of the conversations with the given user
+    phone numbers, or rebuild the latest messages of all conversations if
+    no phone numbers are given.
+    """
+
+    sql_args: Dict[str, Any] = {}
+    with transaction.atomic(), connection.cursor() as cursor:
+        if phone_numbers is None:
+            cursor.execute(f"DELETE FROM {LatestConversationMessage._meta.db_table}")
+            cursor.execute(_get_upsert_sql())
+        else:
+            sql_args["phone_numbers"] = list(phone_numbers)
+            if not sql_args["phone_numbers"]:
+                return
+            cursor.execute(
+                _get_upsert_sql("WHERE user_phone_number = ANY(%(phone_numbers)s)"), sql_args
+            )
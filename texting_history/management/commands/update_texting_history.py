@@ -1,5 +1,8 @@
-from typing import Optional, Tuple, Iterator
-from django.core.management.base import BaseCommand
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional, Set, Tuple, Iterator
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
 from django.db.models import Max, Min
 import datetime
 import itertools
@@ -11,7 +14,8 @@ from dwh.util import BatchWriter
 from texting.management.commands.syncphonenumberlookups import verify_twilio_is_enabled
 from texting import twilio
 from texting.twilio import tendigit_to_e164
-from texting_history.models import Message
+from texting_history.models import IngestionWindow, Message
+from texting_history.latest_messages import update_latest_conversation_messages
 
 MessageIterator = Iterator[MessageInstance]
 
@@ -59,6 +63,72 @@ def clean_body(body: str) -> str:
     return body.replace("\x00", "\uFFFD")
 
 
+# The maximum number of messages Twilio will return in a single page.
+MAX_PAGE_SIZE = 1000
+
+DEFAULT_WINDOW_DAYS = 30
+
+# The date that ingestion windows are aligned to, so that the same windows
+# are used each time history is updated.
+WINDOW_EPOCH = datetime.datetime(2010, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def validate_messages(messages: Iterable[Message]) -> None:
+    """
+    Validate a batch of messages before writing them to the database.
+
+    This is much faster than calling `clean_fields()` on every message,
+    since the only constraints that data from Twilio can realistically
+    violate are the lengths of our text fields, and whether
+    they're nullable.
+    """
+
+    fields = [
+        field
+        for field in Message._meta.concrete_fields
+        if field.max_length is not None or not field.null
+    ]
+    for message in messages:
+        for field in fields:
+            value = getattr(message, field.attname)
+            if value is None:
+                if not field.null:
+                    raise ValidationError(f"Message {message.sid} has no {field.name}.")
+            elif field.max_length is not None and len(value) > field.max_length:
+                raise ValidationError(
+                    f"Message {message.sid} has a {field.name} longer than "
+                    f"{field.max_length} characters."
+                )
+
+
+class MessageBatchWriter(BatchWriter):
+    def __init__(self, **kwargs):
+        super().__init__(Message, ignore_conflicts=True, **kwargs)
+
+    def flush(self):
+        validate_messages(self.models)
+        super().flush()
+
+
+def sms_to_message(sms, our_number: str) -> Message:
+    is_from_us = sms.from_ == our_number
+    return Message(
+        sid=sms.sid,
+        ordering=get_ordering_for_sms(sms, is_from_us),
+        direction=sms.direction,
+        is_from_us=is_from_us,
+        user_phone_number=sms.to if is_from_us else sms.from_,
+        body=clean_body(sms.body),
+        status=sms.status,
+        date_created=sms.date_created,
+        date_sent=sms.date_sent,
+        date_updated=sms.date_updated,
+        error_code=sms.error_code,
+        error_message=sms.error_message,
+        our_phone_number=our_number,
+    )
+
+
 def update_texting_history(
     backfill: bool = False,
     max_age: Optional[int] = None,
@@ -104,28 +174,168 @@ def update_texting_history(
         ),
     )
 
-    with BatchWriter(Message, ignore_conflicts=True, silent=silent) as writer:
+    phone_numbers: Set[str] = set()
+    with MessageBatchWriter(silent=silent) as writer:
         for sms in all_messages:
-            is_from_us = sms.from_ == our_number
-            model = Message(
-                sid=sms.sid,
-                ordering=get_ordering_for_sms(sms, is_from_us),
-                direction=sms.direction,
-                is_from_us=is_from_us,
-                user_phone_number=sms.to if is_from_us else sms.from_,
-                body=clean_body(sms.body),
-                status=sms.status,
-                date_created=sms.date_created,
-                date_sent=sms.date_sent,
-                date_updated=sms.date_updated,
-                error_code=sms.error_code,
-                error_message=sms.error_message,
-                our_phone_number=our_number,
-            )
+            model = sms_to_message(sms, our_number)
             if not silent:
                 print(sms.sid, sms.date_sent, sms.direction, sms.status)
-            model.clean_fields()
             writer.write(model)
+            phone_numbers.add(model.user_phone_number)
+
+    update_latest_conversation_messages(phone_numbers)
+
+    return Message.objects.all().aggregate(Max("date_sent"))["date_sent__max"]
+
+
+def get_windows(
+    start: datetime.datetime, end: datetime.datetime, window_days: int
+) -> List[Tuple[datetime.datetime, datetime.datetime]]:
+    """
+    Return the (start, end) pairs of the ingestion windows that cover the
+    given range of time. Windows are aligned to WINDOW_EPOCH, so that
+    subsequent updates will use the same windows, e.g.:
+
+        >>> utc = datetime.timezone.utc
+        >>> for window in get_windows(
+        ...     datetime.datetime(2010, 1, 5, tzinfo=utc),
+        ...     datetime.datetime(2010, 1, 12, tzinfo=utc),
+        ...     window_days=5,
+        ... ):
+        ...     print(*[date.strftime("%b %d") for date in window])
+        Jan 01 Jan 06
+        Jan 06 Jan 11
+        Jan 11 Jan 16
+    """
+
+    size = datetime.timedelta(days=window_days)
+    window_start = WINDOW_EPOCH + size * ((start - WINDOW_EPOCH) // size)
+    windows: List[Tuple[datetime.datetime, datetime.datetime]] = []
+    while window_start < end:
+        windows.append((window_start, window_start + size))
+        window_start += size
+    return windows
+
+
+def ingest_window(
+    window: IngestionWindow, page_size: int, batch_size: int, silent: bool
+) -> Set[str]:
+    """
+    Retrieve all the messages in the given ingestion window from Twilio,
+    returning the phone numbers of the users they were exchanged with.
+
+    The window's high-water mark is updated after each batch of messages
+    is written, so that if we're interrupted, we can resume from it.
+    """
+
+    started_at = now()
+    client = twilio.get_client()
+    phone_numbers: Set[str] = set()
+    direction_kwargs = (
+        {"from_": window.our_phone_number} if window.is_from_us else {"to": window.our_phone_number}
+    )
+
+    # Note that `date_sent` only has second-precision, so we'll start
+    # slightly after our high-water mark, in case we were interrupted
+    # while storing a batch of messages that were sent in the same
+    # second. We ignore conflicts, so this is harmless.
+    before = window.end
+    if window.high_water_mark is not None:
+        before = min(before, window.high_water_mark + datetime.timedelta(seconds=1))
+
+    messages = stop_when_older_than(
+        client.messages.stream(date_sent_before=before, page_size=page_size, **direction_kwargs),
+        window.start,
+    )
+
+    writer = MessageBatchWriter(batch_size=batch_size, silent=True)
+    for sms in messages:
+        model = sms_to_message(sms, window.our_phone_number)
+        writer.write(model)
+        phone_numbers.add(model.user_phone_number)
+        if not writer.models:
+            # The writer has just flushed its batch to the database.
+            window.high_water_mark = model.date_sent
+            window.save(update_fields=["high_water_mark"])
+    writer.flush()
+    # We've made it all the way through the window, so the next pass over
+    # it (if any) needs to start from its end again.
+    window.high_water_mark = None
+    # Messages may still be sent during a window that hasn't ended yet,
+    # so we'll need to retrieve it again next time.
+    window.is_complete = window.end <= started_at
+    window.save(update_fields=["high_water_mark", "is_complete"])
+    if not silent:
+        print(
+            f"Retrieved messages {'from' if window.is_from_us else 'to'} us "
+            f"between {window.start.date()} and {window.end.date()}."
+        )
+    return phone_numbers
+
+
+def _ingest_window_in_thread(*args, **kwargs) -> Set[str]:
+    try:
+        return ingest_window(*args, **kwargs)
+    finally:
+        # Each thread gets its own database connection, which Django won't
+        # clean up for us.
+        connections.close_all()
+
+
+def update_texting_history_concurrently(
+    max_age: int,
+    workers: int,
+    window_days: int = DEFAULT_WINDOW_DAYS,
+    page_size: int = MAX_PAGE_SIZE,
+    batch_size: int = 1000,
+    silent: bool = False,
+) -> Optional[datetime.datetime]:
+    """
+    Retrieve all the messages from the past `max_age` days from Twilio,
+    fetching windows of `window_days` days in parallel.
+
+    Windows that have already been completely retrieved are skipped, and
+    ones that were interrupted are resumed, so this can be re-run until
+    it succeeds.
+    """
+
+    if not twilio.is_enabled():
+        return None
+    our_number = tendigit_to_e164(settings.TWILIO_PHONE_NUMBER)
+    end = now()
+    windows: List[IngestionWindow] = []
+    for is_from_us in [False, True]:
+        for window_start, window_end in get_windows(
+            end - datetime.timedelta(days=max_age), end, window_days
+        ):
+            window, _ = IngestionWindow.objects.get_or_create(
+                our_phone_number=our_number,
+                is_from_us=is_from_us,
+                start=window_start,
+                end=window_end,
+            )
+            if not window.is_complete:
+                windows.append(window)
+
+    if not silent:
+        print(f"Retrieving messages from {len(windows)} window(s) with {workers} worker(s).")
+
+    phone_numbers: Set[str] = set()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(
+                _ingest_window_in_thread,
+                window,
+                page_size=page_size,
+                batch_size=batch_size,
+                silent=silent,
+            )
+            for window in windows
+        ]
+        for future in futures:
+            phone_numbers.update(future.result())
+
+    update_latest_conversation_messages(phone_numbers)
 
     return Message.objects.all().aggregate(Max("date_sent"))["date_sent__max"]
 
@@ -140,8 +350,53 @@ class Command(BaseCommand):
             action="store_true",
             help="Backfill message history instead of retrieving latest messages.",
         )
+        parser.add_argument(
+            "--rebuild-latest",
+            action="store_true",
+            help="Rebuild the latest message of every conversation from scratch.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help=(
+                "Retrieve windows of message history in parallel with this many threads. "
+                "Interrupted runs can be resumed by re-running with the same options. "
+                "Requires --max-age."
+            ),
+        )
+        parser.add_argument(
+            "--window-days",
+            type=int,
+            default=DEFAULT_WINDOW_DAYS,
+            help="The number of days of history in each window, when using --workers.",
+        )
+        parser.add_argument(
+            "--page-size",
+            type=int,
+            default=MAX_PAGE_SIZE,
+            help="The number of messages to request from Twilio at once, when using --workers.",
+        )
 
     def handle(self, *args, **options):
+        if options["rebuild_latest"]:
+            update_latest_conversation_messages()
+            print("Rebuilt latest conversation messages.")
+            return
         verify_twilio_is_enabled()
-        latest = update_texting_history(backfill=options["backfill"], max_age=options["max_age"])
+        if options["workers"] > 1:
+            if not options["max_age"]:
+                raise CommandError("--max-age must be provided when using --workers.")
+            if options["backfill"]:
+                raise CommandError("--backfill is implied when using --workers.")
+            latest = update_texting_history_concurrently(
+                max_age=options["max_age"],
+                workers=options["workers"],
+                window_days=options["window_days"],
+                page_size=min(options["page_size"], MAX_PAGE_SIZE),
+            )
+        else:
+            latest = update_texting_history(
+                backfill=options["backfill"], max_age=options["max_age"]
+            )
         print(f"Done, latest text message is {latest}.")
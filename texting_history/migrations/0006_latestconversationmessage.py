@@ -0,0 +1,38 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('texting_history', '0005_auto_20200312_0008'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LatestConversationMessage',
+            fields=[
+                ('user_phone_number', models.CharField(max_length=15, primary_key=True, serialize=False)),
+                ('ordering', models.FloatField()),
+                ('date_sent', models.DateTimeField()),
+                ('is_from_us', models.BooleanField()),
+                ('body', models.TextField(blank=True)),
+                ('error_message', models.TextField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='latestconversationmessage',
+            index=models.Index(fields=['ordering'], name='texting_his_orderin_0a141b_idx'),
+        ),
+        migrations.RunSQL(
+            sql="""
+            INSERT INTO texting_history_latestconversationmessage
+                (user_phone_number, ordering, date_sent, is_from_us, body, error_message)
+            SELECT DISTINCT ON (user_phone_number)
+                user_phone_number, ordering, date_sent, is_from_us, body, error_message
+            FROM
+                texting_history_message
+            ORDER BY user_phone_number, ordering DESC, sid DESC
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
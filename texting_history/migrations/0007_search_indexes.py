@@ -0,0 +1,30 @@
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0011_justfixuser_preferred_first_name'),
+        ('texting_history', '0006_latestconversationmessage'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='message',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['body'], name='texting_his_body_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+        # Django can't yet describe indexes on expressions with operator
+        # classes, so we'll create the one used for searching users by name
+        # by hand. Its expression must match the one in
+        # `texting_history.search.FULL_LEGAL_NAME_SQL`.
+        migrations.RunSQL(
+            sql="""
+            CREATE INDEX texting_his_user_full_name_trgm_idx ON users_justfixuser
+            USING gin ((first_name || ' ' || last_name) gin_trgm_ops)
+            """,
+            reverse_sql="DROP INDEX texting_his_user_full_name_trgm_idx",
+        ),
+    ]
@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('texting_history', '0007_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IngestionWindow',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('our_phone_number', models.CharField(max_length=15)),
+                ('is_from_us', models.BooleanField()),
+                ('start', models.DateTimeField()),
+                ('end', models.DateTimeField()),
+                ('high_water_mark', models.DateTimeField(blank=True, help_text="The date of the oldest message in this window we've stored so far.", null=True)),
+                ('is_complete', models.BooleanField(default=False)),
+            ],
+            options={
+                'unique_together': {('our_phone_number', 'is_from_us', 'start', 'end')},
+            },
+        ),
+    ]
@@ -1,3 +1,4 @@
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 
 from texting.models import TWILIO_SID_LENGTH
@@ -60,4 +61,65 @@ class Message(models.Model):
             models.Index(fields=["user_phone_number", "ordering"]),
             models.Index(fields=["date_sent"]),
             models.Index(fields=["our_phone_number"]),
+            # This trigram index allows message bodies to be searched
+            # via ILIKE, and ranked by similarity to the search text.
+            GinIndex(fields=["body"], name="texting_his_body_trgm_idx", opclasses=["gin_trgm_ops"]),
         ]
+
+
+class LatestConversationMessage(models.Model):
+    """
+    The latest message of each conversation, i.e. of each user phone number
+    we've exchanged messages with. This is a denormalized summary of the
+    `Message` table that is maintained by `update_latest_conversation_messages()`,
+    so that conversations can be browsed without having to scan every
+    message we've ever sent or received.
+    """
+
+    # Note that this number is in E.164 format, e.g. '+14155552671'.
+    user_phone_number = models.CharField(max_length=MAX_E164_LEN, primary_key=True)
+
+    ordering = models.FloatField()
+
+    date_sent = models.DateTimeField()
+
+    is_from_us = models.BooleanField()
+
+    body = models.TextField(blank=True)
+
+    error_message = models.TextField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["ordering"]),
+        ]
+
+
+class IngestionWindow(models.Model):
+    """
+    A window of time whose text messages are retrieved from Twilio as a
+    unit when text message history is updated concurrently. Because Twilio
+    returns messages in reverse chronological order, we keep track of the
+    oldest message date we've stored so far, so that an interrupted
+    update can resume where it left off.
+    """
+
+    # Note that this number is in E.164 format, e.g. '+14155552671'.
+    our_phone_number = models.CharField(max_length=MAX_E164_LEN)
+
+    is_from_us = models.BooleanField()
+
+    start = models.DateTimeField()
+
+    end = models.DateTimeField()
+
+    high_water_mark = models.DateTimeField(
+        blank=True,
+        null=True,
+        help_text="The date of the oldest message in this window we've stored so far.",
+    )
+
+    is_complete = models.BooleanField(default=False)
+
+    class Meta:
+        unique_together = [("our_phone_number", "is_from_us", "start", "end")]
@@ -1,5 +1,4 @@
-from typing import List, Dict, Any, Union
-from pathlib import Path
+from typing import Dict, Any, Optional
 from django.db import connection
 import graphene
 from graphene import Mutation
@@ -14,10 +13,7 @@ from project.util.streaming_json import generate_json_rows
 from .management.commands.update_texting_history import update_texting_history
 from .models import Message
 from .query_parser import Query
-
-MY_DIR = Path(__file__).parent.resolve()
-
-CONVERSATIONS_SQL_FILE = MY_DIR / "conversations.sql"
+from .search import build_conversations_query
 
 DEFAULT_PAGE_SIZE = 50
 
@@ -48,6 +44,13 @@ class LatestTextMessage(TextMessage):
 
     user_id = graphene.Int()
 
+    relevance = graphene.Float(
+        description=(
+            "How well the message matches a message body search, if conversations "
+            "are being ordered by relevance."
+        )
+    )
+
 
 class TextMessagesResult(graphene.ObjectType):
     messages = graphene.List(graphene.NonNull(TextMessage), required=True)
@@ -71,18 +74,10 @@ def resolve_conversation(
     if after_or_at:
         kwargs["ordering__lte"] = after_or_at
     qs = Message.objects.filter(**kwargs).order_by("-ordering")
-    messages = list(qs[:first])
-    return TextMessagesResult(messages=messages, has_next_page=qs.count() > len(messages))
-
-
-def insert_before(source: str, find: str, insert: str):
-    """
-    >>> insert_before('bloop troop', 'troop', 'hello ')
-    'bloop hello troop'
-    """
-
-    assert find in source
-    return source.replace(find, f"{insert}{find}")
+    # Fetching one more message than we need tells us whether there's
+    # a next page, without having to count every message.
+    messages = list(qs[: first + 1])
+    return TextMessagesResult(messages=messages[:first], has_next_page=len(messages) > first)
 
 
 @ensure_request_has_verified_user_with_permission(VIEW_TEXT_MESSAGE_PERMISSION)
@@ -92,88 +87,25 @@ def resolve_conversations(
     query: str,
     first: int,
     after_or_at: float,
+    order_by_relevance: bool = False,
+    after_relevance: Optional[float] = None,
 ) -> LatestTextMessagesResult:
-    where_clauses: List[str] = []
-    extra_joins: List[str] = []
-    sql_args: Dict[str, Union[int, str, float]] = {}
-
-    parsed = Query.parse(query)
-
-    latest_conversation_sql = CONVERSATIONS_SQL_FILE.read_text()
-
-    if parsed.message_body:
-        latest_conversation_sql = insert_before(
-            source=latest_conversation_sql,
-            find="WINDOW",
-            insert="WHERE BODY ILIKE '%%' || %(message_body)s || '%%'\n",
-        )
-        sql_args["message_body"] = parsed.message_body
-
-    with_clause = f"WITH latest_conversation_msg AS ({latest_conversation_sql})"
-
-    select_with_user_info_statement = """
-    SELECT
-        msg.*,
-        usr.id as user_id,
-        usr.first_name || ' ' || usr.last_name as user_full_legal_name
-    FROM
-        latest_conversation_msg AS msg
-    LEFT JOIN
-        users_justfixuser AS usr ON '+1' || usr.phone_number = msg.user_phone_number
-    """
-
-    if after_or_at:
-        where_clauses.append("(ordering <= %(after_or_at)s)")
-        sql_args["after_or_at"] = after_or_at
-    if parsed.phone_number:
-        where_clauses.append("(user_phone_number LIKE '+1' || %(phone_number)s || '%%')")
-        sql_args["phone_number"] = parsed.phone_number
-    if parsed.full_legal_name:
-        where_clauses.append(
-            "((usr.first_name || ' ' || usr.last_name) ILIKE '%%' || %(full_legal_name)s || '%%')"
-        )
-        sql_args["full_legal_name"] = parsed.full_legal_name
-    if parsed.has_hpa_packet:
-        extra_joins.append(
-            "INNER JOIN hpaction_hpactiondocuments AS hpadocs ON usr.id = hpadocs.user_id"
-        )
-
-    where_clause = ("WHERE " + " AND ".join(where_clauses)) if where_clauses else ""
-    order_clause = "ORDER BY ordering DESC"
-    limit_clause = f"LIMIT %(first)s"
-    sql_args["first"] = first
+    # Fetching one more conversation than we need tells us whether there's
+    # a next page, without having to count every conversation.
+    sql, sql_args = build_conversations_query(
+        Query.parse(query),
+        limit=first + 1,
+        after_or_at=after_or_at,
+        order_by_relevance=order_by_relevance,
+        after_relevance=after_relevance,
+    )
 
     with connection.cursor() as cursor:
-        base_select = "\n".join(
-            [
-                select_with_user_info_statement,
-                where_clause,
-                *extra_joins,
-            ]
-        )
-        cursor.execute(
-            "\n".join(
-                [
-                    with_clause,
-                    base_select,
-                    order_clause,
-                    limit_clause,
-                ]
-            ),
-            sql_args,
-        )
+        cursor.execute(sql, sql_args)
         messages = [LatestTextMessage(**row) for row in generate_json_rows(cursor)]
-        cursor.execute(
-            "\n".join(
-                [
-                    f"{with_clause}, filtered_messages AS ({base_select})",
-                    "SELECT COUNT(*) FROM filtered_messages",
-                ]
-            ),
-            sql_args,
+        return LatestTextMessagesResult(
+            messages=messages[:first], has_next_page=len(messages) > first
         )
-        count = cursor.fetchone()[0]
-        return LatestTextMessagesResult(messages=messages, has_next_page=count > len(messages))
 
 
 @schema_registry.register_queries
@@ -183,6 +115,19 @@ class TextingHistory:
         query=graphene.String(default_value=""),
         first=graphene.Int(default_value=DEFAULT_PAGE_SIZE),
         after_or_at=graphene.Float(default_value=0),
+        after_relevance=graphene.Float(
+            description=(
+                "When ordering by relevance, the relevance of the conversation to "
+                "start at. It must be provided along with afterOrAt."
+            ),
+        ),
+        order_by_relevance=graphene.Boolean(
+            default_value=False,
+            description=(
+                "Whether to order conversations by how well their latest matching "
+                "message matches a message body search, rather than by recency."
+            ),
+        ),
         resolver=resolve_conversations,
     )
 
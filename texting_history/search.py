@@ -0,0 +1,140 @@
+from typing import Any, Dict, List, Optional, Tuple
+from pathlib import Path
+
+from .models import LatestConversationMessage
+from .query_parser import Query
+
+MY_DIR = Path(__file__).parent.resolve()
+
+CONVERSATIONS_SQL_FILE = MY_DIR / "conversations.sql"
+
+# The SQL expression for a user's full legal name. Note that this must
+# be identical to the expression of the trigram index created in
+# migration 0007, or Postgres won't use the index.
+FULL_LEGAL_NAME_SQL = "(usr.first_name || ' ' || usr.last_name)"
+
+# The SQL expression for how relevant a conversation's latest matching
+# message is to a message body search. It's rounded to a fixed-precision
+# numeric, rather than left as a real, so that it survives the round trip
+# to the client and back as a pagination cursor exactly.
+RELEVANCE_SQL = "round(similarity(%(message_body)s, msg.body)::numeric, 6)"
+
+
+def insert_before(source: str, find: str, insert: str):
+    """
+    >>> insert_before('bloop troop', 'troop', 'hello ')
+    'bloop hello troop'
+    """
+
+    assert find in source
+    return source.replace(find, f"{insert}{find}")
+
+
+def build_conversations_query(
+    query: Query,
+    limit: int,
+    after_or_at: float = 0,
+    order_by_relevance: bool = False,
+    after_relevance: Optional[float] = None,
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Return the SQL and its parameters for retrieving the latest message of
+    up to `limit` conversations matching the given query.
+
+    Conversations are ordered by their latest message, most recent first,
+    unless `order_by_relevance` is true and the query searches message
+    bodies, in which case they are ordered by how similar their latest
+    matching message is to the search text. Each conversation's relevance
+    is then returned too, and subsequent pages must be requested with both
+    `after_relevance` and `after_or_at`, since together they're the cursor.
+    """
+
+    is_ordered_by_relevance = order_by_relevance and bool(query.message_body)
+    if is_ordered_by_relevance and after_or_at and after_relevance is None:
+        raise ValueError("after_relevance must be provided when ordering by relevance")
+
+    where_clauses: List[str] = []
+    sql_args: Dict[str, Any] = {}
+
+    if query.message_body:
+        # The latest message of each conversation that matches the search
+        # can be older than its actual latest message, so we can't use our
+        # table of latest messages here. Note that this ILIKE can use the
+        # trigram index on message bodies.
+        latest_conversation_sql = insert_before(
+            source=CONVERSATIONS_SQL_FILE.read_text(),
+            find="WINDOW",
+            insert="WHERE body ILIKE '%%' || %(message_body)s || '%%'\n",
+        )
+        sql_args["message_body"] = query.message_body
+        with_clause = f"WITH latest_conversation_msg AS ({latest_conversation_sql})"
+        latest_conversation_table = "latest_conversation_msg"
+    else:
+        with_clause = ""
+        latest_conversation_table = LatestConversationMessage._meta.db_table
+
+    relevance_column = f", {RELEVANCE_SQL} AS relevance" if is_ordered_by_relevance else ""
+
+    # Our users' phone numbers are stored without the "+1" prefix, so we'll
+    # strip it from the conversation's number, rather than adding it to the
+    # user's, so that Postgres can use the unique index on user phone numbers.
+    select_with_user_info_statement = f"""
+    SELECT
+        msg.user_phone_number AS sid,
+        msg.ordering,
+        msg.date_sent,
+        msg.is_from_us,
+        msg.body,
+        msg.error_message,
+        msg.user_phone_number,
+        usr.id as user_id,
+        {FULL_LEGAL_NAME_SQL} as user_full_legal_name
+        {relevance_column}
+    FROM
+        {latest_conversation_table} AS msg
+    LEFT JOIN
+        users_justfixuser AS usr ON (
+            msg.user_phone_number LIKE '+1%%'
+            AND usr.phone_number = substr(msg.user_phone_number, 3)
+        )
+    """
+
+    if is_ordered_by_relevance and after_relevance is not None:
+        where_clauses.append(
+            f"(({RELEVANCE_SQL}, msg.ordering) <= (%(after_relevance)s::numeric, %(after_or_at)s))"
+        )
+        sql_args["after_relevance"] = str(after_relevance)
+        sql_args["after_or_at"] = after_or_at
+    elif after_or_at:
+        where_clauses.append("(msg.ordering <= %(after_or_at)s)")
+        sql_args["after_or_at"] = after_or_at
+    if query.phone_number:
+        where_clauses.append("(msg.user_phone_number LIKE '+1' || %(phone_number)s || '%%')")
+        sql_args["phone_number"] = query.phone_number
+    if query.full_legal_name:
+        where_clauses.append(f"({FULL_LEGAL_NAME_SQL} ILIKE '%%' || %(full_legal_name)s || '%%')")
+        sql_args["full_legal_name"] = query.full_legal_name
+    if query.has_hpa_packet:
+        where_clauses.append(
+            "EXISTS (SELECT 1 FROM hpaction_hpactiondocuments AS hpadocs "
+            "WHERE hpadocs.user_id = usr.id)"
+        )
+
+    where_clause = ("WHERE " + " AND ".join(where_clauses)) if where_clauses else ""
+    if is_ordered_by_relevance:
+        order_clause = "ORDER BY relevance DESC, msg.ordering DESC"
+    else:
+        order_clause = "ORDER BY msg.ordering DESC"
+    limit_clause = "LIMIT %(limit)s"
+    sql_args["limit"] = limit
+
+    sql = "\n".join(
+        [
+            with_clause,
+            select_with_user_info_statement,
+            where_clause,
+            order_clause,
+            limit_clause,
+        ]
+    )
+    return sql, sql_args
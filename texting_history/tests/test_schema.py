@@ -3,6 +3,7 @@ import pytest
 
 from users.tests.factories import UserFactory
 from users.models import VIEW_TEXT_MESSAGE_PERMISSION
+from texting_history.latest_messages import update_latest_conversation_messages
 from .factories import MessageFactory
 
 
@@ -89,8 +90,28 @@ def test_conversation_query_works(auth_graphql_client):
     }
 
 
+def test_conversation_query_paginates(auth_graphql_client):
+    for i in range(3):
+        MessageFactory.create(sid=f"SM{i}", ordering=float(i))
+    query = """
+    query {
+        conversation(phoneNumber: "+15551234567", first: 2, afterOrAt: %s) {
+            messages { sid }
+            hasNextPage
+        }
+    }
+    """
+
+    result = auth_graphql_client.execute(query % 0)["data"]["conversation"]
+    assert result == {"messages": [{"sid": "SM2"}, {"sid": "SM1"}], "hasNextPage": True}
+
+    result = auth_graphql_client.execute(query % 1)["data"]["conversation"]
+    assert result == {"messages": [{"sid": "SM1"}, {"sid": "SM0"}], "hasNextPage": False}
+
+
 def test_conversations_query_works(auth_graphql_client):
     MessageFactory.create()
+    update_latest_conversation_messages()
     result = auth_graphql_client.execute(CONVERSATIONS_QUERY)["data"]["conversations"]
     assert result == {
         "hasNextPage": False,
@@ -121,6 +142,7 @@ def test_conversations_query_works(auth_graphql_client):
 )
 def test_conversations_queries_produce_expected_results(auth_graphql_client, query, num_results):
     MessageFactory.create()
+    update_latest_conversation_messages()
     messages = auth_graphql_client.execute(
         """
         query {
@@ -134,6 +156,104 @@ def test_conversations_queries_produce_expected_results(auth_graphql_client, que
     assert len(messages) == num_results
 
 
+def test_conversations_query_paginates(auth_graphql_client):
+    for i in range(3):
+        MessageFactory.create(sid=f"SM{i}", ordering=float(i), user_phone_number=f"+1555123000{i}")
+    MessageFactory.create(sid="SMold", ordering=-1.0, user_phone_number="+15551230002")
+    update_latest_conversation_messages()
+    query = """
+    query {
+        conversations(first: 2, afterOrAt: %s) {
+            messages { userPhoneNumber, ordering }
+            hasNextPage
+        }
+    }
+    """
+
+    result = auth_graphql_client.execute(query % 0)["data"]["conversations"]
+    assert result == {
+        "messages": [
+            {"userPhoneNumber": "+15551230002", "ordering": 2.0},
+            {"userPhoneNumber": "+15551230001", "ordering": 1.0},
+        ],
+        "hasNextPage": True,
+    }
+
+    result = auth_graphql_client.execute(query % 1)["data"]["conversations"]
+    assert result == {
+        "messages": [
+            {"userPhoneNumber": "+15551230001", "ordering": 1.0},
+            {"userPhoneNumber": "+15551230000", "ordering": 0.0},
+        ],
+        "hasNextPage": False,
+    }
+
+
+def test_conversations_query_orders_by_relevance(auth_graphql_client):
+    MessageFactory.create(sid="SM1", ordering=1.0, body="heat is out")
+    MessageFactory.create(
+        sid="SM2",
+        ordering=2.0,
+        body="my landlord says the heat is out again this week",
+        user_phone_number="+15551230000",
+    )
+    query = """
+    query {
+        conversations(query: "\\"heat is out\\"", orderByRelevance: %s) {
+            messages { ordering }
+        }
+    }
+    """
+
+    result = auth_graphql_client.execute(query % "true")["data"]["conversations"]
+    assert result == {"messages": [{"ordering": 1.0}, {"ordering": 2.0}]}
+
+    result = auth_graphql_client.execute(query % "false")["data"]["conversations"]
+    assert result == {"messages": [{"ordering": 2.0}, {"ordering": 1.0}]}
+
+
+def test_conversations_query_paginates_by_relevance(auth_graphql_client):
+    bodies = [
+        "heat is out",
+        "the heat is out",
+        "my heat is out again",
+        "heat is out",
+        "my landlord says the heat is out again this week",
+    ]
+    for i, body in enumerate(bodies):
+        MessageFactory.create(
+            sid=f"SM{i}", ordering=float(i), body=body, user_phone_number=f"+1555123000{i}"
+        )
+    query = """
+    query {
+        conversations(
+            query: "\\"heat is out\\"", orderByRelevance: true, first: 2, %s
+        ) {
+            messages { ordering, relevance }
+            hasNextPage
+        }
+    }
+    """
+
+    orderings = []
+    cursor = ""
+    while True:
+        result = auth_graphql_client.execute(query % cursor)["data"]["conversations"]
+        messages = result["messages"]
+        orderings.extend(message["ordering"] for message in messages[: len(messages) - 1])
+        if not result["hasNextPage"]:
+            orderings.append(messages[-1]["ordering"])
+            break
+        # The last message of each page is the first message of the next.
+        last = messages[-1]
+        cursor = f"afterOrAt: {last['ordering']}, afterRelevance: {last['relevance']}"
+
+    # Identical messages are ordered by recency, and every conversation
+    # should appear exactly once.
+    assert orderings[:2] == [3.0, 0.0]
+    assert sorted(orderings) == [0.0, 1.0, 2.0, 3.0, 4.0]
+
+
 def test_update_texting_history_mutation_works(auth_graphql_client, mock_twilio_api):
     result = auth_graphql_client.execute(UPDATE_TEXTING_HISTORY_MUTATION)["data"][
         "updateTextingHistory"
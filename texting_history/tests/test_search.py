@@ -0,0 +1,49 @@
+from django.db import connection
+import pytest
+
+from texting_history.query_parser import Query
+from texting_history.search import build_conversations_query
+
+
+def explain(query: Query, **kwargs) -> str:
+    sql, sql_args = build_conversations_query(query, limit=50, **kwargs)
+    with connection.cursor() as cursor:
+        # Our test tables are tiny, so Postgres would rather scan them
+        # sequentially; we want to know whether it *can* use an index.
+        cursor.execute("SET LOCAL enable_seqscan = off")
+        cursor.execute(f"EXPLAIN {sql}", sql_args)
+        return "\n".join(row[0] for row in cursor.fetchall())
+
+
+class TestQueryPlans:
+    def test_message_body_search_uses_trigram_index(self, db):
+        plan = explain(Query(message_body="boop"))
+        assert "texting_his_body_trgm_idx" in plan
+
+    def test_full_legal_name_search_uses_trigram_index(self, db):
+        plan = explain(Query(full_legal_name="boop jones"))
+        assert "texting_his_user_full_name_trgm_idx" in plan
+
+    def test_user_join_uses_phone_number_index(self, db):
+        plan = explain(Query())
+        assert "users_justfixuser_phone_number" in plan
+
+    def test_latest_messages_are_ordered_via_index(self, db):
+        plan = explain(Query(), after_or_at=5.0)
+        assert "texting_his_orderin_0a141b_idx" in plan
+
+
+def test_relevance_ordering_only_applies_to_message_body_searches():
+    def get_sql(query: Query, order_by_relevance: bool) -> str:
+        return build_conversations_query(query, limit=5, order_by_relevance=order_by_relevance)[0]
+
+    assert "similarity(" in get_sql(Query(message_body="boop"), True)
+    assert "similarity(" not in get_sql(Query(message_body="boop"), False)
+    assert "similarity(" not in get_sql(Query(full_legal_name="boop"), True)
+
+
+def test_relevance_ordering_requires_after_relevance_to_paginate():
+    with pytest.raises(ValueError, match="after_relevance must be provided"):
+        build_conversations_query(
+            Query(message_body="boop"), limit=5, after_or_at=5.0, order_by_relevance=True
+        )
@@ -1,7 +1,21 @@
-from django.core.management import call_command
+import copy
+import datetime
+from django.core.exceptions import ValidationError
+from django.core.management import call_command, CommandError
+from freezegun import freeze_time
+import pytest
 
-from texting_history.models import Message
-from texting_history.management.commands.update_texting_history import update_texting_history
+from texting_history.models import IngestionWindow, LatestConversationMessage, Message
+from texting_history.latest_messages import update_latest_conversation_messages
+from texting_history.management.commands.update_texting_history import validate_messages
+from .factories import MessageFactory
+from .conftest import EMPTY_MESSAGE_RESPONSE, FAKE_MESSAGE_RESPONSE
+from texting_history.management.commands.update_texting_history import (
+    update_texting_history,
+    update_texting_history_concurrently,
+)
+
+TWILIO_MESSAGES_URL = "https://api.twilio.com/2010-04-01/Accounts/boop/Messages.json"
 
 
 def test_it_returns_none_if_twilio_is_disabled():
@@ -14,3 +28,118 @@ def test_it_works(db, mock_twilio_api):
     msg = Message.objects.filter(body="testing").first()
     assert msg.is_from_us is False
     assert msg.ordering == 1558719890.0
+
+    latest = LatestConversationMessage.objects.get(user_phone_number=msg.user_phone_number)
+    assert latest.ordering == msg.ordering
+
+
+def test_update_latest_conversation_messages_works(db):
+    MessageFactory.create(sid="SM1", ordering=1.0, body="old")
+    update_latest_conversation_messages()
+    assert LatestConversationMessage.objects.get().body == "old"
+
+    MessageFactory.create(sid="SM2", ordering=2.0, body="new")
+    update_latest_conversation_messages(["+15551234567"])
+    assert LatestConversationMessage.objects.get().body == "new"
+
+    update_latest_conversation_messages([])
+    assert LatestConversationMessage.objects.get().body == "new"
+
+
+def test_rebuild_latest_works(db):
+    MessageFactory.create()
+    call_command("update_texting_history", "--rebuild-latest")
+    assert LatestConversationMessage.objects.get().body == "testing"
+
+
+class TestValidateMessages:
+    def test_it_accepts_valid_messages(self):
+        validate_messages([MessageFactory.build()])
+
+    def test_it_rejects_long_values(self):
+        with pytest.raises(ValidationError, match="direction longer than 15"):
+            validate_messages([MessageFactory.build(direction="x" * 16)])
+
+    def test_it_rejects_missing_values(self):
+        with pytest.raises(ValidationError, match="no date_sent"):
+            validate_messages([MessageFactory.build(date_sent=None)])
+
+
+class TestConcurrentMode:
+    @freeze_time("2019-06-01")
+    def test_it_works(self, transactional_db, mock_twilio_api):
+        call_command("update_texting_history", "--workers=2", "--max-age=30", "--window-days=10")
+
+        msg = Message.objects.get(body="testing")
+        assert msg.ordering == 1558719890.0
+        assert LatestConversationMessage.objects.get().ordering == msg.ordering
+
+        windows = IngestionWindow.objects.all()
+        # Four 10-day windows cover the last 30 days, in each direction.
+        assert windows.count() == 8
+        assert windows.filter(is_complete=False).count() == 2
+
+    @freeze_time("2019-06-01")
+    def test_it_skips_completed_windows(self, transactional_db, mock_twilio_api, requests_mock):
+        # Two 30-day windows cover the last 30 days, in each direction.
+        call_command("update_texting_history", "--workers=2", "--max-age=30")
+        assert requests_mock.call_count == 4
+
+        # Only the windows that haven't ended yet should be retrieved again.
+        call_command("update_texting_history", "--workers=2", "--max-age=30")
+        assert requests_mock.call_count == 6
+
+    def test_it_retrieves_new_messages_in_windows_that_have_not_ended(
+        self, transactional_db, mock_twilio_api, requests_mock
+    ):
+        messages = copy.deepcopy(FAKE_MESSAGE_RESPONSE["messages"])
+
+        def respond(request, context):
+            # Pretend to be Twilio, which only returns messages sent before
+            # the given date, most recent first.
+            before = datetime.datetime.strptime(
+                request.qs["datesent<"][0].upper(), "%Y-%m-%dT%H:%M:%SZ"
+            ).replace(tzinfo=datetime.timezone.utc)
+            return {
+                **EMPTY_MESSAGE_RESPONSE,
+                "messages": [
+                    message
+                    for message in messages
+                    if datetime.datetime.strptime(message["date_sent"], "%a, %d %b %Y %H:%M:%S %z")
+                    < before
+                ],
+            }
+
+        requests_mock.get(f"{TWILIO_MESSAGES_URL}?To=%2B15551234567", json=respond)
+
+        def update():
+            # Using a batch size of 1 ensures that each window's high-water
+            # mark is updated as we retrieve it.
+            update_texting_history_concurrently(
+                max_age=30, workers=1, window_days=30, batch_size=1, silent=True
+            )
+
+        with freeze_time("2019-06-01"):
+            update()
+        assert list(Message.objects.values_list("body", flat=True)) == ["testing"]
+
+        messages.insert(
+            0,
+            {
+                **messages[0],
+                "sid": "SMnewmessage",
+                "body": "a newer message",
+                "date_sent": "Fri, 31 May 2019 12:00:00 +0000",
+            },
+        )
+        with freeze_time("2019-06-02"):
+            update()
+        assert set(Message.objects.values_list("body", flat=True)) == {
+            "testing",
+            "a newer message",
+        }
+        assert IngestionWindow.objects.filter(high_water_mark__isnull=False).count() == 0
+
+    def test_it_requires_max_age(self, db, mock_twilio_api):
+        with pytest.raises(CommandError, match="--max-age must be provided"):
+            call_command("update_texting_history", "--workers=2")